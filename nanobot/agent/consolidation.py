@@ -0,0 +1,181 @@
+"""Background memory consolidation on a bounded worker pool."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.queue import LatencyHistogram
+
+if TYPE_CHECKING:
+    from nanobot.session.manager import Session
+    from nanobot.utils.tracing import Tracer
+
+
+@dataclass
+class _Job:
+    session: Session
+    queued_at: float
+    triggers: int = 1
+    rerun_at: float | None = None  # Set when triggered again while running
+
+
+class ConsolidationService:
+    """
+    Runs memory consolidation off the request path.
+
+    ``submit`` queues one job per session: triggers for a session that is
+    already queued are folded into that job, and a trigger for a session
+    being consolidated queues one more pass once the current one ends (it
+    may have read the session before the new messages arrived). A fixed
+    number of workers drain the queue, so a burst of busy sessions never
+    means a burst of concurrent LLM calls. Each job holds the session's
+    lock (which ``/new`` also takes before archiving), and failed attempts
+    are retried with jittered exponential backoff. ``stats()`` reports queue
+    depth and how long jobs waited before a worker picked them up.
+    """
+
+    def __init__(
+        self,
+        consolidate: Callable[[Session], Awaitable[bool]],
+        workers: int = 2,
+        max_retries: int = 2,
+        retry_delay: float = 2.0,
+        tracer: Tracer | None = None,
+    ):
+        self._consolidate = consolidate
+        self.workers = max(1, workers)
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self.tracer = tracer
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._jobs: dict[str, _Job] = {}  # Queued or running, by session key
+        self._running: set[str] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._workers: list[asyncio.Task] = []
+        self.lag = LatencyHistogram()
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+
+    def submit(self, session: Session) -> bool:
+        """Queue consolidation for a session. Returns False if it was folded into a pending job."""
+        job = self._jobs.get(session.key)
+        if job is not None:
+            job.session = session
+            if session.key in self._running and job.rerun_at is None:
+                job.rerun_at = time.monotonic()
+                return True
+            job.triggers += 1
+            self.coalesced += 1
+            return False
+        self._jobs[session.key] = _Job(session, time.monotonic())
+        self._queue.put_nowait(session.key)
+        self._ensure_workers()
+        return True
+
+    def _ensure_workers(self) -> None:
+        self._workers = [w for w in self._workers if not w.done()]
+        for i in range(len(self._workers), self.workers):
+            self._workers.append(asyncio.create_task(self._worker(), name=f"consolidation-{i}"))
+
+    def lock(self, session_key: str) -> asyncio.Lock:
+        """The lock serialising consolidation and archival for one session."""
+        lock = self._locks.get(session_key)
+        if lock is None:
+            lock = self._locks[session_key] = asyncio.Lock()
+        return lock
+
+    def release(self, session_key: str) -> None:
+        """Forget a session's lock once nothing holds or waits for it."""
+        lock = self._locks.get(session_key)
+        if lock is not None and not lock.locked() and session_key not in self._jobs:
+            del self._locks[session_key]
+
+    def is_pending(self, session_key: str) -> bool:
+        return session_key in self._jobs
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._queue.get()
+            job = self._jobs[key]
+            self._running.add(key)
+            lag_ms = (time.monotonic() - job.queued_at) * 1000
+            self.lag.observe(lag_ms)
+            try:
+                await self._run(key, job, lag_ms)
+            finally:
+                self._running.discard(key)
+                del self._jobs[key]
+                if job.rerun_at is not None:
+                    self._jobs[key] = _Job(job.session, job.rerun_at)
+                    self._queue.put_nowait(key)
+                self.release(key)
+                self._queue.task_done()
+
+    async def _run(self, key: str, job: _Job, lag_ms: float) -> None:
+        for attempt in range(self.max_retries + 1):
+            ok = await self._attempt(key, job, lag_ms, attempt)
+            if ok:
+                self.completed += 1
+                return
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            delay = self.retry_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+            logger.warning("Consolidation for {} failed, retrying in {:.1f}s", key, delay)
+            await asyncio.sleep(delay)
+        self.failed += 1
+        logger.error("Consolidation for {} failed after {} attempts", key, self.max_retries + 1)
+
+    async def _attempt(self, key: str, job: _Job, lag_ms: float, attempt: int) -> bool:
+        async with self.lock(key):
+            if self.tracer is None:
+                return await self._call(job.session)
+            with self.tracer.span("consolidation", session=key, lag_ms=round(lag_ms, 1),
+                                  attempt=attempt, triggers=job.triggers) as span:
+                ok = await self._call(job.session)
+                span.set(ok=ok)
+                return ok
+
+    async def _call(self, session: Session) -> bool:
+        try:
+            return bool(await self._consolidate(session))
+        except Exception:
+            logger.exception("Consolidation for {} raised", session.key)
+            return False
+
+    async def join(self) -> None:
+        """Wait until every queued job (including retries) has finished."""
+        await self._queue.join()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let in-flight jobs finish for up to ``timeout`` seconds, then cancel the workers."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Cancelling {} unfinished consolidation job(s)", len(self._jobs))
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": len(self._jobs) - len(self._running),
+            "running": len(self._running),
+            "workers": self.workers,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "lag": self.lag.snapshot(),
+        }
@@ -3,12 +3,19 @@
 import base64
 import mimetypes
 import platform
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
+
+from loguru import logger
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
 
+if TYPE_CHECKING:
+    from nanobot.agent.vector_memory import SemanticMemory
+
 
 class ContextBuilder:
     """
@@ -16,21 +23,63 @@ class ContextBuilder:
     
     Assembles bootstrap files, memory, skills, and conversation history
     into a coherent prompt for the LLM.
+
+    Each system prompt section is cached against the mtimes/sizes of the files it
+    was built from, so unchanged sections are reused verbatim. The current time is
+    kept out of the system prompt body so the prefix stays byte-identical across
+    turns (which also lets provider-side prompt caching hit).
+
+    With a ``SemanticMemory`` attached, MEMORY.md is left out of the system
+    prompt and only the memories recalled for the current message are added
+    after the cacheable prefix.
     """
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, semantic_memory: "SemanticMemory | None" = None):
         self.workspace = workspace
         self.memory = MemoryStore(workspace)
+        self.semantic_memory = semantic_memory
         self.skills = SkillsLoader(workspace)
+        self._sections: dict[str, tuple[tuple, str]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """Section cache hit/miss counters."""
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
+    def _cached(self, name: str, signature: tuple, build: Callable[[], str]) -> str:
+        """Return a cached section, rebuilding it only when its signature changed."""
+        entry = self._sections.get(name)
+        if entry is not None and entry[0] == signature:
+            self.cache_hits += 1
+            return entry[1]
+        self.cache_misses += 1
+        content = build()
+        self._sections[name] = (signature, content)
+        return content
+
+    @staticmethod
+    def _file_signature(*paths: Path) -> tuple:
+        """(mtime_ns, size) per path, or None for missing files."""
+        sig = []
+        for path in paths:
+            try:
+                st = path.stat()
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
     
-    def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
+    def build_system_prompt(self, skill_names: list[str] | None = None, include_memory: bool = True) -> str:
         """
         Build the system prompt from bootstrap files, memory, and skills.
         
         Args:
             skill_names: Optional list of skills to include.
+            include_memory: Include the full MEMORY.md.
         
         Returns:
             Complete system prompt.
@@ -38,19 +87,36 @@ class ContextBuilder:
         parts = []
         
         # Core identity
-        parts.append(self._get_identity())
+        parts.append(self._cached("identity", (), self._get_identity))
         
         # Bootstrap files
-        bootstrap = self._load_bootstrap_files()
+        bootstrap = self._cached(
+            "bootstrap",
+            self._file_signature(*(self.workspace / name for name in self.BOOTSTRAP_FILES)),
+            self._load_bootstrap_files,
+        )
         if bootstrap:
             parts.append(bootstrap)
         
         # Memory context
-        memory = self.memory.get_memory_context()
-        if memory:
-            parts.append(f"# Memory\n\n{memory}")
+        if include_memory:
+            memory = self._cached(
+                "memory", self._file_signature(self.memory.memory_file), self.memory.get_memory_context
+            )
+            if memory:
+                parts.append(f"# Memory\n\n{memory}")
         
         # Skills - progressive loading
+        skills = self._cached("skills", self.skills.fingerprint(), self._build_skills_section)
+        if skills:
+            parts.append(skills)
+        
+        return "\n\n---\n\n".join(parts)
+
+    def _build_skills_section(self) -> str:
+        """Always-loaded skills in full, followed by a summary of all skills."""
+        parts = []
+
         # 1. Always-loaded skills: include full content
         always_skills = self.skills.get_always_skills()
         if always_skills:
@@ -72,10 +138,6 @@ Skills with available="false" need dependencies installed first - you can try in
     
     def _get_identity(self) -> str:
         """Get the core identity section."""
-        from datetime import datetime
-        import time as _time
-        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
-        tz = _time.strftime("%Z") or "UTC"
         workspace_path = str(self.workspace.expanduser().resolve())
         system = platform.system()
         runtime = f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
@@ -84,16 +146,13 @@ Skills with available="false" need dependencies installed first - you can try in
 
 You are nanobot, a helpful AI assistant. 
 
-## Current Time
-{now} ({tz})
-
 ## Runtime
 {runtime}
 
 ## Workspace
 Your workspace is at: {workspace_path}
 - Long-term memory: {workspace_path}/memory/MEMORY.md
-- History log: {workspace_path}/memory/HISTORY.md (grep-searchable)
+- History log: {workspace_path}/memory/HISTORY.md (search it with memory_search)
 - Custom skills: {workspace_path}/skills/{{skill-name}}/SKILL.md
 
 Reply directly with text for conversations. Only use the 'message' tool to send to a specific chat channel.
@@ -107,7 +166,14 @@ Reply directly with text for conversations. Only use the 'message' tool to send
 
 ## Memory
 - Remember important facts: write to {workspace_path}/memory/MEMORY.md
-- Recall past events: grep {workspace_path}/memory/HISTORY.md"""
+- Recall past events: memory_search (keywords, optional since/until dates)"""
+
+    @staticmethod
+    def _get_current_time() -> str:
+        """Get the per-turn time section, appended after the cacheable prefix."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
+        tz = time.strftime("%Z") or "UTC"
+        return f"## Current Time\n{now} ({tz})"
     
     def _load_bootstrap_files(self) -> str:
         """Load all bootstrap files from workspace."""
@@ -129,6 +195,7 @@ Reply directly with text for conversations. Only use the 'message' tool to send
         media: list[str] | None = None,
         channel: str | None = None,
         chat_id: str | None = None,
+        recalled: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
@@ -140,6 +207,8 @@ Reply directly with text for conversations. Only use the 'message' tool to send
             media: Optional list of local file paths for images/media.
             channel: Current channel (telegram, feishu, etc.).
             chat_id: Current chat/user ID.
+            recalled: Memories retrieved for this message (see recall_memory);
+                replaces the full MEMORY.md when not None.
 
         Returns:
             List of messages including system prompt.
@@ -147,9 +216,12 @@ Reply directly with text for conversations. Only use the 'message' tool to send
         messages = []
 
         # System prompt
-        system_prompt = self.build_system_prompt(skill_names)
+        system_prompt = self.build_system_prompt(skill_names, include_memory=recalled is None)
+        system_prompt += f"\n\n{self._get_current_time()}"
         if channel and chat_id:
             system_prompt += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
+        if recalled:
+            system_prompt += f"\n\n## Relevant Memory\n{recalled}"
         messages.append({"role": "system", "content": system_prompt})
 
         # History
@@ -161,6 +233,20 @@ Reply directly with text for conversations. Only use the 'message' tool to send
 
         return messages
 
+    async def recall_memory(self, query: str) -> str | None:
+        """
+        Memories relevant to ``query`` for build_messages(recalled=...).
+
+        Returns None (use the full MEMORY.md) without semantic memory or if retrieval fails.
+        """
+        if self.semantic_memory is None:
+            return None
+        try:
+            return await self.semantic_memory.recall_context(query)
+        except Exception as e:
+            logger.warning("Memory retrieval failed, using full MEMORY.md: {}", e)
+            return None
+
     def _build_user_content(self, text: str, media: list[str] | None) -> str | list[dict[str, Any]]:
         """Build user message content with optional base64-encoded images."""
         if not media:
@@ -0,0 +1,162 @@
+"""Incremental full-text index over memory/HISTORY.md."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    ts TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    body, content='entries', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+"""
+
+_ENTRY_SPLIT = re.compile(r"\n[ \t]*\n+")
+_TIMESTAMP = re.compile(r"^\s*\[(\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}))?")
+_TERM = re.compile(r"\w+", re.UNICODE)
+_TAIL = 64  # Bytes before the indexed offset kept to detect rewrites of the file
+
+
+def _entry_ts(body: str) -> str | None:
+    """'YYYY-MM-DD HH:MM' (or just the date) from an entry's leading [timestamp]."""
+    if m := _TIMESTAMP.match(body):
+        return f"{m.group(1)} {m.group(2)}" if m.group(2) else m.group(1)
+    return None
+
+
+def to_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word as a quoted prefix term, any may match."""
+    terms = dict.fromkeys(t.lower() for t in _TERM.findall(query))
+    return " OR ".join(f'"{t}"*' for t in terms)
+
+
+class HistoryIndex:
+    """
+    SQLite FTS5 index of HISTORY.md entries (blank-line separated paragraphs).
+
+    The index remembers how many bytes of the file it has consumed, so each
+    ``sync()`` only parses what was appended since. If the file was edited
+    or truncated before that point it is re-indexed from scratch. Queries
+    are BM25-ranked and can be limited to a date range using the
+    ``[YYYY-MM-DD HH:MM]`` prefix that consolidation writes on each entry.
+    """
+
+    def __init__(self, history_file: Path, index_path: Path):
+        self.history_file = history_file
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def sync(self) -> int:
+        """Index entries appended since the last sync. Returns the number of new entries."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")  # Serialize with other processes/stores sharing the index
+            try:
+                added = self._sync(db)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return added
+
+    def _sync(self, db: sqlite3.Connection) -> int:
+        state = dict(db.execute("SELECT key, value FROM state"))
+        offset, tail = int(state.get("offset", 0)), state.get("tail", b"")
+        try:
+            with open(self.history_file, "rb") as f:
+                size = f.seek(0, 2)
+                if offset and (size < offset or self._read(f, offset - len(tail), len(tail)) != tail):
+                    offset = 0  # Rewritten since the last sync
+                if offset == 0 and state:
+                    db.execute("DELETE FROM entries")
+                    db.execute("INSERT INTO entries_fts (entries_fts) VALUES ('delete-all')")
+                data = self._read(f, offset, size - offset)
+                tail = self._read(f, max(0, size - _TAIL), min(size, _TAIL))
+        except FileNotFoundError:
+            if state:
+                db.execute("DELETE FROM entries")
+                db.execute("INSERT INTO entries_fts (entries_fts) VALUES ('delete-all')")
+                db.execute("DELETE FROM state")
+            return 0
+
+        added = 0
+        for chunk in _ENTRY_SPLIT.split(data.decode("utf-8", errors="replace")):
+            body = chunk.strip()
+            if not body:
+                continue
+            cur = db.execute("INSERT INTO entries (ts, body) VALUES (?, ?)", (_entry_ts(body), body))
+            db.execute("INSERT INTO entries_fts (rowid, body) VALUES (?, ?)", (cur.lastrowid, body))
+            added += 1
+        db.executemany(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            [("offset", size), ("tail", tail)],
+        )
+        return added
+
+    @staticmethod
+    def _read(f: Any, start: int, length: int) -> bytes:
+        f.seek(start)
+        return f.read(length)
+
+    def search(
+        self,
+        query: str,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        BM25-ranked entries matching ``query``, best first.
+
+        ``since``/``until`` are inclusive ISO dates (YYYY-MM-DD); entries without
+        a timestamp are excluded when either is given. Each hit carries the
+        entry timestamp, a snippet around the matched terms and its score.
+        """
+        self.sync()
+        match = to_match_query(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT e.ts, snippet(entries_fts, 0, '**', '**', ' … ', 24), bm25(entries_fts)"
+            " FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+            " WHERE entries_fts MATCH ?"
+        )
+        params: list[Any] = [match]
+        if since:
+            sql += " AND e.ts >= ?"
+            params.append(since)
+        if until:
+            sql += " AND e.ts < ?"
+            params.append(until + "~")  # '~' sorts after any "YYYY-MM-DD HH:MM" on that day
+        sql += " ORDER BY bm25(entries_fts) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db().execute(sql, params).fetchall()
+        return [{"ts": ts, "snippet": snippet, "score": round(-score, 3)} for ts, snippet, score in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -5,29 +5,44 @@ from __future__ import annotations
 import asyncio
 import json
 import re
+import time
+import uuid
 from contextlib import AsyncExitStack
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from loguru import logger
 
+from nanobot.agent.consolidation import ConsolidationService
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.subagent import SubagentManager
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.memory import MemorySearchTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.spawn import SpawnTool
-from nanobot.agent.tools.web import WebFetchTool, WebSearchTool
+from nanobot.agent.tools.web import WebCache, WebFetchTool, WebSearchTool
+from nanobot.agent.usage import UsageLedger
+from nanobot.agent.vector_memory import NUMPY_AVAILABLE, SemanticMemory, make_embedder
 from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.bus.queue import LANE_CONTROL, TURN_LANES, BaseMessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse
 from nanobot.session.manager import Session, SessionManager
+from nanobot.utils.http import HttpClientPool
+from nanobot.utils.tokens import TokenCounter
+from nanobot.utils.tracing import Tracer
 
 if TYPE_CHECKING:
-    from nanobot.config.schema import ChannelsConfig, ExecToolConfig
+    from nanobot.config.schema import (
+        ChannelsConfig,
+        ConsolidationConfig,
+        ExecToolConfig,
+        VectorMemoryConfig,
+        WebCacheConfig,
+    )
     from nanobot.cron.service import CronService
 
 
@@ -45,7 +60,7 @@ class AgentLoop:
 
     def __init__(
         self,
-        bus: MessageBus,
+        bus: BaseMessageBus,
         provider: LLMProvider,
         workspace: Path,
         model: str | None = None,
@@ -60,8 +75,22 @@ class AgentLoop:
         session_manager: SessionManager | None = None,
         mcp_servers: dict | None = None,
         channels_config: ChannelsConfig | None = None,
+        max_concurrency: int = 4,
+        max_parallel_tools: int = 4,
+        stream_responses: bool = False,
+        stream_interval_ms: int = 1000,
+        history_max_tokens: int = 32000,
+        tokenizer: str = "heuristic",
+        http_pool: HttpClientPool | None = None,
+        web_cache_config: WebCacheConfig | None = None,
+        supersede_turns: bool = False,
+        tracer: Tracer | None = None,
+        usage_ledger: UsageLedger | None = None,
+        session_token_budget: int = 0,
+        vector_memory_config: VectorMemoryConfig | None = None,
+        consolidation_config: ConsolidationConfig | None = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ConsolidationConfig, ExecToolConfig, WebCacheConfig
         self.bus = bus
         self.channels_config = channels_config
         self.provider = provider
@@ -75,10 +104,30 @@ class AgentLoop:
         self.exec_config = exec_config or ExecToolConfig()
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
-
-        self.context = ContextBuilder(workspace)
-        self.sessions = session_manager or SessionManager(workspace)
-        self.tools = ToolRegistry()
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_parallel_tools = max(1, max_parallel_tools)
+        self.stream_responses = stream_responses
+        self.stream_interval = max(0, stream_interval_ms) / 1000
+        self.history_max_tokens = history_max_tokens
+        self.supersede_turns = supersede_turns  # A newer message cancels the session's in-flight turn
+        self.tokens = TokenCounter.from_name(tokenizer)
+        self.tracer = tracer or Tracer()  # In-memory stats only unless a trace file is configured
+        self.usage = usage_ledger
+        self.session_token_budget = session_token_budget  # Daily prompt+completion tokens per session (0 = off)
+        self._owns_http = http_pool is None
+        self.http = http_pool or HttpClientPool()
+        cache_cfg = web_cache_config or WebCacheConfig()
+        self.web_cache = WebCache(
+            ttl=cache_cfg.ttl_seconds,
+            max_bytes=cache_cfg.max_memory_mb * 1024 * 1024,
+            disk_dir=workspace / ".cache" / "web" if cache_cfg.persist else None,
+            disk_max_bytes=cache_cfg.max_disk_mb * 1024 * 1024,
+        ) if cache_cfg.enabled else None
+
+        self.memory = MemoryStore(workspace)  # Shared so consolidation writes are serialised
+        self.context = ContextBuilder(workspace, semantic_memory=self._make_semantic_memory(vector_memory_config))
+        self.sessions = session_manager or SessionManager(workspace, tail_messages=max(500, memory_window))
+        self.tools = ToolRegistry(tracer=self.tracer)
         self.subagents = SubagentManager(
             provider=provider,
             workspace=workspace,
@@ -89,6 +138,9 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            max_parallel_tools=self.max_parallel_tools,
+            http=self.http,
+            web_cache=self.web_cache,
         )
 
         self._running = False
@@ -96,11 +148,31 @@ class AgentLoop:
         self._mcp_stack: AsyncExitStack | None = None
         self._mcp_connected = False
         self._mcp_connecting = False
-        self._consolidating: set[str] = set()  # Session keys with consolidation in progress
-        self._consolidation_tasks: set[asyncio.Task] = set()  # Strong refs to in-flight tasks
-        self._consolidation_locks: dict[str, asyncio.Lock] = {}
+        consolidation_cfg = consolidation_config or ConsolidationConfig()
+        self.consolidation_model = consolidation_cfg.model or self.model
+        self.consolidation = ConsolidationService(
+            lambda session: self._consolidate_memory(session),  # Resolved per call, not at construction
+            workers=consolidation_cfg.workers,
+            max_retries=consolidation_cfg.max_retries,
+            retry_delay=consolidation_cfg.retry_delay,
+            tracer=self.tracer,
+        )
+        self._turn_slots = asyncio.Semaphore(self.max_concurrency)  # Global cap on concurrent turns
+        self._session_queues: dict[str, asyncio.Queue[InboundMessage]] = {}
+        self._session_workers: dict[str, asyncio.Task] = {}
+        self._active_turns: dict[str, asyncio.Task] = {}  # In-flight turn per session (for /stop)
         self._register_default_tools()
 
+    def _make_semantic_memory(self, config: VectorMemoryConfig | None) -> SemanticMemory | None:
+        """Embedding retrieval layer when enabled and numpy is installed."""
+        if config is None or not config.enabled:
+            return None
+        if not NUMPY_AVAILABLE:
+            logger.warning("Vector memory needs numpy (pip install nanobot-ai[vector]); using full MEMORY.md")
+            return None
+        embedder = make_embedder(config.embedding_model, config.api_key, config.api_base, config.dim)
+        return SemanticMemory(self.memory, embedder, top_k=config.top_k, min_score=config.min_score)
+
     def _register_default_tools(self) -> None:
         """Register the default set of tools."""
         allowed_dir = self.workspace if self.restrict_to_workspace else None
@@ -111,9 +183,10 @@ class AgentLoop:
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
         ))
-        self.tools.register(WebSearchTool(api_key=self.brave_api_key))
-        self.tools.register(WebFetchTool())
+        self.tools.register(WebSearchTool(api_key=self.brave_api_key, http=self.http, cache=self.web_cache))
+        self.tools.register(WebFetchTool(http=self.http, cache=self.web_cache))
         self.tools.register(MessageTool(send_callback=self.bus.publish_outbound))
+        self.tools.register(MemorySearchTool(self.memory.history_index))
         self.tools.register(SpawnTool(manager=self.subagents))
         if self.cron_service:
             self.tools.register(CronTool(self.cron_service))
@@ -171,12 +244,105 @@ class AgentLoop:
             return f'{tc.name}("{val[:40]}…")' if len(val) > 40 else f'{tc.name}("{val}")'
         return ", ".join(_fmt(tc) for tc in tool_calls)
 
+    @staticmethod
+    def _visible_stream_text(text: str) -> str:
+        """Strip think blocks from partial output, hiding a block that is still open."""
+        text = re.sub(r"<think>[\s\S]*?</think>", "", text)
+        if (start := text.find("<think>")) != -1:
+            text = text[:start]
+        return text.strip()
+
+    async def _chat_streaming(
+        self,
+        messages: list[dict],
+        on_stream: Callable[..., Awaitable[None]],
+    ) -> tuple[LLMResponse, str | None]:
+        """Call the provider in streaming mode, forwarding throttled text snapshots.
+
+        Returns the final response and the stream id if any text was forwarded.
+        """
+        stream_id = uuid.uuid4().hex[:12]
+        started = time.monotonic()
+        first_token_at: float | None = None
+        last_emit = 0.0
+        emitted = ""
+        text = ""
+        response: LLMResponse | None = None
+
+        async for chunk in self.provider.chat_stream(
+            messages=messages,
+            tools=self.tools.get_definitions(),
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        ):
+            if chunk.response is not None:
+                response = chunk.response
+                continue
+            if not chunk.delta:
+                continue
+            now = time.monotonic()
+            if first_token_at is None:
+                first_token_at = now
+                logger.info("LLM time to first token: {:.0f} ms", (now - started) * 1000)
+            text += chunk.delta
+            visible = self._visible_stream_text(text)
+            if visible and visible != emitted and now - last_emit >= self.stream_interval:
+                await on_stream(stream_id, visible)
+                emitted, last_emit = visible, now
+
+        if response is None:
+            response = LLMResponse(content=text or None)
+        return response, (stream_id if emitted else None)
+
+    async def _call_llm(
+        self,
+        messages: list[dict],
+        on_stream: Callable[..., Awaitable[None]] | None = None,
+        usage_scope: tuple[str, str] | None = None,
+    ) -> tuple[LLMResponse, str | None]:
+        """One provider call (streaming when ``on_stream`` is set), traced and charged to ``usage_scope``."""
+        with self.tracer.span("llm_call", model=self.model, messages=len(messages),
+                              streaming=on_stream is not None) as span:
+            stream_id = None
+            if on_stream:
+                response, stream_id = await self._chat_streaming(messages, on_stream)
+            else:
+                response = await self.provider.chat(
+                    messages=messages,
+                    tools=self.tools.get_definitions(),
+                    model=self.model,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                )
+            span.set(finish_reason=response.finish_reason, tool_calls=len(response.tool_calls),
+                     output_chars=len(response.content or ""), usage=response.usage or None)
+            if response.finish_reason == "error":
+                span.outcome = "error"
+            if self.usage and usage_scope and response.usage:
+                self.usage.record(usage_scope[0], usage_scope[1], self.model, response.usage)
+            return response, stream_id
+
+    async def _over_budget(self, usage_scope: tuple[str, str] | None) -> bool:
+        if not (self.usage and usage_scope and self.session_token_budget > 0):
+            return False
+        return await self.usage.asession_total(usage_scope[0]) >= self.session_token_budget
+
     async def _run_agent_loop(
         self,
         initial_messages: list[dict],
         on_progress: Callable[..., Awaitable[None]] | None = None,
+        on_stream: Callable[..., Awaitable[None]] | None = None,
+        usage_scope: tuple[str, str] | None = None,
     ) -> tuple[str | None, list[str], list[dict]]:
-        """Run the agent iteration loop. Returns (final_content, tools_used, messages)."""
+        """Run the agent iteration loop. Returns (final_content, tools_used, messages).
+
+        When ``on_stream`` is given the provider is called in streaming mode and
+        ``on_stream(stream_id, text)`` receives throttled snapshots of the text
+        generated so far; the final answer is announced with ``done=True``.
+        ``usage_scope`` is the (session, channel) that LLM calls are charged
+        to; the loop stops early once that session exceeds its token budget.
+        """
         messages = initial_messages
         iteration = 0
         final_content = None
@@ -184,49 +350,58 @@ class AgentLoop:
 
         while iteration < self.max_iterations:
             iteration += 1
+            if await self._over_budget(usage_scope):
+                logger.warning("Session {} exceeded its daily token budget", usage_scope[0])
+                final_content = (
+                    f"This conversation has used its daily token budget ({self.session_token_budget:,} tokens). "
+                    "Please try again tomorrow or start a new session."
+                )
+                break
+            with self.tracer.span("iteration", n=iteration):
+                response, stream_id = await self._call_llm(messages, on_stream, usage_scope)
 
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-            )
-
-            if response.has_tool_calls:
-                if on_progress:
+                if response.has_tool_calls:
                     clean = self._strip_think(response.content)
-                    if clean:
+                    if clean and stream_id:
+                        await on_stream(stream_id, clean)
+                    elif clean and on_progress:
                         await on_progress(clean)
-                    await on_progress(self._tool_hint(response.tool_calls), tool_hint=True)
-
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments, ensure_ascii=False)
+                    if on_progress:
+                        await on_progress(self._tool_hint(response.tool_calls), tool_hint=True)
+
+                    tool_call_dicts = [
+                        {
+                            "id": tc.id,
+                            "type": "function",
+                            "function": {
+                                "name": tc.name,
+                                "arguments": json.dumps(tc.arguments, ensure_ascii=False)
+                            }
                         }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts,
-                    reasoning_content=response.reasoning_content,
-                )
+                        for tc in response.tool_calls
+                    ]
+                    messages = self.context.add_assistant_message(
+                        messages, response.content, tool_call_dicts,
+                        reasoning_content=response.reasoning_content,
+                    )
 
-                for tool_call in response.tool_calls:
-                    tools_used.append(tool_call.name)
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info("Tool call: {}({})", tool_call.name, args_str[:200])
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
+                    for tool_call in response.tool_calls:
+                        tools_used.append(tool_call.name)
+                        args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+                        logger.info("Tool call: {}({})", tool_call.name, args_str[:200])
+                    results = await self.tools.execute_batch(
+                        [(tc.name, tc.arguments) for tc in response.tool_calls],
+                        max_parallel=self.max_parallel_tools,
                     )
-            else:
-                final_content = self._strip_think(response.content)
-                break
+                    for tool_call, result in zip(response.tool_calls, results):
+                        messages = self.context.add_tool_result(
+                            messages, tool_call.id, tool_call.name, result
+                        )
+                else:
+                    final_content = self._strip_think(response.content)
+                    if stream_id:
+                        await on_stream(stream_id, final_content or "", done=True)
+                    break
 
         if final_content is None and iteration >= self.max_iterations:
             logger.warning("Max iterations ({}) reached", self.max_iterations)
@@ -238,68 +413,173 @@ class AgentLoop:
         return final_content, tools_used, messages
 
     async def run(self) -> None:
-        """Run the agent loop, processing messages from the bus."""
+        """Run the agent loop, dispatching messages from the bus to per-session workers.
+
+        Messages for different sessions are processed concurrently (bounded by
+        ``max_concurrency``); messages within one session stay strictly ordered.
+        A message is only taken off the bus once a turn slot is free, so any
+        backlog waits on the bus, where its bound, overflow policies and
+        priority lanes apply. Control commands (``/stop``) are consumed even
+        while every slot is busy.
+        """
         self._running = True
         await self._connect_mcp()
-        logger.info("Agent loop started")
+        logger.info("Agent loop started (max {} concurrent turns)", self.max_concurrency)
 
-        while self._running:
-            try:
-                msg = await asyncio.wait_for(
-                    self.bus.consume_inbound(),
-                    timeout=1.0
+        # Pending futures survive the 1s wake-ups, so no slot or message is lost to a timeout
+        slot: asyncio.Future | None = None
+        incoming: asyncio.Future[InboundMessage] | None = None
+        control: asyncio.Future[InboundMessage] | None = None
+        try:
+            while self._running:
+                if slot is None:
+                    slot = asyncio.ensure_future(self._turn_slots.acquire())
+                if control is None:
+                    control = asyncio.ensure_future(self.bus.consume_inbound(lanes=(LANE_CONTROL,)))
+                if slot.done() and incoming is None:
+                    incoming = asyncio.ensure_future(self.bus.consume_inbound(lanes=TURN_LANES))
+                await asyncio.wait(
+                    {control, incoming or slot}, timeout=1.0, return_when=asyncio.FIRST_COMPLETED,
                 )
+                if control.done():
+                    msg, control = control.result(), None
+                    await self._stop_session(msg)
+                if incoming is not None and incoming.done():
+                    msg, incoming, slot = incoming.result(), None, None
+                    self._enqueue(msg)  # The session worker releases the slot after the turn
+        finally:
+            for fut in (slot, incoming, control):
+                if fut is not None:
+                    fut.cancel()
+            if slot is not None and slot.done() and not slot.cancelled():
+                self._turn_slots.release()
+            workers = list(self._session_workers.values())
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._session_workers.clear()
+            self._session_queues.clear()
+
+    @staticmethod
+    def _dispatch_key(msg: InboundMessage) -> str:
+        """Session key used to serialise messages (system messages route to their origin)."""
+        return msg.affinity_key
+
+    def _enqueue(self, msg: InboundMessage) -> None:
+        """Queue a message on its session and make sure a worker is draining that queue.
+
+        The caller holds one turn slot for the message, which the worker releases once the
+        message's turn ends, so at most ``max_concurrency`` messages are off the bus at once.
+        """
+        key = self._dispatch_key(msg)
+        if self.supersede_turns and msg.channel != "system" and (turn := self._active_turns.get(key)):
+            logger.info("Newer message supersedes in-flight turn for {}", key)
+            turn.cancel()
+        queue = self._session_queues.get(key)
+        if queue is None:
+            queue = self._session_queues[key] = asyncio.Queue()
+        queue.put_nowait(msg)
+        if key not in self._session_workers:
+            self._session_workers[key] = asyncio.create_task(self._session_worker(key, queue))
+
+    async def _session_worker(self, key: str, queue: asyncio.Queue[InboundMessage]) -> None:
+        """Process one session's messages in order, then exit once its queue is drained."""
+        try:
+            while not queue.empty():
+                msg = queue.get_nowait()
+                turn = asyncio.create_task(self._dispatch(msg))
+                self._active_turns[key] = turn
                 try:
-                    response = await self._process_message(msg)
-                    if response is not None:
-                        await self.bus.publish_outbound(response)
-                    elif msg.channel == "cli":
-                        await self.bus.publish_outbound(OutboundMessage(
-                            channel=msg.channel, chat_id=msg.chat_id, content="", metadata=msg.metadata or {},
-                        ))
-                except Exception as e:
-                    logger.error("Error processing message: {}", e)
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
-            except asyncio.TimeoutError:
-                continue
+                    await turn
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise  # The worker itself is shutting down
+                    logger.info("Turn for {} was cancelled", key)
+                finally:
+                    self._active_turns.pop(key, None)
+                    self._turn_slots.release()
+        finally:
+            self._session_workers.pop(key, None)
+            if queue.empty():
+                self._session_queues.pop(key, None)
+
+    async def _stop_session(self, msg: InboundMessage) -> None:
+        """Handle /stop: cancel the session's in-flight turn and drop its queued messages."""
+        key = self._dispatch_key(msg)
+        dropped = 0
+        if queue := self._session_queues.get(key):
+            while not queue.empty():
+                queue.get_nowait()
+                self._turn_slots.release()
+                dropped += 1
+        turn = self._active_turns.get(key)
+        if turn is not None:
+            turn.cancel()
+        stopped = turn is not None or dropped
+        await self.bus.publish_outbound(OutboundMessage(
+            channel=msg.channel, chat_id=msg.chat_id,
+            content="Stopped." if stopped else "Nothing to stop.",
+        ))
+
+    async def _dispatch(self, msg: InboundMessage) -> None:
+        """Process a single message and publish its response (or an error reply)."""
+        try:
+            response = await self._process_message(msg)
+            if response is not None:
+                await self.bus.publish_outbound(response)
+            elif msg.channel == "cli":
+                await self.bus.publish_outbound(OutboundMessage(
+                    channel=msg.channel, chat_id=msg.chat_id, content="", metadata=msg.metadata or {},
+                ))
+        except Exception as e:
+            logger.error("Error processing message: {}", e)
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=f"Sorry, I encountered an error: {str(e)}"
+            ))
 
     async def close_mcp(self) -> None:
-        """Close MCP connections."""
+        """Close MCP connections, finish background consolidation and close the HTTP pool if owned."""
+        await self.consolidation.stop()
+        self.sessions.flush()
         if self._mcp_stack:
             try:
                 await self._mcp_stack.aclose()
             except (RuntimeError, BaseExceptionGroup):
                 pass  # MCP SDK cancel scope cleanup is noisy but harmless
             self._mcp_stack = None
+        if self._owns_http:
+            await self.http.aclose()
 
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
         logger.info("Agent loop stopping")
 
-    def _get_consolidation_lock(self, session_key: str) -> asyncio.Lock:
-        lock = self._consolidation_locks.get(session_key)
-        if lock is None:
-            lock = asyncio.Lock()
-            self._consolidation_locks[session_key] = lock
-        return lock
-
-    def _prune_consolidation_lock(self, session_key: str, lock: asyncio.Lock) -> None:
-        """Drop lock entry if no longer in use."""
-        if not lock.locked():
-            self._consolidation_locks.pop(session_key, None)
-
     async def _process_message(
         self,
         msg: InboundMessage,
         session_key: str | None = None,
         on_progress: Callable[[str], Awaitable[None]] | None = None,
     ) -> OutboundMessage | None:
-        """Process a single inbound message and return the response."""
+        """Process a single inbound message and return the response (traced as a turn span)."""
+        with self.tracer.span("turn", channel=msg.channel, session=session_key or msg.affinity_key,
+                              input_chars=len(msg.content), media=len(msg.media)) as span:
+            try:
+                response = await self._process_turn(msg, session_key, on_progress)
+            finally:
+                if self.usage:
+                    await self.usage.aflush()
+            span.set(output_chars=len(response.content) if response else 0)
+            return response
+
+    async def _process_turn(
+        self,
+        msg: InboundMessage,
+        session_key: str | None,
+        on_progress: Callable[[str], Awaitable[None]] | None,
+    ) -> OutboundMessage | None:
         # System messages: parse origin from chat_id ("channel:chat_id")
         if msg.channel == "system":
             channel, chat_id = (msg.chat_id.split(":", 1) if ":" in msg.chat_id
@@ -308,14 +588,16 @@ class AgentLoop:
             key = f"{channel}:{chat_id}"
             session = self.sessions.get_or_create(key)
             self._set_tool_context(channel, chat_id, msg.metadata.get("message_id"))
-            history = session.get_history(max_messages=self.memory_window)
-            messages = self.context.build_messages(
-                history=history,
-                current_message=msg.content, channel=channel, chat_id=chat_id,
-            )
-            final_content, _, all_msgs = await self._run_agent_loop(messages)
+            history = self._get_history(session)
+            with self.tracer.span("context_build", history=len(history)):
+                messages = self.context.build_messages(
+                    history=history,
+                    current_message=msg.content, channel=channel, chat_id=chat_id,
+                    recalled=await self.context.recall_memory(msg.content),
+                )
+            final_content, _, all_msgs = await self._run_agent_loop(messages, usage_scope=(key, channel))
             self._save_turn(session, all_msgs, 1 + len(history))
-            self.sessions.save(session)
+            self._save_session(session)
             return OutboundMessage(channel=channel, chat_id=chat_id,
                                   content=final_content or "Background task completed.")
 
@@ -328,10 +610,8 @@ class AgentLoop:
         # Slash commands
         cmd = msg.content.strip().lower()
         if cmd == "/new":
-            lock = self._get_consolidation_lock(session.key)
-            self._consolidating.add(session.key)
             try:
-                async with lock:
+                async with self.consolidation.lock(session.key):
                     snapshot = session.messages[session.last_consolidated:]
                     if snapshot:
                         temp = Session(key=session.key)
@@ -348,49 +628,35 @@ class AgentLoop:
                     content="Memory archival failed, session not cleared. Please try again.",
                 )
             finally:
-                self._consolidating.discard(session.key)
-                self._prune_consolidation_lock(session.key, lock)
+                self.consolidation.release(session.key)
 
             session.clear()
-            self.sessions.save(session)
+            self._save_session(session)
             self.sessions.invalidate(session.key)
             return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id,
                                   content="New session started.")
         if cmd == "/help":
             return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id,
-                                  content="🐈 nanobot commands:\n/new — Start a new conversation\n/help — Show available commands")
-
-        unconsolidated = len(session.messages) - session.last_consolidated
-        if (unconsolidated >= self.memory_window and session.key not in self._consolidating):
-            self._consolidating.add(session.key)
-            lock = self._get_consolidation_lock(session.key)
+                                  content="🐈 nanobot commands:\n/new — Start a new conversation\n/stop — Stop the current task\n/help — Show available commands")
 
-            async def _consolidate_and_unlock():
-                try:
-                    async with lock:
-                        await self._consolidate_memory(session)
-                finally:
-                    self._consolidating.discard(session.key)
-                    self._prune_consolidation_lock(session.key, lock)
-                    _task = asyncio.current_task()
-                    if _task is not None:
-                        self._consolidation_tasks.discard(_task)
-
-            _task = asyncio.create_task(_consolidate_and_unlock())
-            self._consolidation_tasks.add(_task)
+        if self._needs_consolidation(session):
+            self.consolidation.submit(session)
 
         self._set_tool_context(msg.channel, msg.chat_id, msg.metadata.get("message_id"))
         if message_tool := self.tools.get("message"):
             if isinstance(message_tool, MessageTool):
                 message_tool.start_turn()
 
-        history = session.get_history(max_messages=self.memory_window)
-        initial_messages = self.context.build_messages(
-            history=history,
-            current_message=msg.content,
-            media=msg.media if msg.media else None,
-            channel=msg.channel, chat_id=msg.chat_id,
-        )
+        history = self._get_history(session)
+        with self.tracer.span("context_build", history=len(history)) as span:
+            initial_messages = self.context.build_messages(
+                history=history,
+                current_message=msg.content,
+                media=msg.media if msg.media else None,
+                channel=msg.channel, chat_id=msg.chat_id,
+                recalled=await self.context.recall_memory(msg.content),
+            )
+            span.set(system_chars=len(initial_messages[0]["content"]))
 
         async def _bus_progress(content: str, *, tool_hint: bool = False) -> None:
             meta = dict(msg.metadata or {})
@@ -400,9 +666,29 @@ class AgentLoop:
                 channel=msg.channel, chat_id=msg.chat_id, content=content, metadata=meta,
             ))
 
-        final_content, _, all_msgs = await self._run_agent_loop(
-            initial_messages, on_progress=on_progress or _bus_progress,
-        )
+        final_stream_id: str | None = None
+
+        async def _bus_stream(stream_id: str, content: str, *, done: bool = False) -> None:
+            nonlocal final_stream_id
+            if done:
+                final_stream_id = stream_id  # The final reply replaces the streamed message
+                return
+            meta = dict(msg.metadata or {})
+            meta.update(_progress=True, _tool_hint=False, _stream=True, _stream_id=stream_id)
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=msg.channel, chat_id=msg.chat_id, content=content, metadata=meta,
+            ))
+
+        try:
+            final_content, _, all_msgs = await self._run_agent_loop(
+                initial_messages, on_progress=on_progress or _bus_progress,
+                on_stream=_bus_stream if self.stream_responses and on_progress is None else None,
+                usage_scope=(key, msg.channel),
+            )
+        except asyncio.CancelledError:
+            # initial_messages is extended in place, so it holds the partial turn
+            self._save_cancelled_turn(session, initial_messages, 1 + len(history))
+            raise
 
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
@@ -411,15 +697,18 @@ class AgentLoop:
         logger.info("Response to {}:{}: {}", msg.channel, msg.sender_id, preview)
 
         self._save_turn(session, all_msgs, 1 + len(history))
-        self.sessions.save(session)
+        self._save_session(session)
 
         if message_tool := self.tools.get("message"):
             if isinstance(message_tool, MessageTool) and message_tool._sent_in_turn:
                 return None
 
+        meta = dict(msg.metadata or {})
+        if final_stream_id:
+            meta["_stream_id"] = final_stream_id
         return OutboundMessage(
             channel=msg.channel, chat_id=msg.chat_id, content=final_content,
-            metadata=msg.metadata or {},
+            metadata=meta,
         )
 
     _TOOL_RESULT_MAX_CHARS = 500
@@ -437,11 +726,56 @@ class AgentLoop:
             session.messages.append(entry)
         session.updated_at = datetime.now()
 
+    def _save_cancelled_turn(self, session: Session, messages: list[dict], skip: int) -> None:
+        """
+        Save what a cancelled turn finished, so the session stays well-formed.
+
+        Completed tool rounds are kept. A trailing assistant message whose tool
+        calls did not all return is rolled back, and a short note records that
+        the turn was stopped.
+        """
+        messages = list(messages)
+        for i in range(len(messages) - 1, skip - 1, -1):
+            calls = messages[i].get("tool_calls") if messages[i].get("role") == "assistant" else None
+            if calls:
+                if len(messages) - i - 1 < len(calls):
+                    del messages[i:]
+                break
+        messages.append({"role": "assistant", "content": "(Stopped before finishing this request.)"})
+        self._save_turn(session, messages, skip)
+        self._save_session(session)
+
+    def _save_session(self, session: Session) -> None:
+        with self.tracer.span("session_save", messages=len(session.messages)):
+            self.sessions.save(session)
+
+    def _get_history(self, session: Session) -> list[dict]:
+        """Recent history bounded by memory_window messages and history_max_tokens tokens."""
+        return session.get_history(
+            max_messages=self.memory_window, max_tokens=self.history_max_tokens, counter=self.tokens,
+        )
+
+    def _needs_consolidation(self, session: Session) -> bool:
+        """True once unconsolidated history no longer fits the token budget (or message window)."""
+        unconsolidated = len(session.messages) - session.last_consolidated
+        if unconsolidated <= 0:
+            return False
+        if unconsolidated >= self.memory_window:
+            return True
+        pending = session.token_counts(self.tokens)[session.last_consolidated:]
+        return sum(pending) >= self.history_max_tokens
+
     async def _consolidate_memory(self, session, archive_all: bool = False) -> bool:
         """Delegate to MemoryStore.consolidate(). Returns True on success."""
-        return await MemoryStore(self.workspace).consolidate(
-            session, self.provider, self.model,
-            archive_all=archive_all, memory_window=self.memory_window,
+        # Keep what fits in half the budgets so the next turns have headroom before re-triggering.
+        keep_count = len(session.messages) - session.window_start(
+            max_messages=self.memory_window // 2,
+            max_tokens=self.history_max_tokens // 2,
+            counter=self.tokens,
+        )
+        return await self.memory.consolidate(
+            session, self.provider, self.consolidation_model,
+            archive_all=archive_all, memory_window=self.memory_window, keep_count=keep_count,
         )
 
     async def process_direct(
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import sqlite3
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from loguru import logger
 
+from nanobot.agent.history_index import HistoryIndex
+from nanobot.agent.memory_doc import MemoryDocument, MemoryOpError
 from nanobot.utils.helpers import ensure_dir
 
 if TYPE_CHECKING:
@@ -27,15 +32,32 @@ _SAVE_MEMORY_TOOL = [
                     "history_entry": {
                         "type": "string",
                         "description": "A paragraph (2-5 sentences) summarizing key events/decisions/topics. "
-                        "Start with [YYYY-MM-DD HH:MM]. Include detail useful for grep search.",
+                        "Start with [YYYY-MM-DD HH:MM]. Include detail useful for keyword search.",
                     },
-                    "memory_update": {
-                        "type": "string",
-                        "description": "Full updated long-term memory as markdown. Include all existing "
-                        "facts plus new ones. Return unchanged if nothing new.",
+                    "memory_ops": {
+                        "type": "array",
+                        "description": "Changes to long-term memory, only for facts that are new, changed or "
+                        "no longer true. Never restate unchanged facts. Empty if nothing changed.",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "op": {"type": "string", "enum": ["add", "update", "delete"]},
+                                "id": {
+                                    "type": "string",
+                                    "description": "Fact id shown in brackets, e.g. '2.3' (update/delete)",
+                                },
+                                "section": {
+                                    "type": "string",
+                                    "description": "Section title to add the fact under (add); a new section "
+                                    "is created if none matches",
+                                },
+                                "text": {"type": "string", "description": "One-line fact (add/update)"},
+                            },
+                            "required": ["op"],
+                        },
                     },
                 },
-                "required": ["history_entry", "memory_update"],
+                "required": ["history_entry", "memory_ops"],
             },
         },
     }
@@ -43,12 +65,14 @@ _SAVE_MEMORY_TOOL = [
 
 
 class MemoryStore:
-    """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (grep-searchable log)."""
+    """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (full-text indexed log)."""
 
     def __init__(self, workspace: Path):
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
         self.history_file = self.memory_dir / "HISTORY.md"
+        self.history_index = HistoryIndex(self.history_file, self.memory_dir / ".history.db")
+        self._write_lock = asyncio.Lock()  # Serialises consolidation writes sharing this store
 
     def read_long_term(self) -> str:
         if self.memory_file.exists():
@@ -56,12 +80,35 @@ class MemoryStore:
         return ""
 
     def write_long_term(self, content: str) -> None:
-        self.memory_file.write_text(content, encoding="utf-8")
+        tmp = self.memory_file.with_name(f".{self.memory_file.name}.tmp")
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, self.memory_file)  # Readers never see a half-written file
+
+    def apply_memory_ops(self, ops: list[dict]) -> int:
+        """
+        Apply save_memory add/update/delete operations to MEMORY.md as one transaction.
+
+        Returns the number of operations that changed something. Raises
+        MemoryOpError (nothing written) if any operation is invalid.
+        """
+        doc = MemoryDocument(self.read_long_term())
+        changed = doc.apply(ops)
+        if changed:
+            self.write_long_term(doc.render())
+        return changed
 
     def append_history(self, entry: str) -> None:
+        """Append an entry to HISTORY.md; the full-text index catches up in ``index_history``."""
         with open(self.history_file, "a", encoding="utf-8") as f:
             f.write(entry.rstrip() + "\n\n")
 
+    async def index_history(self) -> None:
+        """Bring the full-text index up to date with HISTORY.md in a worker thread."""
+        try:
+            await asyncio.to_thread(self.history_index.sync)
+        except sqlite3.Error as e:
+            logger.warning("Failed to index HISTORY.md: {}", e)  # Caught up on the next sync or search
+
     def get_memory_context(self) -> str:
         long_term = self.read_long_term()
         return f"## Long-term Memory\n{long_term}" if long_term else ""
@@ -74,9 +121,11 @@ class MemoryStore:
         *,
         archive_all: bool = False,
         memory_window: int = 50,
+        keep_count: int | None = None,
     ) -> bool:
         """Consolidate old messages into MEMORY.md + HISTORY.md via LLM tool call.
 
+        Keeps the most recent keep_count messages (default memory_window // 2).
         Returns True on success (including no-op), False on failure.
         """
         if archive_all:
@@ -84,12 +133,13 @@ class MemoryStore:
             keep_count = 0
             logger.info("Memory consolidation (archive_all): {} messages", len(session.messages))
         else:
-            keep_count = memory_window // 2
+            if keep_count is None:
+                keep_count = memory_window // 2
             if len(session.messages) <= keep_count:
                 return True
             if len(session.messages) - session.last_consolidated <= 0:
                 return True
-            old_messages = session.messages[session.last_consolidated:-keep_count]
+            old_messages = session.messages[session.last_consolidated:len(session.messages) - keep_count]
             if not old_messages:
                 return True
             logger.info("Memory consolidation: {} to consolidate, {} keep", len(old_messages), keep_count)
@@ -101,10 +151,11 @@ class MemoryStore:
             tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
             lines.append(f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {m['content']}")
 
-        current_memory = self.read_long_term()
+        snapshot = self.read_long_term()
+        current_memory = MemoryDocument(snapshot).annotated()
         prompt = f"""Process this conversation and call the save_memory tool with your consolidation.
 
-## Current Long-term Memory
+## Current Long-term Memory (fact ids in brackets)
 {current_memory or "(empty)"}
 
 ## Conversation to Process
@@ -113,7 +164,8 @@ class MemoryStore:
         try:
             response = await provider.chat(
                 messages=[
-                    {"role": "system", "content": "You are a memory consolidation agent. Call the save_memory tool with your consolidation of the conversation."},
+                    {"role": "system", "content": "You are a memory consolidation agent. Call the save_memory tool "
+                     "with a history entry and only the memory operations needed to bring long-term memory up to date."},
                     {"role": "user", "content": prompt},
                 ],
                 tools=_SAVE_MEMORY_TOOL,
@@ -125,19 +177,32 @@ class MemoryStore:
                 return False
 
             args = response.tool_calls[0].arguments
-            if entry := args.get("history_entry"):
-                if not isinstance(entry, str):
-                    entry = json.dumps(entry, ensure_ascii=False)
-                self.append_history(entry)
-            if update := args.get("memory_update"):
-                if not isinstance(update, str):
-                    update = json.dumps(update, ensure_ascii=False)
-                if update != current_memory:
-                    self.write_long_term(update)
+            ops = args.get("memory_ops") or []
+            if isinstance(ops, str):
+                ops = json.loads(ops) if ops.strip() else []
+            if isinstance(ops, dict):
+                ops = [ops]
+            async with self._write_lock:
+                if any(isinstance(op, dict) and op.get("op") != "add" for op in ops) \
+                        and self.read_long_term() != snapshot:
+                    # Fact ids refer to the memory we showed; another write renumbered them
+                    raise MemoryOpError("MEMORY.md changed during consolidation")
+                changed = self.apply_memory_ops(ops)  # Validated as a whole before the history entry is written
+                if entry := args.get("history_entry"):
+                    if not isinstance(entry, str):
+                        entry = json.dumps(entry, ensure_ascii=False)
+                    self.append_history(entry)
+            await self.index_history()
 
             session.last_consolidated = 0 if archive_all else len(session.messages) - keep_count
-            logger.info("Memory consolidation done: {} messages, last_consolidated={}", len(session.messages), session.last_consolidated)
+            logger.info(
+                "Memory consolidation done: {} messages, last_consolidated={}, {} memory changes",
+                len(session.messages), session.last_consolidated, changed,
+            )
             return True
+        except (MemoryOpError, json.JSONDecodeError) as e:
+            logger.warning("Memory consolidation: rejected save_memory operations: {}", e)
+            return False
         except Exception:
             logger.exception("Memory consolidation failed")
             return False
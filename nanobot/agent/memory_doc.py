@@ -0,0 +1,239 @@
+"""Structured view of MEMORY.md for incremental, operation-based updates."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET = re.compile(r"^(\s*)(?:[-*+]|\d+[.)])\s+(.*)$")
+_PLACEHOLDER = re.compile(r"^\(.*\)$")
+_RULE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+
+OPS = ("add", "update", "delete")
+
+
+@dataclass
+class _Block:
+    lines: list[str]
+    fact: str | None = None  # Set for list items, which are addressable facts
+
+    @classmethod
+    def new_fact(cls, text: str) -> "_Block":
+        return cls([f"- {text}"], text)
+
+
+@dataclass
+class _Section:
+    heading: str  # "" for text before the first heading
+    blocks: list[_Block] = field(default_factory=list)
+    dirty: bool = False
+    raw: str = ""  # Original text, reused verbatim while the section is unchanged
+
+    @property
+    def title(self) -> str:
+        m = _HEADING.match(self.heading)
+        return m.group(2) if m else ""
+
+    @property
+    def facts(self) -> list[_Block]:
+        return [b for b in self.blocks if b.fact is not None]
+
+    def render(self) -> str:
+        if not self.dirty:
+            return self.raw
+        lines = ([self.heading] if self.heading else []) + [line for b in self.blocks for line in b.lines]
+        return "\n".join(lines) + "\n"
+
+
+class MemoryOpError(ValueError):
+    """A save_memory operation that cannot be applied to the current memory."""
+
+
+def _clean_fact(text: Any) -> str:
+    if not isinstance(text, str) or not text.strip():
+        raise MemoryOpError("text must be a non-empty string")
+    text = " ".join(text.split())
+    m = _BULLET.match(text)
+    return m.group(2) if m else text
+
+
+class MemoryDocument:
+    """
+    MEMORY.md as ordered sections (one per heading) holding facts (list items).
+
+    Facts are addressed as ``<section>.<fact>`` (1-based, in file order), the
+    ids shown by ``annotated()``. ``apply()`` validates a whole batch of
+    add/update/delete operations before changing anything, and ``render()``
+    reuses the original text of every section the batch did not touch, so
+    hand-written formatting elsewhere in the file survives.
+    """
+
+    def __init__(self, text: str = ""):
+        self.sections: list[_Section] = []
+        self.footer = ""  # Trailing "---" + note, kept after any new sections
+        self._parse(text)
+
+    def _parse(self, text: str) -> None:
+        lines = text.splitlines()
+        footer_at = self._footer_start(lines)
+        if footer_at is not None:
+            self.footer = "\n".join(lines[footer_at:]) + "\n"
+            lines = lines[:footer_at]
+        current = _Section("")
+        raw: list[str] = []
+        for line in lines:
+            if _HEADING.match(line):
+                if current.heading or raw:
+                    current.raw = "\n".join(raw) + "\n"
+                    self.sections.append(current)
+                current, raw = _Section(line), [line]
+                continue
+            raw.append(line)
+            bullet = _BULLET.match(line)
+            last = current.blocks[-1] if current.blocks else None
+            if bullet and not bullet.group(1):
+                current.blocks.append(_Block([line], bullet.group(2).strip()))
+            elif last is not None and last.fact is not None and line[:1].isspace() and line.strip():
+                last.lines.append(line)  # Continuation of a wrapped or nested list item
+                last.fact = f"{last.fact} {line.strip()}"
+            else:
+                current.blocks.append(_Block([line]))
+        if current.heading or raw:
+            current.raw = "\n".join(raw) + "\n"
+            self.sections.append(current)
+
+    @staticmethod
+    def _footer_start(lines: list[str]) -> int | None:
+        """Index of a final horizontal rule followed only by plain text (the template's footer note)."""
+        for i in range(len(lines) - 1, -1, -1):
+            if _RULE.match(lines[i]):
+                rest = lines[i + 1:]
+                if not any(_HEADING.match(x) or _BULLET.match(x) for x in rest):
+                    return i
+                return None
+            if _HEADING.match(lines[i]):
+                return None
+        return None
+
+    def _numbered(self) -> list[tuple[int, _Section]]:
+        """Sections with their ids; text before the first heading is section 0."""
+        start = 0 if self.sections and not self.sections[0].heading else 1
+        return list(enumerate(self.sections, start))
+
+    def annotated(self) -> str:
+        """The document with ``[id]`` markers on sections and facts, for the consolidation prompt."""
+        out = []
+        for n, section in self._numbered():
+            if section.heading:
+                out.append(f"{section.heading}  [{n}]")
+            fact_no = 0
+            for block in section.blocks:
+                if block.fact is not None:
+                    fact_no += 1
+                    out.append(f"- [{n}.{fact_no}] {block.fact}")
+                else:
+                    out.extend(block.lines)
+        return "\n".join(out).strip()
+
+    def _find_fact(self, fact_id: Any) -> tuple[_Section, _Block]:
+        m = re.fullmatch(r"\s*\[?(\d+)\.(\d+)\]?\s*", str(fact_id))
+        if not m:
+            raise MemoryOpError(f"invalid fact id {fact_id!r} (expected e.g. '2.3')")
+        sections = dict(self._numbered())
+        section = sections.get(int(m.group(1)))
+        facts = section.facts if section else []
+        idx = int(m.group(2)) - 1
+        if not 0 <= idx < len(facts):
+            raise MemoryOpError(f"no fact with id {fact_id}")
+        return section, facts[idx]
+
+    def _section_named(self, title: Any) -> _Section:
+        if not isinstance(title, str) or not title.strip():
+            raise MemoryOpError("add needs a section title")
+        title = " ".join(title.lstrip("#").split())
+        for section in self.sections:
+            if section.heading and section.title.lower() == title.lower():
+                return section
+        level = next((_HEADING.match(s.heading).group(1) for s in reversed(self.sections) if s.heading), "##")
+        section = _Section(f"{level} {title}", [_Block([""])], dirty=True)
+        if self.sections and self.sections[-1].blocks and self.sections[-1].blocks[-1].lines != [""]:
+            self.sections[-1].blocks.append(_Block([""]))
+            self.sections[-1].dirty = True
+        self.sections.append(section)
+        return section
+
+    @staticmethod
+    def _insert_fact(section: _Section, text: str) -> None:
+        blocks = section.blocks
+        facts = [i for i, b in enumerate(blocks) if b.fact is not None]
+        if facts:
+            blocks.insert(facts[-1] + 1, _Block.new_fact(text))
+            return
+        # First fact of the section: drop template placeholders like "(Things to remember)"
+        kept: list[_Block] = []
+        for b in blocks:
+            if _PLACEHOLDER.match("\n".join(b.lines).strip()):
+                continue
+            if b.lines == [""] and kept and kept[-1].lines == [""]:
+                continue
+            kept.append(b)
+        if not kept or kept[0].lines != [""]:
+            kept.insert(0, _Block([""]))
+        kept.insert(1, _Block.new_fact(text))
+        if len(kept) == 2 or kept[2].lines != [""]:
+            kept.insert(2, _Block([""]))
+        blocks[:] = kept
+
+    def apply(self, ops: list[dict[str, Any]]) -> int:
+        """
+        Apply add/update/delete operations atomically; returns how many changed something.
+
+        Raises MemoryOpError, leaving the document untouched, if any operation is invalid.
+        """
+        # Resolve every id against the current numbering before anything moves
+        planned: list[tuple[str, _Section | None, _Block | None, str | None, Any]] = []
+        touched: set[int] = set()
+        for i, op in enumerate(ops):
+            if not isinstance(op, dict) or op.get("op") not in OPS:
+                raise MemoryOpError(f"operation {i + 1}: op must be one of {', '.join(OPS)}")
+            kind = op["op"]
+            try:
+                if kind == "add":
+                    planned.append((kind, None, None, _clean_fact(op.get("text")), op.get("section")))
+                    if not isinstance(op.get("section"), str) or not op["section"].strip():
+                        raise MemoryOpError("add needs a section title")
+                    continue
+                section, block = self._find_fact(op.get("id"))
+                if id(block) in touched:
+                    raise MemoryOpError(f"fact {op.get('id')} is changed twice")
+                touched.add(id(block))
+                text = _clean_fact(op.get("text")) if kind == "update" else None
+                planned.append((kind, section, block, text, None))
+            except MemoryOpError as e:
+                raise MemoryOpError(f"operation {i + 1} ({kind}): {e}") from None
+
+        changed = 0
+        for kind, section, block, text, title in planned:
+            if kind == "add":
+                section = self._section_named(title)
+                if any(f.fact.lower() == text.lower() for f in section.facts):
+                    continue
+                self._insert_fact(section, text)
+            elif kind == "update":
+                if block.fact == text:
+                    continue
+                block.lines, block.fact = _Block.new_fact(text).lines, text
+            else:
+                # By identity: duplicate facts compare equal, and remove() would take the first
+                del section.blocks[next(i for i, b in enumerate(section.blocks) if b is block)]
+            section.dirty = True
+            changed += 1
+        return changed
+
+    def render(self) -> str:
+        text = "".join(s.render() for s in self.sections)
+        if self.footer:
+            text = text.rstrip("\n") + "\n\n" + self.footer if text.strip() else self.footer
+        return text
@@ -4,88 +4,305 @@ import json
 import os
 import re
 import shutil
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
+
+from loguru import logger
 
 # Default builtin skills directory (relative to this file)
 BUILTIN_SKILLS_DIR = Path(__file__).parent.parent / "skills"
 
+_FRONTMATTER_RE = re.compile(r"^---\n(.*?)\n---\n?", re.DOTALL)
+_MAPPING_LINE_RE = re.compile(r"^[\w.-]+\s*:(\s|$)")
+
+
+def _parse_scalar(raw: str) -> Any:
+    """Parse a single YAML scalar or flow collection (JSON-compatible subset)."""
+    raw = raw.strip()
+    if not raw:
+        return None
+    if raw[0] in "{[":
+        try:
+            return json.loads(raw)
+        except ValueError:
+            if raw[0] == "[" and raw.endswith("]"):
+                return [_parse_scalar(item) for item in raw[1:-1].split(",") if item.strip()]
+            return raw
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw[1:-1]
+    if len(raw) >= 2 and raw[0] == raw[-1] == "'":
+        return raw[1:-1].replace("''", "'")
+    if " #" in raw:
+        raw = raw.split(" #", 1)[0].rstrip()
+    lowered = raw.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in ("null", "~"):
+        return None
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def _parse_block(lines: list[tuple[int, str]], i: int, indent: int) -> tuple[Any, int]:
+    """Parse an indented block mapping or sequence starting at lines[i]."""
+    if lines[i][1] == "-" or lines[i][1].startswith("- "):
+        items: list[Any] = []
+        while i < len(lines) and lines[i][0] == indent and (lines[i][1] == "-" or lines[i][1].startswith("- ")):
+            rest = lines[i][1][1:].strip()
+            i += 1
+            end = i
+            while end < len(lines) and lines[end][0] > indent:
+                end += 1
+            if rest and _MAPPING_LINE_RE.match(rest):
+                # "- key: value" starts a mapping item
+                value, _ = _parse_block([(indent + 2, rest)] + lines[i:end], 0, indent + 2)
+            elif rest:
+                value = _parse_scalar(rest)
+            elif end > i:
+                value, _ = _parse_block(lines[i:end], 0, lines[i][0])
+            else:
+                value = None
+            items.append(value)
+            i = end
+        return items, i
+
+    result: dict[str, Any] = {}
+    while i < len(lines) and lines[i][0] == indent:
+        key, _, rest = lines[i][1].partition(":")
+        key = key.strip().strip("\"'")
+        rest = rest.strip()
+        i += 1
+        end = i
+        while end < len(lines) and lines[end][0] > indent:
+            end += 1
+        if rest in ("|", "|-", ">", ">-"):
+            sep = "\n" if rest[0] == "|" else " "
+            result[key] = sep.join(text for _, text in lines[i:end])
+        elif rest:
+            result[key] = _parse_scalar(rest)
+        elif end > i:
+            result[key], _ = _parse_block(lines[i:end], 0, lines[i][0])
+        else:
+            result[key] = None
+        i = end
+    return result, i
+
+
+def parse_frontmatter(content: str) -> dict[str, Any] | None:
+    """
+    Parse the YAML frontmatter of a markdown document.
+
+    Supports the subset used by skills: nested mappings and sequences by
+    indentation, quoted and plain scalars, booleans/numbers/null, block
+    scalars (| and >), and JSON-style flow collections.
+
+    Returns:
+        Frontmatter dict, or None if the document has no frontmatter.
+    """
+    match = _FRONTMATTER_RE.match(content)
+    if not match:
+        return None
+    lines = [
+        (len(line) - len(line.lstrip(" ")), line.strip())
+        for line in match.group(1).split("\n")
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+    if not lines:
+        return {}
+    value, _ = _parse_block(lines, 0, lines[0][0])
+    return value if isinstance(value, dict) else {}
+
+
+@dataclass
+class SkillEntry:
+    """A parsed SKILL.md file."""
+
+    name: str
+    path: Path
+    source: str
+    stamp: tuple[int, int]  # (mtime_ns, size) of SKILL.md when parsed
+    content: str
+    frontmatter: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def nanobot(self) -> dict[str, Any]:
+        """nanobot metadata from frontmatter (supports nanobot and openclaw keys)."""
+        raw = self.frontmatter.get("metadata")
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                return {}
+        if not isinstance(raw, dict):
+            return {}
+        meta = raw.get("nanobot", raw.get("openclaw", {}))
+        return meta if isinstance(meta, dict) else {}
+
+
+class SkillIndex:
+    """
+    In-memory index of skill directories.
+
+    Each SKILL.md is read and its frontmatter parsed once. A root is rescanned
+    immediately when its directory mtime changes, and otherwise at most once
+    per ``ttl`` seconds (which catches in-place edits of SKILL.md files).
+    Availability checks (bins on PATH, env vars) are cached for ``ttl`` too.
+    ``version`` increases whenever anything observable changes.
+    """
+
+    def __init__(self, roots: list[tuple[Path | None, str]], ttl: float = 30.0):
+        self.roots = [(path, source) for path, source in roots if path]
+        self.ttl = ttl
+        self.version = 0
+        self._by_root: list[dict[str, SkillEntry]] = [{} for _ in self.roots]
+        self._root_mtimes: list[int | None] = [-1] * len(self.roots)
+        self._scanned_at = float("-inf")
+        self._entries: dict[str, SkillEntry] = {}
+        self._availability: dict[str, tuple[float, list[str]]] = {}
+
+    def refresh(self, force: bool = False) -> None:
+        """Rescan roots whose directory changed, or all roots once the TTL expired."""
+        now = time.monotonic()
+        expired = force or now - self._scanned_at >= self.ttl
+        changed = False
+        for i, (root, _) in enumerate(self.roots):
+            try:
+                mtime = root.stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            if expired or mtime != self._root_mtimes[i]:
+                self._root_mtimes[i] = mtime
+                changed |= self._scan(i)
+        if expired:
+            self._scanned_at = now
+        if changed:
+            merged: dict[str, SkillEntry] = {}
+            for entries in self._by_root:  # earlier roots take priority
+                for name, entry in entries.items():
+                    merged.setdefault(name, entry)
+            self._entries = dict(sorted(merged.items()))
+            self._availability = {k: v for k, v in self._availability.items() if k in self._entries}
+            self.version += 1
+
+    def _scan(self, i: int) -> bool:
+        """Rescan one root, re-reading only SKILL.md files whose stamp changed."""
+        root, source = self.roots[i]
+        old = self._by_root[i]
+        new: dict[str, SkillEntry] = {}
+        if root.is_dir():
+            for skill_file in root.glob("*/SKILL.md"):
+                try:
+                    st = skill_file.stat()
+                except OSError:
+                    continue
+                name = skill_file.parent.name
+                stamp = (st.st_mtime_ns, st.st_size)
+                entry = old.get(name)
+                if entry is None or entry.stamp != stamp:
+                    try:
+                        content = skill_file.read_text(encoding="utf-8")
+                    except OSError as e:
+                        logger.warning("Failed to read skill {}: {}", skill_file, e)
+                        continue
+                    entry = SkillEntry(
+                        name=name, path=skill_file, source=source, stamp=stamp,
+                        content=content, frontmatter=parse_frontmatter(content) or {},
+                    )
+                new[name] = entry
+        self._by_root[i] = new
+        return new.keys() != old.keys() or any(new[k] is not old[k] for k in new)
+
+    def entries(self) -> list[SkillEntry]:
+        """All skills, workspace overriding builtin, sorted by name."""
+        self.refresh()
+        return list(self._entries.values())
+
+    def get(self, name: str) -> SkillEntry | None:
+        self.refresh()
+        return self._entries.get(name)
+
+    def missing_requirements(self, entry: SkillEntry) -> list[str]:
+        """Unmet requirements of a skill, cached for ``ttl`` seconds."""
+        now = time.monotonic()
+        cached = self._availability.get(entry.name)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+        requires = entry.nanobot.get("requires", {})
+        missing = [f"CLI: {b}" for b in requires.get("bins", []) if not shutil.which(b)]
+        missing += [f"ENV: {e}" for e in requires.get("env", []) if not os.environ.get(e)]
+        if cached and cached[1] != missing:
+            self.version += 1
+        self._availability[entry.name] = (now, missing)
+        return missing
+
 
 class SkillsLoader:
     """
     Loader for agent skills.
-    
+
     Skills are markdown files (SKILL.md) that teach the agent how to use
     specific tools or perform certain tasks.
     """
-    
-    def __init__(self, workspace: Path, builtin_skills_dir: Path | None = None):
+
+    def __init__(self, workspace: Path, builtin_skills_dir: Path | None = None, cache_ttl: float = 30.0):
         self.workspace = workspace
         self.workspace_skills = workspace / "skills"
         self.builtin_skills = builtin_skills_dir or BUILTIN_SKILLS_DIR
-    
+        self.index = SkillIndex(
+            [(self.workspace_skills, "workspace"), (self.builtin_skills, "builtin")], ttl=cache_ttl
+        )
+
     def list_skills(self, filter_unavailable: bool = True) -> list[dict[str, str]]:
         """
         List all available skills.
-        
+
         Args:
             filter_unavailable: If True, filter out skills with unmet requirements.
-        
+
         Returns:
             List of skill info dicts with 'name', 'path', 'source'.
         """
-        skills = []
-        
-        # Workspace skills (highest priority)
-        if self.workspace_skills.exists():
-            for skill_dir in self.workspace_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists():
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "workspace"})
-        
-        # Built-in skills
-        if self.builtin_skills and self.builtin_skills.exists():
-            for skill_dir in self.builtin_skills.iterdir():
-                if skill_dir.is_dir():
-                    skill_file = skill_dir / "SKILL.md"
-                    if skill_file.exists() and not any(s["name"] == skill_dir.name for s in skills):
-                        skills.append({"name": skill_dir.name, "path": str(skill_file), "source": "builtin"})
-        
-        # Filter by requirements
-        if filter_unavailable:
-            return [s for s in skills if self._check_requirements(self._get_skill_meta(s["name"]))]
-        return skills
-    
+        return [
+            {"name": e.name, "path": str(e.path), "source": e.source}
+            for e in self.index.entries()
+            if not filter_unavailable or not self.index.missing_requirements(e)
+        ]
+
+    def fingerprint(self) -> tuple:
+        """Change signature for everything the skills prompt depends on."""
+        for entry in self.index.entries():
+            self.index.missing_requirements(entry)
+        return (self.index.version,)
+
     def load_skill(self, name: str) -> str | None:
         """
         Load a skill by name.
-        
+
         Args:
             name: Skill name (directory name).
-        
+
         Returns:
             Skill content or None if not found.
         """
-        # Check workspace first
-        workspace_skill = self.workspace_skills / name / "SKILL.md"
-        if workspace_skill.exists():
-            return workspace_skill.read_text(encoding="utf-8")
-        
-        # Check built-in
-        if self.builtin_skills:
-            builtin_skill = self.builtin_skills / name / "SKILL.md"
-            if builtin_skill.exists():
-                return builtin_skill.read_text(encoding="utf-8")
-        
-        return None
-    
+        entry = self.index.get(name)
+        return entry.content if entry else None
+
     def load_skills_for_context(self, skill_names: list[str]) -> str:
         """
         Load specific skills for inclusion in agent context.
-        
+
         Args:
             skill_names: List of skill names to load.
-        
+
         Returns:
             Formatted skills content.
         """
@@ -95,69 +312,46 @@ class SkillsLoader:
             if content:
                 content = self._strip_frontmatter(content)
                 parts.append(f"### Skill: {name}\n\n{content}")
-        
+
         return "\n\n---\n\n".join(parts) if parts else ""
-    
+
     def build_skills_summary(self) -> str:
         """
         Build a summary of all skills (name, description, path, availability).
-        
+
         This is used for progressive loading - the agent can read the full
         skill content using read_file when needed.
-        
+
         Returns:
             XML-formatted skills summary.
         """
-        all_skills = self.list_skills(filter_unavailable=False)
+        all_skills = self.index.entries()
         if not all_skills:
             return ""
-        
+
         def escape_xml(s: str) -> str:
             return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        
+
         lines = ["<skills>"]
-        for s in all_skills:
-            name = escape_xml(s["name"])
-            path = s["path"]
-            desc = escape_xml(self._get_skill_description(s["name"]))
-            skill_meta = self._get_skill_meta(s["name"])
-            available = self._check_requirements(skill_meta)
-            
-            lines.append(f"  <skill available=\"{str(available).lower()}\">")
+        for entry in all_skills:
+            name = escape_xml(entry.name)
+            desc = escape_xml(str(entry.frontmatter.get("description") or entry.name))
+            missing = self.index.missing_requirements(entry)
+
+            lines.append(f"  <skill available=\"{str(not missing).lower()}\">")
             lines.append(f"    <name>{name}</name>")
             lines.append(f"    <description>{desc}</description>")
-            lines.append(f"    <location>{path}</location>")
-            
+            lines.append(f"    <location>{entry.path}</location>")
+
             # Show missing requirements for unavailable skills
-            if not available:
-                missing = self._get_missing_requirements(skill_meta)
-                if missing:
-                    lines.append(f"    <requires>{escape_xml(missing)}</requires>")
-            
+            if missing:
+                lines.append(f"    <requires>{escape_xml(', '.join(missing))}</requires>")
+
             lines.append(f"  </skill>")
         lines.append("</skills>")
-        
+
         return "\n".join(lines)
-    
-    def _get_missing_requirements(self, skill_meta: dict) -> str:
-        """Get a description of missing requirements."""
-        missing = []
-        requires = skill_meta.get("requires", {})
-        for b in requires.get("bins", []):
-            if not shutil.which(b):
-                missing.append(f"CLI: {b}")
-        for env in requires.get("env", []):
-            if not os.environ.get(env):
-                missing.append(f"ENV: {env}")
-        return ", ".join(missing)
-    
-    def _get_skill_description(self, name: str) -> str:
-        """Get the description of a skill from its frontmatter."""
-        meta = self.get_skill_metadata(name)
-        if meta and meta.get("description"):
-            return meta["description"]
-        return name  # Fallback to skill name
-    
+
     def _strip_frontmatter(self, content: str) -> str:
         """Remove YAML frontmatter from markdown content."""
         if content.startswith("---"):
@@ -165,64 +359,27 @@ class SkillsLoader:
             if match:
                 return content[match.end():].strip()
         return content
-    
-    def _parse_nanobot_metadata(self, raw: str) -> dict:
-        """Parse skill metadata JSON from frontmatter (supports nanobot and openclaw keys)."""
-        try:
-            data = json.loads(raw)
-            return data.get("nanobot", data.get("openclaw", {})) if isinstance(data, dict) else {}
-        except (json.JSONDecodeError, TypeError):
-            return {}
-    
-    def _check_requirements(self, skill_meta: dict) -> bool:
-        """Check if skill requirements are met (bins, env vars)."""
-        requires = skill_meta.get("requires", {})
-        for b in requires.get("bins", []):
-            if not shutil.which(b):
-                return False
-        for env in requires.get("env", []):
-            if not os.environ.get(env):
-                return False
-        return True
-    
-    def _get_skill_meta(self, name: str) -> dict:
-        """Get nanobot metadata for a skill (cached in frontmatter)."""
-        meta = self.get_skill_metadata(name) or {}
-        return self._parse_nanobot_metadata(meta.get("metadata", ""))
-    
+
     def get_always_skills(self) -> list[str]:
         """Get skills marked as always=true that meet requirements."""
-        result = []
-        for s in self.list_skills(filter_unavailable=True):
-            meta = self.get_skill_metadata(s["name"]) or {}
-            skill_meta = self._parse_nanobot_metadata(meta.get("metadata", ""))
-            if skill_meta.get("always") or meta.get("always"):
-                result.append(s["name"])
-        return result
-    
+        return [
+            e.name
+            for e in self.index.entries()
+            if (e.nanobot.get("always") or e.frontmatter.get("always") in (True, "true"))
+            and not self.index.missing_requirements(e)
+        ]
+
     def get_skill_metadata(self, name: str) -> dict | None:
         """
         Get metadata from a skill's frontmatter.
-        
+
         Args:
             name: Skill name.
-        
+
         Returns:
             Metadata dict or None.
         """
-        content = self.load_skill(name)
-        if not content:
+        entry = self.index.get(name)
+        if entry is None or not entry.content.startswith("---"):
             return None
-        
-        if content.startswith("---"):
-            match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
-            if match:
-                # Simple YAML parsing
-                metadata = {}
-                for line in match.group(1).split("\n"):
-                    if ":" in line:
-                        key, value = line.split(":", 1)
-                        metadata[key.strip()] = value.strip().strip('"\'')
-                return metadata
-        
-        return None
+        return dict(entry.frontmatter)
@@ -9,12 +9,13 @@ from typing import Any
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.providers.base import LLMProvider
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
-from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.web import WebCache, WebSearchTool, WebFetchTool
+from nanobot.utils.http import HttpClientPool
 
 
 class SubagentManager:
@@ -30,13 +31,16 @@ class SubagentManager:
         self,
         provider: LLMProvider,
         workspace: Path,
-        bus: MessageBus,
+        bus: BaseMessageBus,
         model: str | None = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        max_parallel_tools: int = 1,
+        http: HttpClientPool | None = None,
+        web_cache: WebCache | None = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         self.provider = provider
@@ -48,6 +52,9 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_parallel_tools = max_parallel_tools
+        self.http = http or HttpClientPool()
+        self.web_cache = web_cache
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
     
     async def spawn(
@@ -112,8 +119,8 @@ class SubagentManager:
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
             ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
+            tools.register(WebSearchTool(api_key=self.brave_api_key, http=self.http, cache=self.web_cache))
+            tools.register(WebFetchTool(http=self.http, cache=self.web_cache))
             
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -161,7 +168,11 @@ class SubagentManager:
                     for tool_call in response.tool_calls:
                         args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
                         logger.debug("Subagent [{}] executing: {} with arguments: {}", task_id, tool_call.name, args_str)
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                    results = await tools.execute_batch(
+                        [(tc.name, tc.arguments) for tc in response.tool_calls],
+                        max_parallel=self.max_parallel_tools,
+                    )
+                    for tool_call, result in zip(response.tool_calls, results):
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
@@ -20,6 +20,10 @@ class Tool(ABC):
         "array": list,
         "object": dict,
     }
+
+    # Side-effect-free tools may run concurrently with other such calls from the
+    # same LLM response. Tools that mutate state keep the default and run serially.
+    concurrency_safe: bool = False
     
     @property
     @abstractmethod
@@ -1,11 +1,106 @@
 """File system tools: read, write, edit."""
 
+import asyncio
 import difflib
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 from nanobot.agent.tools.base import Tool
 
+_T = TypeVar("_T")
+
+# Blocking file I/O runs here so a large file or slow mount never stalls the event loop.
+_IO_WORKERS = 4
+_io_executor: ThreadPoolExecutor | None = None
+
+
+async def _run_io(fn: Callable[..., _T], *args: Any) -> _T:
+    """Run a blocking filesystem call on the shared, bounded I/O thread pool."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=_IO_WORKERS, thread_name_prefix="nanobot-fs")
+    return await asyncio.get_running_loop().run_in_executor(_io_executor, partial(fn, *args))
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """Write text via a temp file in the same directory, fsync, then rename over the target."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_DEFAULT_MAX_BYTES = 128 * 1024  # Per-call read budget unless the caller asks for more
+_MAX_READ_BYTES = 1024 * 1024  # Hard cap on the budget a caller can ask for
+_INDEX_STRIDE = 64  # Record the byte offset of every Nth line
+_INDEX_CACHE_SIZE = 32
+
+
+@dataclass
+class _LineIndex:
+    """Sparse line-offset index of a file, valid while its stat stamp is unchanged."""
+
+    stamp: tuple[int, int, int]  # (mtime_ns, size, inode)
+    checkpoints: array  # Byte offset of line 1, 1 + STRIDE, 1 + 2*STRIDE, ...
+    total_lines: int
+
+
+_line_indexes: OrderedDict[str, _LineIndex] = OrderedDict()
+_line_indexes_lock = threading.Lock()
+
+
+def _line_index(path: Path, mm: mmap.mmap, st: os.stat_result) -> _LineIndex:
+    """Return the cached line index for path, rebuilding it if the file changed."""
+    key = str(path)
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    with _line_indexes_lock:
+        index = _line_indexes.get(key)
+        if index is not None and index.stamp == stamp:
+            _line_indexes.move_to_end(key)
+            return index
+
+    checkpoints = array("Q", [0])
+    lines = 0
+    find = mm.find
+    pos = find(b"\n")
+    while pos != -1:
+        lines += 1
+        if lines % _INDEX_STRIDE == 0:
+            checkpoints.append(pos + 1)
+        pos = find(b"\n", pos + 1)
+    if st.st_size and mm[st.st_size - 1:st.st_size] != b"\n":
+        lines += 1  # Last line without a trailing newline
+
+    index = _LineIndex(stamp=stamp, checkpoints=checkpoints, total_lines=lines)
+    with _line_indexes_lock:
+        _line_indexes[key] = index
+        _line_indexes.move_to_end(key)
+        while len(_line_indexes) > _INDEX_CACHE_SIZE:
+            _line_indexes.popitem(last=False)
+    return index
+
 
 def _resolve_path(path: str, workspace: Path | None = None, allowed_dir: Path | None = None) -> Path:
     """Resolve path against workspace (if relative) and enforce directory restriction."""
@@ -24,6 +119,8 @@ def _resolve_path(path: str, workspace: Path | None = None, allowed_dir: Path |
 class ReadFileTool(Tool):
     """Tool to read file contents."""
 
+    concurrency_safe = True
+
     def __init__(self, workspace: Path | None = None, allowed_dir: Path | None = None):
         self._workspace = workspace
         self._allowed_dir = allowed_dir
@@ -34,7 +131,10 @@ class ReadFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Read the contents of a file at the given path."
+        return (
+            "Read the contents of a file at the given path. Large files are returned in pages: "
+            "use offset/limit (lines) to continue; the total line count is reported."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -44,26 +144,93 @@ class ReadFileTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The file path to read"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Line number to start reading from (1-based, default 1)",
+                    "minimum": 1
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of lines to read",
+                    "minimum": 1
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "description": (
+                        f"Maximum bytes to return (default {_DEFAULT_MAX_BYTES}, capped at {_MAX_READ_BYTES}; "
+                        "page through larger files with offset)"
+                    ),
+                    "minimum": 1,
+                    "maximum": _MAX_READ_BYTES
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        offset: int = 1,
+        limit: int | None = None,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        **kwargs: Any,
+    ) -> str:
+        max_bytes = min(max(max_bytes, 1), _MAX_READ_BYTES)
         try:
-            file_path = _resolve_path(path, self._workspace, self._allowed_dir)
-            if not file_path.exists():
-                return f"Error: File not found: {path}"
-            if not file_path.is_file():
-                return f"Error: Not a file: {path}"
-
-            content = file_path.read_text(encoding="utf-8")
-            return content
+            return await _run_io(self._read, path, offset, limit, max_bytes)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
+    def _read(self, path: str, offset: int, limit: int | None, max_bytes: int) -> str:
+        file_path = _resolve_path(path, self._workspace, self._allowed_dir)
+        if not file_path.exists():
+            return f"Error: File not found: {path}"
+        if not file_path.is_file():
+            return f"Error: Not a file: {path}"
+
+        st = file_path.stat()
+        if offset <= 1 and limit is None and st.st_size <= max_bytes:
+            return file_path.read_text(encoding="utf-8")
+        if st.st_size == 0:
+            return ""
+
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = _line_index(file_path, mm, st)
+            first = max(offset, 1)
+            if first > index.total_lines:
+                return f"Error: offset {offset} is past the end of {path} ({index.total_lines} lines)"
+
+            # Jump to the nearest checkpoint, then scan forward to the first requested line.
+            start = index.checkpoints[(first - 1) // _INDEX_STRIDE]
+            for _ in range((first - 1) % _INDEX_STRIDE):
+                start = mm.find(b"\n", start) + 1
+
+            # Extend line by line until the line limit, the byte budget or EOF.
+            budget_end = min(start + max_bytes, st.st_size)
+            end, last = start, first - 1
+            while last < index.total_lines and (limit is None or last - first + 1 < limit):
+                nl = mm.find(b"\n", end, budget_end)
+                if nl == -1:
+                    if budget_end == st.st_size:
+                        end, last = st.st_size, last + 1  # Final line without newline
+                    break
+                end, last = nl + 1, last + 1
+
+            truncated_line = last < first  # A single line larger than max_bytes
+            if truncated_line:
+                end, last = budget_end, first
+            text = mm[start:end].decode("utf-8", errors="replace" if not truncated_line else "ignore")
+
+        note = f"lines {first}-{last} of {index.total_lines}"
+        if truncated_line:
+            note = f"line {first} of {index.total_lines}, truncated at {max_bytes} bytes"
+        if last < index.total_lines:
+            note += f"; continue with offset={last + 1}"
+        return f"{text}\n[{note}]"
+
 
 class WriteFileTool(Tool):
     """Tool to write content to a file."""
@@ -99,15 +266,18 @@ class WriteFileTool(Tool):
     
     async def execute(self, path: str, content: str, **kwargs: Any) -> str:
         try:
-            file_path = _resolve_path(path, self._workspace, self._allowed_dir)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
-            return f"Successfully wrote {len(content)} bytes to {file_path}"
+            return await _run_io(self._write, path, content)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error writing file: {str(e)}"
 
+    def _write(self, path: str, content: str) -> str:
+        file_path = _resolve_path(path, self._workspace, self._allowed_dir)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(file_path, content)
+        return f"Successfully wrote {len(content)} bytes to {file_path}"
+
 
 class EditFileTool(Tool):
     """Tool to edit a file by replacing text."""
@@ -147,28 +317,31 @@ class EditFileTool(Tool):
     
     async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
         try:
-            file_path = _resolve_path(path, self._workspace, self._allowed_dir)
-            if not file_path.exists():
-                return f"Error: File not found: {path}"
+            return await _run_io(self._edit, path, old_text, new_text)
+        except PermissionError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error editing file: {str(e)}"
 
-            content = file_path.read_text(encoding="utf-8")
+    def _edit(self, path: str, old_text: str, new_text: str) -> str:
+        file_path = _resolve_path(path, self._workspace, self._allowed_dir)
+        if not file_path.exists():
+            return f"Error: File not found: {path}"
 
-            if old_text not in content:
-                return self._not_found_message(old_text, content, path)
+        content = file_path.read_text(encoding="utf-8")
 
-            # Count occurrences
-            count = content.count(old_text)
-            if count > 1:
-                return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
+        if old_text not in content:
+            return self._not_found_message(old_text, content, path)
 
-            new_content = content.replace(old_text, new_text, 1)
-            file_path.write_text(new_content, encoding="utf-8")
+        # Count occurrences
+        count = content.count(old_text)
+        if count > 1:
+            return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
 
-            return f"Successfully edited {file_path}"
-        except PermissionError as e:
-            return f"Error: {e}"
-        except Exception as e:
-            return f"Error editing file: {str(e)}"
+        new_content = content.replace(old_text, new_text, 1)
+        _atomic_write(file_path, new_content)
+
+        return f"Successfully edited {file_path}"
 
     @staticmethod
     def _not_found_message(old_text: str, content: str, path: str) -> str:
@@ -196,6 +369,8 @@ class EditFileTool(Tool):
 class ListDirTool(Tool):
     """Tool to list directory contents."""
 
+    concurrency_safe = True
+
     def __init__(self, workspace: Path | None = None, allowed_dir: Path | None = None):
         self._workspace = workspace
         self._allowed_dir = allowed_dir
@@ -223,22 +398,25 @@ class ListDirTool(Tool):
     
     async def execute(self, path: str, **kwargs: Any) -> str:
         try:
-            dir_path = _resolve_path(path, self._workspace, self._allowed_dir)
-            if not dir_path.exists():
-                return f"Error: Directory not found: {path}"
-            if not dir_path.is_dir():
-                return f"Error: Not a directory: {path}"
-
-            items = []
-            for item in sorted(dir_path.iterdir()):
-                prefix = "📁 " if item.is_dir() else "📄 "
-                items.append(f"{prefix}{item.name}")
-
-            if not items:
-                return f"Directory {path} is empty"
-
-            return "\n".join(items)
+            return await _run_io(self._list, path)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error listing directory: {str(e)}"
+
+    def _list(self, path: str) -> str:
+        dir_path = _resolve_path(path, self._workspace, self._allowed_dir)
+        if not dir_path.exists():
+            return f"Error: Directory not found: {path}"
+        if not dir_path.is_dir():
+            return f"Error: Not a directory: {path}"
+
+        items = []
+        for item in sorted(dir_path.iterdir()):
+            prefix = "📁 " if item.is_dir() else "📄 "
+            items.append(f"{prefix}{item.name}")
+
+        if not items:
+            return f"Directory {path} is empty"
+
+        return "\n".join(items)
@@ -0,0 +1,63 @@
+"""Memory search tool: ranked full-text recall over HISTORY.md."""
+
+import asyncio
+import re
+import sqlite3
+from typing import Any
+
+from nanobot.agent.history_index import HistoryIndex
+from nanobot.agent.tools.base import Tool
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class MemorySearchTool(Tool):
+    """Search past conversation summaries in memory/HISTORY.md."""
+
+    concurrency_safe = True
+
+    def __init__(self, index: HistoryIndex):
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return "memory_search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search the history log (memory/HISTORY.md) of past conversations. "
+            "Returns the best-matching entries with dates and snippets, most relevant first."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Keywords to look for (any may match)"},
+                "since": {"type": "string", "description": "Only entries on or after this date (YYYY-MM-DD)"},
+                "until": {"type": "string", "description": "Only entries on or before this date (YYYY-MM-DD)"},
+                "limit": {"type": "integer", "minimum": 1, "maximum": 50, "description": "Max results (default 10)"},
+            },
+            "required": ["query"],
+        }
+
+    async def execute(
+        self,
+        query: str,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 10,
+        **kwargs: Any,
+    ) -> str:
+        for label, value in (("since", since), ("until", until)):
+            if value and not _DATE.match(value):
+                return f"Error: {label} must be a date in YYYY-MM-DD format"
+        try:
+            hits = await asyncio.to_thread(self._index.search, query, since, until, limit)
+        except sqlite3.Error as e:
+            return f"Error searching history: {e}"
+        if not hits:
+            return f"No history entries match: {query}"
+        return "\n\n".join(f"[{h['ts'] or 'undated'}] {h['snippet']}" for h in hits)
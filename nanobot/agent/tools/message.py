@@ -1,13 +1,29 @@
 """Message tool for sending messages to users."""
 
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any, Awaitable, Callable
 
 from nanobot.agent.tools.base import Tool
 from nanobot.bus.events import OutboundMessage
 
 
+@dataclass
+class _TurnContext:
+    """Routing info and send tracking for the turn running in the current task."""
+
+    channel: str
+    chat_id: str
+    message_id: str | None = None
+    sent: bool = False
+
+
 class MessageTool(Tool):
-    """Tool to send messages to users on chat channels."""
+    """Tool to send messages to users on chat channels.
+
+    Routing context is stored per asyncio task, so concurrent turns for
+    different sessions never see each other's channel/chat_id.
+    """
 
     def __init__(
         self,
@@ -20,13 +36,21 @@ class MessageTool(Tool):
         self._default_channel = default_channel
         self._default_chat_id = default_chat_id
         self._default_message_id = default_message_id
-        self._sent_in_turn: bool = False
+        self._context: ContextVar[_TurnContext | None] = ContextVar(
+            f"message_tool_context_{id(self)}", default=None
+        )
+
+    def _current(self) -> _TurnContext:
+        """Return the turn context of the current task, creating it from defaults if unset."""
+        ctx = self._context.get()
+        if ctx is None:
+            ctx = _TurnContext(self._default_channel, self._default_chat_id, self._default_message_id)
+            self._context.set(ctx)
+        return ctx
 
     def set_context(self, channel: str, chat_id: str, message_id: str | None = None) -> None:
-        """Set the current message context."""
-        self._default_channel = channel
-        self._default_chat_id = chat_id
-        self._default_message_id = message_id
+        """Set the message context for the current task."""
+        self._context.set(_TurnContext(channel, chat_id, message_id))
 
     def set_send_callback(self, callback: Callable[[OutboundMessage], Awaitable[None]]) -> None:
         """Set the callback for sending messages."""
@@ -34,7 +58,12 @@ class MessageTool(Tool):
 
     def start_turn(self) -> None:
         """Reset per-turn send tracking."""
-        self._sent_in_turn = False
+        self._current().sent = False
+
+    @property
+    def _sent_in_turn(self) -> bool:
+        """Whether the turn running in the current task already sent a message."""
+        return self._current().sent
 
     @property
     def name(self) -> str:
@@ -79,9 +108,10 @@ class MessageTool(Tool):
         media: list[str] | None = None,
         **kwargs: Any
     ) -> str:
-        channel = channel or self._default_channel
-        chat_id = chat_id or self._default_chat_id
-        message_id = message_id or self._default_message_id
+        ctx = self._current()
+        channel = channel or ctx.channel
+        chat_id = chat_id or ctx.chat_id
+        message_id = message_id or ctx.message_id
 
         if not channel or not chat_id:
             return "Error: No target channel/chat specified"
@@ -101,7 +131,7 @@ class MessageTool(Tool):
 
         try:
             await self._send_callback(msg)
-            self._sent_in_turn = True
+            ctx.sent = True
             media_info = f" with {len(media)} attachments" if media else ""
             return f"Message sent to {channel}:{chat_id}{media_info}"
         except Exception as e:
@@ -1,8 +1,10 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.tracing import Tracer
 
 
 class ToolRegistry:
@@ -12,8 +14,9 @@ class ToolRegistry:
     Allows dynamic registration and execution of tools.
     """
     
-    def __init__(self):
+    def __init__(self, tracer: Tracer | None = None):
         self._tools: dict[str, Tool] = {}
+        self.tracer = tracer or Tracer(enabled=False)
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
@@ -49,6 +52,14 @@ class ToolRegistry:
         Raises:
             KeyError: If tool not found.
         """
+        with self.tracer.span("tool_call", tool=name) as span:
+            result = await self._execute(name, params)
+            span.set(result_chars=len(str(result)))
+            if isinstance(result, str) and result.startswith("Error"):
+                span.outcome = "error"
+            return result
+
+    async def _execute(self, name: str, params: dict[str, Any]) -> str:
         _HINT = "\n\n[Analyze the error above and try a different approach.]"
 
         tool = self._tools.get(name)
@@ -65,6 +76,46 @@ class ToolRegistry:
             return result
         except Exception as e:
             return f"Error executing {name}: {str(e)}" + _HINT
+
+    async def execute_batch(
+        self, calls: list[tuple[str, dict[str, Any]]], max_parallel: int = 1
+    ) -> list[str]:
+        """
+        Execute the tool calls of one LLM response, running independent calls concurrently.
+
+        Consecutive calls to concurrency-safe tools run together (at most
+        ``max_parallel`` at a time); any other call acts as a barrier and runs
+        alone, so side effects keep the order the model asked for.
+
+        Args:
+            calls: (name, params) pairs in the order the model emitted them.
+            max_parallel: Maximum concurrent calls; 1 executes everything serially.
+
+        Returns:
+            Results in the same order as ``calls``.
+        """
+        results: list[str] = [""] * len(calls)
+        slots = asyncio.Semaphore(max(1, max_parallel))
+        group: list[int] = []
+
+        async def _run(i: int) -> None:
+            async with slots:
+                results[i] = await self.execute(*calls[i])
+
+        async def _flush() -> None:
+            if group:
+                await asyncio.gather(*(_run(i) for i in group))
+                group.clear()
+
+        for i, (name, _) in enumerate(calls):
+            tool = self._tools.get(name)
+            if max_parallel > 1 and tool is not None and tool.concurrency_safe:
+                group.append(i)
+            else:
+                await _flush()
+                await _run(i)
+        await _flush()
+        return results
     
     @property
     def tool_names(self) -> list[str]:
@@ -1,33 +1,155 @@
 """Web tools: web_search and web_fetch."""
 
-import html
+import asyncio
+import codecs
+import hashlib
 import json
+import multiprocessing
 import os
 import re
-from typing import Any
-from urllib.parse import urlparse
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import httpx
+from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.html import extract_html, serve_extractions
+from nanobot.utils.http import HttpClientPool
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
-MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024  # Stop reading a response body past this size
 
+# Readability extraction is CPU-bound; run it in worker processes so large pages
+# never hold the event loop. "spawn" keeps workers from inheriting loop threads.
+_EXTRACT_WORKERS = 2
+_WORKER_START_TIMEOUT = 30.0
 
-def _strip_tags(text: str) -> str:
-    """Remove HTML tags and decode entities."""
-    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
-    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
-    text = re.sub(r'<[^>]+>', '', text)
-    return html.unescape(text).strip()
 
+class _ExtractWorkerError(RuntimeError):
+    """An extraction worker process could not be started or died mid-document."""
 
-def _normalize(text: str) -> str:
-    """Normalize whitespace."""
-    text = re.sub(r'[ \t]+', ' ', text)
-    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+class _ExtractWorker:
+    def __init__(self, ctx: Any, fn: Callable[[str, str], tuple[str, float]]):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=serve_extractions, args=(child, fn), daemon=True)
+        self.proc.start()
+        child.close()
+        if not self.conn.poll(_WORKER_START_TIMEOUT):
+            self.kill()
+            raise _ExtractWorkerError("extraction worker did not start")
+        self.conn.recv()
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.join(1)
+        self.conn.close()
+
+
+class _ExtractPool:
+    """
+    A few long-lived extraction processes, each working on one document at a time.
+
+    ``run`` blocks (call it from a thread). A document that outlives its
+    timeout gets only its own worker killed; documents running on the
+    other workers are unaffected, and a replacement starts on next use.
+    """
+
+    def __init__(
+        self,
+        size: int = _EXTRACT_WORKERS,
+        fn: Callable[[str, str], tuple[str, float]] = extract_html,
+        start_method: str = "spawn",
+    ):
+        self.fn = fn
+        self._ctx = multiprocessing.get_context(start_method)
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: list[_ExtractWorker] = []
+        self._lock = threading.Lock()
+
+    def _take(self) -> _ExtractWorker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.proc.is_alive():
+                    return worker
+                worker.kill()
+        try:
+            return _ExtractWorker(self._ctx, self.fn)
+        except (OSError, EOFError) as e:
+            raise _ExtractWorkerError(f"cannot start extraction worker: {e!r}") from e
+
+    def run(self, document: str, mode: str, timeout: float) -> tuple[str, float]:
+        with self._slots:
+            worker = self._take()
+            try:
+                worker.conn.send((document, mode))
+                done = worker.conn.poll(timeout)
+                if done:
+                    ok, result = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                worker.kill()
+                raise _ExtractWorkerError(f"extraction worker died: {e}") from e
+            if not done:
+                worker.kill()
+                raise TimeoutError(f"HTML extraction timed out after {timeout}s")
+            with self._lock:
+                self._idle.append(worker)
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+
+_extract_pool: _ExtractPool | None = None
+
+
+def _get_extract_pool() -> _ExtractPool:
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = _ExtractPool()
+    return _extract_pool
+
+
+_BINARY_MAGIC = (b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"%PDF", b"PK\x03\x04", b"\x1f\x8b", b"RIFF")
+_TEXT_TYPES = ("text/", "json", "xml", "javascript", "ecmascript", "yaml", "csv")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.I)
+
+
+def _sniff_kind(content_type: str, head: bytes) -> str:
+    """Classify a response as "json", "html", "text" or "binary" from its header and first bytes."""
+    ctype = content_type.split(";", 1)[0].strip().lower()
+    if "json" in ctype:
+        return "json"
+    if ctype in ("text/html", "application/xhtml+xml"):
+        return "html"
+    if ctype and ctype != "application/octet-stream" and not any(t in ctype for t in _TEXT_TYPES):
+        return "binary"
+    if head.startswith(_BINARY_MAGIC) or b"\x00" in head[:1024]:
+        return "binary"
+    lead = head.lstrip()[:256].lower()
+    if lead.startswith((b"<!doctype", b"<html")):
+        return "html"
+    return "text"
+
+
+def _charset(response: httpx.Response, head: bytes) -> str:
+    """Charset from the Content-Type header, an HTML <meta> tag, or UTF-8."""
+    if response.charset_encoding:
+        return response.charset_encoding
+    if match := _META_CHARSET_RE.search(head[:2048]):
+        name = match.group(1).decode("ascii", "ignore")
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            pass
+    return "utf-8"
 
 
 def _validate_url(url: str) -> tuple[bool, str]:
@@ -43,10 +165,189 @@ def _validate_url(url: str) -> tuple[bool, str]:
         return False, str(e)
 
 
+@dataclass
+class CacheEntry:
+    """A cached tool result plus the validators needed to revalidate it."""
+
+    value: str
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int = 0
+
+
+class WebCache:
+    """
+    Byte-bounded LRU cache for web_fetch/web_search results.
+
+    Entries are fresh for ``ttl`` seconds. Stale entries that carry an ETag or
+    Last-Modified are kept so the caller can revalidate them with a conditional
+    request; stale entries without validators are dropped. With ``disk_dir``
+    set, entries are also written there (one JSON file each) so the cache
+    survives restarts; the disk tier is pruned oldest-first to
+    ``disk_max_bytes``.
+    """
+
+    _PRUNE_EVERY = 64  # Disk puts between size checks
+
+    def __init__(
+        self,
+        ttl: float = 900.0,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_dir: Path | None = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fetch_key(url: str, extract_mode: str, max_chars: int) -> str:
+        """Key for a fetched page: normalized URL (no fragment, sorted query) plus options."""
+        p = urlparse(url.strip())
+        netloc = p.netloc.lower()
+        if (p.scheme, p.port) in (("http", 80), ("https", 443)):
+            netloc = netloc.rsplit(":", 1)[0]
+        query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True)))
+        normalized = urlunparse((p.scheme.lower(), netloc, p.path or "/", p.params, query, ""))
+        return f"fetch:{extract_mode}:{max_chars}:{normalized}"
+
+    @staticmethod
+    def search_key(query: str, count: int) -> str:
+        return f"search:{count}:{' '.join(query.lower().split())}"
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters. hit_rate counts fresh hits; 304 revalidations are reported separately."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at < self.ttl
+
+    async def lookup(self, key: str) -> tuple[CacheEntry | None, bool]:
+        """Return (entry, fresh). A stale entry is only returned if it can be revalidated."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._insert(key, entry)
+
+        if entry is not None and self.is_fresh(entry):
+            self.hits += 1
+            return entry, True
+        self.misses += 1
+        if entry is not None and not (entry.etag or entry.last_modified):
+            await self._drop(key)
+            return None, False
+        return entry, False
+
+    async def revalidated(self, key: str, entry: CacheEntry) -> None:
+        """Mark a stale entry fresh again after a 304 Not Modified."""
+        self.revalidations += 1
+        entry.stored_at = time.time()
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    async def put(
+        self, key: str, value: str, etag: str | None = None, last_modified: str | None = None
+    ) -> None:
+        entry = CacheEntry(value=value, stored_at=time.time(), etag=etag,
+                           last_modified=last_modified, size=len(value.encode("utf-8")))
+        self._insert(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        if (old := self._entries.pop(key, None)) is not None:
+            self._bytes -= old.size
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    async def _drop(self, key: str) -> None:
+        if (old := self._entries.pop(key, None)) is not None:
+            self._bytes -= old.size
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_path(key).unlink, missing_ok=True)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{hashlib.sha256(key.encode()).hexdigest()[:40]}.json"
+
+    def _read_disk(self, key: str) -> CacheEntry | None:
+        path = self._disk_path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("Dropping unreadable web cache file {}: {}", path, e)
+            path.unlink(missing_ok=True)
+            return None
+        if data.get("key") != key:
+            return None
+        return CacheEntry(value=data["value"], stored_at=data["stored_at"], etag=data.get("etag"),
+                          last_modified=data.get("last_modified"), size=len(data["value"].encode("utf-8")))
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            path = self._disk_path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "key": key, "value": entry.value, "stored_at": entry.stored_at,
+                "etag": entry.etag, "last_modified": entry.last_modified,
+            }, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+            self._puts += 1
+            if self._puts % self._PRUNE_EVERY == 0:
+                self._prune_disk()
+        except OSError as e:
+            logger.warning("Failed to write web cache entry: {}", e)
+
+    def _prune_disk(self) -> None:
+        files = []
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
 class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
     name = "web_search"
+    concurrency_safe = True
     description = "Search the web. Returns titles, URLs, and snippets."
     parameters = {
         "type": "object",
@@ -57,9 +358,17 @@ class WebSearchTool(Tool):
         "required": ["query"]
     }
     
-    def __init__(self, api_key: str | None = None, max_results: int = 5):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_results: int = 5,
+        http: HttpClientPool | None = None,
+        cache: WebCache | None = None,
+    ):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY", "")
         self.max_results = max_results
+        self._http = http or HttpClientPool()
+        self._cache = cache
     
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         if not self.api_key:
@@ -67,14 +376,19 @@ class WebSearchTool(Tool):
         
         try:
             n = min(max(count or self.max_results, 1), 10)
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": n},
-                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
-                )
-                r.raise_for_status()
+            key = WebCache.search_key(query, n)
+            if self._cache:
+                entry, fresh = await self._cache.lookup(key)
+                if fresh:
+                    return entry.value
+
+            r = await self._http.get(
+                "https://api.search.brave.com/res/v1/web/search",
+                params={"q": query, "count": n},
+                headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+                timeout=10.0
+            )
+            r.raise_for_status()
             
             results = r.json().get("web", {}).get("results", [])
             if not results:
@@ -85,7 +399,10 @@ class WebSearchTool(Tool):
                 lines.append(f"{i}. {item.get('title', '')}\n   {item.get('url', '')}")
                 if desc := item.get("description"):
                     lines.append(f"   {desc}")
-            return "\n".join(lines)
+            output = "\n".join(lines)
+            if self._cache:
+                await self._cache.put(key, output)
+            return output
         except Exception as e:
             return f"Error: {e}"
 
@@ -94,6 +411,7 @@ class WebFetchTool(Tool):
     """Fetch and extract content from a URL using Readability."""
     
     name = "web_fetch"
+    concurrency_safe = True
     description = "Fetch URL and extract readable content (HTML → markdown/text)."
     parameters = {
         "type": "object",
@@ -105,12 +423,22 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
     
-    def __init__(self, max_chars: int = 50000):
+    def __init__(
+        self,
+        max_chars: int = 50000,
+        http: HttpClientPool | None = None,
+        cache: WebCache | None = None,
+        max_bytes: int = MAX_DOWNLOAD_BYTES,
+        extract_timeout: float = 15.0,
+    ):
         self.max_chars = max_chars
+        self.max_bytes = max_bytes
+        self.extract_timeout = extract_timeout
+        self._http = http or HttpClientPool()
+        self._cache = cache
+        self.extract_stats = {"documents": 0, "bytes": 0, "seconds": 0.0, "max_seconds": 0.0, "timeouts": 0}
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
 
         # Validate URL before fetching
@@ -118,46 +446,112 @@ class WebFetchTool(Tool):
         if not is_valid:
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url}, ensure_ascii=False)
 
+        key = WebCache.fetch_key(url, extractMode, max_chars)
+        entry = None
+        headers = {"User-Agent": USER_AGENT}
+        if self._cache:
+            entry, fresh = await self._cache.lookup(key)
+            if fresh:
+                return entry.value
+            if entry is not None:
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
+
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
+            async with self._http.stream(
+                "GET", url, headers=headers, follow_redirects=True, timeout=30.0
+            ) as r:
+                if entry is not None and r.status_code == 304:
+                    await self._cache.revalidated(key, entry)
+                    return entry.value
                 r.raise_for_status()
-            
-            ctype = r.headers.get("content-type", "")
+                raw, kind, clipped = await self._read_body(r, max_chars)
+            if kind == "binary":
+                return json.dumps({"error": f"Unsupported content type: {r.headers.get('content-type') or 'binary'}",
+                                   "url": url, "finalUrl": str(r.url), "status": r.status_code}, ensure_ascii=False)
             
             # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2, ensure_ascii=False), "json"
+            if kind == "json" and not clipped:
+                try:
+                    text, extractor = json.dumps(json.loads(raw), indent=2, ensure_ascii=False), "json"
+                except ValueError:
+                    text, extractor = raw, "raw"
             # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
+            elif kind == "html":
+                text, extractor = await self._extract(raw, extractMode, url), "readability"
             else:
-                text, extractor = r.text, "raw"
+                text, extractor = raw, "raw"
             
-            truncated = len(text) > max_chars
-            if truncated:
-                text = text[:max_chars]
+            truncated = clipped or len(text) > max_chars
+            text = text[:max_chars]
             
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text}, ensure_ascii=False)
+            output = json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
+                                "extractor": extractor, "truncated": truncated, "length": len(text), "text": text}, ensure_ascii=False)
+            if self._cache and "no-store" not in r.headers.get("cache-control", "").lower():
+                await self._cache.put(key, output, r.headers.get("etag"), r.headers.get("last-modified"))
+            return output
         except Exception as e:
             return json.dumps({"error": str(e), "url": url}, ensure_ascii=False)
-    
-    def _to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown."""
-        # Convert links, headings, lists before stripping tags
-        text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
-                      lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
-        text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
-                      lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
-        text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
-        text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
-        text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
-        return _normalize(_strip_tags(text))
+
+    async def _read_body(self, r: httpx.Response, max_chars: int) -> tuple[str, str, bool]:
+        """
+        Stream and incrementally decode a response body within the byte budget.
+
+        The content kind is sniffed from the first chunk and binary payloads are
+        abandoned without reading further. Plain text also stops once max_chars
+        characters are decoded. Returns (text, kind, clipped), where clipped
+        means the body was not read to the end.
+        """
+        decoder = None
+        kind = "text"
+        parts: list[str] = []
+        received = chars = 0
+        async for chunk in r.aiter_bytes():
+            if decoder is None:
+                kind = _sniff_kind(r.headers.get("content-type", ""), chunk)
+                if kind == "binary":
+                    return "", kind, True
+                decoder = codecs.getincrementaldecoder(_charset(r, chunk))(errors="replace")
+            room = self.max_bytes - received
+            received += len(chunk)
+            if received > self.max_bytes:
+                parts.append(decoder.decode(chunk[:room]))  # Drop any incomplete trailing character
+                return "".join(parts), kind, True
+            piece = decoder.decode(chunk)
+            parts.append(piece)
+            chars += len(piece)
+            if kind == "text" and chars > max_chars:
+                return "".join(parts), kind, True
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+        return "".join(parts), kind, False
+
+    async def _extract(self, document: str, mode: str, url: str) -> str:
+        """Run Readability extraction in a worker process with a per-document timeout."""
+        try:
+            text, seconds = await asyncio.to_thread(
+                _get_extract_pool().run, document, mode, self.extract_timeout,
+            )
+        except TimeoutError:
+            self.extract_stats["timeouts"] += 1
+            raise
+        except _ExtractWorkerError as e:
+            logger.warning("Extraction worker unavailable, extracting in a thread: {}", e)
+            try:
+                text, seconds = await asyncio.wait_for(
+                    asyncio.to_thread(extract_html, document, mode), timeout=self.extract_timeout,
+                )
+            except asyncio.TimeoutError:
+                self.extract_stats["timeouts"] += 1
+                raise TimeoutError(f"HTML extraction timed out after {self.extract_timeout}s") from None
+
+        size = len(document)
+        stats = self.extract_stats
+        stats["documents"] += 1
+        stats["bytes"] += size
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        logger.debug("web_fetch extracted {} ({} chars) in {:.0f}ms", url, size, seconds * 1000)
+        return text
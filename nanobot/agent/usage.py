@@ -0,0 +1,165 @@
+"""Token usage ledger aggregated per day, session, channel and model."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    day TEXT NOT NULL,
+    session TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    prompt INTEGER NOT NULL DEFAULT 0,
+    completion INTEGER NOT NULL DEFAULT 0,
+    cached INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, session, channel, model)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO usage (day, session, channel, model, calls, prompt, completion, cached)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, session, channel, model) DO UPDATE SET
+    calls = calls + excluded.calls,
+    prompt = prompt + excluded.prompt,
+    completion = completion + excluded.completion,
+    cached = cached + excluded.cached
+"""
+
+_GROUPS = {"day", "session", "channel", "model"}
+
+
+class UsageLedger:
+    """
+    Persistent token accounting.
+
+    Each LLM call is folded into one row per (day, session, channel, model)
+    in a SQLite table, so the store grows with the number of active sessions
+    rather than the number of calls. Calls are accumulated in memory and
+    upserted in one transaction on ``flush()`` (once per turn). Per-session
+    daily totals are cached so budget checks never touch the disk.
+
+    The agent loop uses the async variants (``aflush``, ``asession_total``),
+    which run the SQLite work in a worker thread and serialise it so a
+    cache fill never races a flush.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending: dict[tuple[str, str, str, str], list[int]] = {}
+        self._session_totals: dict[tuple[str, str], int] = {}
+        self._io = asyncio.Lock()
+
+    @staticmethod
+    def _today() -> str:
+        return date.today().isoformat()
+
+    def record(self, session: str, channel: str, model: str, usage: dict[str, int]) -> None:
+        """Add one LLM call's usage (a provider ``LLMResponse.usage`` dict)."""
+        day = self._today()
+        prompt = int(usage.get("prompt_tokens") or 0)
+        completion = int(usage.get("completion_tokens") or 0)
+        row = self._pending.setdefault((day, session, channel, model), [0, 0, 0, 0])
+        row[0] += 1
+        row[1] += prompt
+        row[2] += completion
+        row[3] += int(usage.get("cached_tokens") or 0)
+        if (day, session) in self._session_totals:  # Otherwise the next cache fill counts the pending row
+            self._session_totals[(day, session)] += prompt + completion
+
+    def _stored_total(self, day: str, session: str) -> int:
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(prompt + completion), 0) FROM usage WHERE day = ? AND session = ?",
+                (day, session),
+            ).fetchone()
+        return total
+
+    def _pending_total(self, day: str, session: str) -> int:
+        return sum(r[1] + r[2] for k, r in self._pending.items() if k[0] == day and k[1] == session)
+
+    def session_total(self, session: str, day: str | None = None) -> int:
+        """Prompt + completion tokens a session has used on ``day`` (default today)."""
+        day = day or self._today()
+        total = self._session_totals.get((day, session))
+        if total is None:
+            total = self._stored_total(day, session) + self._pending_total(day, session)
+            self._session_totals[(day, session)] = total
+        return total
+
+    async def asession_total(self, session: str) -> int:
+        """``session_total`` for today, filling the cache from disk in a worker thread."""
+        day = self._today()
+        if (day, session) not in self._session_totals:
+            async with self._io:  # No flush is moving pending rows to disk while we read
+                if (day, session) not in self._session_totals:
+                    stored = await asyncio.to_thread(self._stored_total, day, session)
+                    self._session_totals[(day, session)] = stored + self._pending_total(day, session)
+        return self._session_totals[(day, session)]
+
+    def _take_pending(self) -> list[tuple]:
+        rows = [(*key, *vals) for key, vals in self._pending.items()]
+        self._pending.clear()
+        today = self._today()
+        for key in [k for k in self._session_totals if k[0] != today]:
+            del self._session_totals[key]  # Keep the budget cache to today's sessions
+        return rows
+
+    def _write(self, rows: list[tuple]) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(_UPSERT, rows)
+        except sqlite3.Error as e:
+            logger.warning("Failed to write usage ledger: {}", e)
+
+    def flush(self) -> None:
+        """Write accumulated usage to disk."""
+        if rows := self._take_pending():
+            self._write(rows)
+
+    async def aflush(self) -> None:
+        """``flush`` with the SQLite write in a worker thread."""
+        if not self._pending:
+            return
+        async with self._io:
+            if rows := self._take_pending():
+                await asyncio.to_thread(self._write, rows)
+
+    def summary(self, by: str = "model", days: int = 7, limit: int = 10) -> list[dict[str, Any]]:
+        """Totals over the last ``days`` days grouped by day, session, channel or model, largest first."""
+        if by not in _GROUPS:
+            raise ValueError(f"by must be one of {sorted(_GROUPS)}")
+        self.flush()
+        since = (date.today() - timedelta(days=max(days, 1) - 1)).isoformat()
+        order = "key DESC" if by == "day" else "tokens DESC"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {by} AS key, SUM(calls), SUM(prompt), SUM(completion), SUM(cached),"
+                f" SUM(prompt + completion) AS tokens FROM usage WHERE day >= ?"
+                f" GROUP BY {by} ORDER BY {order} LIMIT ?",
+                (since, limit),
+            ).fetchall()
+        return [
+            {by: key, "calls": calls, "prompt_tokens": prompt, "completion_tokens": completion,
+             "cached_tokens": cached, "total_tokens": tokens}
+            for key, calls, prompt, completion, cached, tokens in rows
+        ]
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
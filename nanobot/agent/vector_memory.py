@@ -0,0 +1,418 @@
+"""Embedding-based retrieval over MEMORY.md facts and HISTORY.md entries."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    NUMPY_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from nanobot.agent.memory import MemoryStore
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_ENTRY_SPLIT = re.compile(r"\n[ \t]*\n+")
+_BULLET = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_SCAN_ROWS = 65536  # Rows scored per matrix product when searching the memory-mapped index
+_TAIL = 64
+
+
+class Embedder(ABC):
+    """Turns texts into fixed-size vectors."""
+
+    name: str = ""
+
+    @abstractmethod
+    async def embed(self, texts: list[str]) -> "np.ndarray":
+        """Return a float32 array of shape (len(texts), dim)."""
+
+
+class HashingEmbedder(Embedder):
+    """
+    Local, dependency-free embedder: signed feature hashing of words and word bigrams.
+
+    It matches on shared vocabulary rather than meaning, but needs no model
+    download or network and is deterministic, which makes it a sensible default.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        words = [w.lower() for w in _WORD.findall(text)]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    async def embed(self, texts: list[str]) -> "np.ndarray":
+        return await asyncio.to_thread(self._embed, texts)  # One hash per feature: keep it off the event loop
+
+    def _embed(self, texts: list[str]) -> "np.ndarray":
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                out[row, h % self.dim] += 1.0 if h >> 63 else -1.0
+        return out
+
+
+class LiteLLMEmbedder(Embedder):
+    """Embeddings from a provider endpoint via LiteLLM (e.g. openai/text-embedding-3-small, ollama/nomic-embed-text)."""
+
+    BATCH = 64
+
+    def __init__(self, model: str, api_key: str | None = None, api_base: str | None = None):
+        self.model = model
+        self.api_key = api_key or None
+        self.api_base = api_base or None
+        self.name = model
+
+    async def embed(self, texts: list[str]) -> "np.ndarray":
+        from litellm import aembedding
+
+        rows: list[list[float]] = []
+        for start in range(0, len(texts), self.BATCH):
+            response = await aembedding(
+                model=self.model, input=texts[start:start + self.BATCH],
+                api_key=self.api_key, api_base=self.api_base,
+            )
+            rows.extend(item["embedding"] for item in response.data)
+        return np.asarray(rows, dtype=np.float32)
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _atomic_write_json(path: Path, data: dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class VectorIndex:
+    """
+    Append-only matrix of unit vectors on disk, searched through ``np.memmap``.
+
+    ``vectors.f32`` holds the raw float32 rows and ``chunks.jsonl`` the
+    matching metadata, one line per row. ``state.json`` records the
+    committed row count (so a torn append is ignored on load), deleted
+    rows, and any caller state. Deleted rows are masked at query time and
+    dropped by ``compact()`` once they make up half the index.
+    """
+
+    def __init__(self, directory: Path):
+        self.dir = directory
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._vectors = directory / "vectors.f32"
+        self._chunks_file = directory / "chunks.jsonl"
+        self._state_file = directory / "state.json"
+        self.state: dict[str, Any] = {}
+        self.chunks: list[dict[str, Any]] = []
+        self.dead: set[int] = set()
+        self._mm: "np.memmap | None" = None
+        self._load()
+
+    @property
+    def dim(self) -> int:
+        return int(self.state.get("dim", 0))
+
+    @property
+    def count(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def live(self) -> int:
+        return self.count - len(self.dead)
+
+    def _load(self) -> None:
+        try:
+            self.state = json.loads(self._state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.state = {}
+        count = int(self.state.get("count", 0))
+        chunks: list[dict[str, Any]] = []
+        try:
+            if count and self._chunks_file.exists():
+                with open(self._chunks_file, encoding="utf-8") as f:
+                    for line in f:
+                        if len(chunks) == count:
+                            break
+                        chunks.append(json.loads(line))
+        except ValueError:
+            chunks = []
+        vector_bytes = self._vectors.stat().st_size if self._vectors.exists() else 0
+        if len(chunks) < count or vector_bytes < count * self.dim * 4 or (count and not self.dim):
+            logger.warning("Vector index at {} is inconsistent, rebuilding", self.dir)
+            self.reset({})
+            return
+        self.chunks = chunks
+        self.dead = set(self.state.get("dead", []))
+        self._truncate_to_count()
+
+    def _save_state(self) -> None:
+        self.state["count"] = self.count
+        self.state["dead"] = sorted(self.dead)
+        _atomic_write_json(self._state_file, self.state)
+
+    def reset(self, state: dict[str, Any]) -> None:
+        """Drop every row and start over with ``state``."""
+        self._mm = None
+        for path in (self._vectors, self._chunks_file):
+            path.unlink(missing_ok=True)
+        self.chunks, self.dead, self.state = [], set(), dict(state)
+        self._save_state()
+
+    def _truncate_to_count(self) -> None:
+        """Cut off rows/lines from an append that was never committed to state."""
+        size = self.count * self.dim * 4
+        if self._vectors.exists() and self._vectors.stat().st_size > size:
+            os.truncate(self._vectors, size)
+        with open(self._chunks_file, "a+", encoding="utf-8") as f:
+            f.seek(0)
+            keep = sum(len(line.encode("utf-8")) for _, line in zip(range(self.count), f))
+            f.truncate(keep)
+
+    def add(self, vectors: "np.ndarray", chunks: list[dict[str, Any]]) -> None:
+        """Append unit-normalised ``vectors`` with their metadata."""
+        if not chunks:
+            return
+        if self.dim == 0:
+            self.state["dim"] = int(vectors.shape[1])
+        with open(self._vectors, "ab") as f:
+            f.write(_normalize(vectors).tobytes())
+        with open(self._chunks_file, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(c, ensure_ascii=False) + "\n" for c in chunks)
+        self.chunks.extend(chunks)
+        self._mm = None
+        self._save_state()
+
+    def delete(self, rows: list[int]) -> None:
+        if rows:
+            self.dead.update(rows)
+            if len(self.dead) > 64 and len(self.dead) * 2 > self.count:
+                self.compact()
+            else:
+                self._save_state()
+
+    def commit(self) -> None:
+        """Persist changes made to ``state``."""
+        self._save_state()
+
+    def compact(self) -> None:
+        """Rewrite the index without deleted rows."""
+        keep = [i for i in range(self.count) if i not in self.dead]
+        vectors = np.array(self._matrix()[keep]) if keep else np.zeros((0, self.dim), np.float32)
+        chunks = [self.chunks[i] for i in keep]
+        state = {k: v for k, v in self.state.items() if k not in ("count", "dead")}
+        self.reset(state)
+        self.add(vectors, chunks)
+
+    def _matrix(self) -> "np.ndarray":
+        if self._mm is None:
+            self._mm = np.memmap(self._vectors, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+        return self._mm
+
+    def search(self, queries: "np.ndarray", k: int) -> list[list[tuple[int, float]]]:
+        """Cosine top-``k`` (row, score) per query row, best first."""
+        if self.live == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        q = _normalize(np.atleast_2d(queries)).T  # (dim, m)
+        matrix = self._matrix()
+        scores = np.empty((self.count, q.shape[1]), dtype=np.float32)
+        for start in range(0, self.count, _SCAN_ROWS):
+            block = matrix[start:start + _SCAN_ROWS]
+            scores[start:start + len(block)] = block @ q
+        if self.dead:
+            scores[sorted(self.dead)] = -np.inf
+        k = min(k, self.live)
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]  # (k, m), unordered
+        results = []
+        for col in range(q.shape[1]):
+            rows = top[:, col]
+            order = rows[np.argsort(-scores[rows, col])]
+            results.append([(int(r), float(scores[r, col])) for r in order])
+        return results
+
+
+@dataclass
+class Recall:
+    source: str  # "memory" or "history"
+    text: str
+    score: float
+
+
+def split_facts(markdown: str) -> list[tuple[str, str]]:
+    """(section, fact) pairs: each list item or paragraph of MEMORY.md under its nearest heading."""
+    facts: list[tuple[str, str]] = []
+    section, lines, in_item = "", [], False
+
+    def _flush() -> None:
+        if lines:
+            facts.append((section, " ".join(lines)))
+            lines.clear()
+
+    for raw in markdown.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            _flush()
+            if line:
+                section = line.lstrip("#").strip()
+        elif _BULLET.match(line):
+            _flush()
+            lines.append(_BULLET.sub("", line))
+            in_item = True
+        elif in_item and not raw[:1].isspace():
+            _flush()  # Plain text right after a list starts a new paragraph
+            lines.append(line)
+            in_item = False
+        else:
+            lines.append(line)  # Paragraph text or a wrapped list item
+    _flush()
+    return facts
+
+
+class SemanticMemory:
+    """
+    Third memory layer: retrieves only the facts and history entries relevant to a message.
+
+    MEMORY.md is split into facts (list items / paragraphs) and HISTORY.md
+    into entries; both are embedded into a ``VectorIndex`` under
+    ``memory/.vectors``. Facts are matched by content hash, so editing
+    MEMORY.md only embeds the changed lines; history is indexed
+    incrementally from the last byte offset. Switching embedding model
+    rebuilds the index. Embedding and index file I/O run in worker threads
+    so a large first sync does not stall the event loop.
+    """
+
+    def __init__(self, store: MemoryStore, embedder: Embedder, top_k: int = 8, min_score: float = 0.2):
+        self.store = store
+        self.embedder = embedder
+        self.top_k = top_k
+        self.min_score = min_score
+        self.index = VectorIndex(store.memory_dir / ".vectors")
+        self._lock = asyncio.Lock()
+        self._memory_sig: tuple | None = None
+
+    @staticmethod
+    def _signature(path: Path) -> tuple | None:
+        try:
+            st = path.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    async def sync(self) -> None:
+        """Bring the index up to date with MEMORY.md and HISTORY.md."""
+        async with self._lock:
+            if self.index.state.get("model") != self.embedder.name:
+                await asyncio.to_thread(self.index.reset, {"model": self.embedder.name})
+                self._memory_sig = None
+            await self._sync_facts()
+            await self._sync_history()
+
+    async def _embed_and_add(self, chunks: list[dict[str, Any]], texts: list[str]) -> None:
+        if chunks:
+            vectors = await self.embedder.embed(texts)
+            await asyncio.to_thread(self.index.add, vectors, chunks)
+
+    async def _sync_facts(self) -> None:
+        sig = self._signature(self.store.memory_file)
+        if sig == self._memory_sig:
+            return
+        facts = split_facts(await asyncio.to_thread(self.store.read_long_term))
+        wanted = {hashlib.sha1(f"{s}\n{t}".encode()).hexdigest(): (s, t) for s, t in facts}
+        have = {
+            c["hash"]: row for row, c in enumerate(self.index.chunks)
+            if c["source"] == "memory" and row not in self.index.dead
+        }
+        await asyncio.to_thread(self.index.delete, [row for h, row in have.items() if h not in wanted])
+        new = [(h, s, t) for h, (s, t) in wanted.items() if h not in have]
+        await self._embed_and_add(
+            [{"source": "memory", "hash": h, "section": s, "text": t} for h, s, t in new],
+            [f"{s}\n{t}" if s else t for _, s, t in new],
+        )
+        self._memory_sig = sig
+
+    def _read_history(self, offset: int, tail: str) -> tuple[int, int, bytes, str] | None:
+        """(size, start, new bytes, new tail) of HISTORY.md since ``offset``; None if unchanged."""
+        try:
+            with open(self.store.history_file, "rb") as f:
+                size = f.seek(0, 2)
+                if offset:
+                    f.seek(max(0, offset - _TAIL))
+                    if size < offset or f.read(offset - max(0, offset - _TAIL)).hex() != tail:
+                        offset = 0  # Rewritten since the last sync
+                if offset == size:
+                    return None
+                f.seek(offset)
+                data = f.read(size - offset)
+                f.seek(max(0, size - _TAIL))
+                return size, offset, data, f.read().hex()
+        except FileNotFoundError:
+            return (0, 0, b"", "") if offset else None
+
+    async def _sync_history(self) -> None:
+        state = self.index.state
+        offset, tail = int(state.get("history_offset", 0)), state.get("history_tail", "")
+        delta = await asyncio.to_thread(self._read_history, offset, tail)
+        if delta is None:
+            return
+        size, offset, data, new_tail = delta
+        if offset == 0:
+            await asyncio.to_thread(
+                self.index.delete, [r for r, c in enumerate(self.index.chunks) if c["source"] == "history"],
+            )
+        entries = [e.strip() for e in _ENTRY_SPLIT.split(data.decode("utf-8", errors="replace")) if e.strip()]
+        await self._embed_and_add([{"source": "history", "text": e} for e in entries], entries)
+        state["history_offset"], state["history_tail"] = size, new_tail
+        await asyncio.to_thread(self.index.commit)
+
+    async def recall(self, query: str, k: int | None = None) -> list[Recall]:
+        """The most relevant facts and history entries for ``query``, best first."""
+        await self.sync()
+        if not query.strip() or self.index.live == 0:
+            return []
+        vector = await self.embedder.embed([query])
+        out = []
+        async with self._lock:  # Rows must not move under a search running in a thread
+            hits = await asyncio.to_thread(self.index.search, vector, k or self.top_k)
+            for row, score in hits[0]:
+                if score < self.min_score:
+                    break
+                chunk = self.index.chunks[row]
+                text = f"[{chunk['section']}] {chunk['text']}" if chunk.get("section") else chunk["text"]
+                out.append(Recall(chunk["source"], text, score))
+        return out
+
+    async def recall_context(self, query: str) -> str:
+        """Recalled items formatted as a prompt section body ("" when nothing is relevant)."""
+        hits = await self.recall(query)
+        facts = [f"- {h.text}" for h in hits if h.source == "memory"]
+        events = [f"- {h.text}" for h in hits if h.source == "history"]
+        parts = []
+        if facts:
+            parts.append("Long-term facts:\n" + "\n".join(facts))
+        if events:
+            parts.append("Past events:\n" + "\n".join(events))
+        return "\n\n".join(parts)
+
+
+def make_embedder(model: str = "", api_key: str = "", api_base: str | None = None, dim: int = 512) -> Embedder:
+    """The built-in hashing embedder for an empty model name, otherwise a LiteLLM embedding model."""
+    return LiteLLMEmbedder(model, api_key, api_base) if model else HashingEmbedder(dim)
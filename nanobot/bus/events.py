@@ -23,6 +23,13 @@ class InboundMessage:
         """Unique key for session identification."""
         return self.session_key_override or f"{self.channel}:{self.chat_id}"
 
+    @property
+    def affinity_key(self) -> str:
+        """Key whose messages must be handled in order (system messages route to their origin)."""
+        if self.channel == "system":
+            return self.chat_id if ":" in self.chat_id else f"cli:{self.chat_id}"
+        return self.session_key
+
 
 @dataclass
 class OutboundMessage:
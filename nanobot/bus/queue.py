@@ -1,33 +1,268 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
+import bisect
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Generic, TypeVar
+
+from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 
+T = TypeVar("T")
+
+# Inbound priority lanes, highest first.
+LANE_CONTROL = "control"          # /stop and other commands that must reach a saturated agent
+LANE_INTERACTIVE = "interactive"  # Real users on chat channels
+LANE_SYSTEM = "system"            # Subagent results and other internal follow-ups
+LANE_BACKGROUND = "background"    # Cron jobs, heartbeats
+INBOUND_LANES = (LANE_CONTROL, LANE_INTERACTIVE, LANE_SYSTEM, LANE_BACKGROUND)
+TURN_LANES = INBOUND_LANES[1:]  # Everything that becomes an agent turn (all but control)
+CONTROL_COMMANDS = {"/stop"}
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+
+_BACKGROUND_SOURCES = {"cron", "heartbeat"}
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of enqueue-to-dequeue latency (milliseconds)."""
+
+    BOUNDS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 30000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile q (max observed for the overflow bucket)."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(self.BOUNDS_MS[i]) if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        buckets = {f"le_{b}ms": c for b, c in zip(self.BOUNDS_MS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.total, "p50_ms": self.quantile(0.5), "p95_ms": self.quantile(0.95),
+                "max_ms": round(self.max_ms, 3), "buckets": buckets}
+
+
+class _Lane(Generic[T]):
+    """One FIFO lane with its own counters."""
 
-class MessageBus:
+    def __init__(self, name: str):
+        self.name = name
+        self.items: deque[tuple[float, T]] = deque()
+        self.enqueued = 0
+        self.dropped = 0
+        self.latency = LatencyHistogram()
+
+    def stats(self) -> dict[str, Any]:
+        return {"depth": len(self.items), "enqueued": self.enqueued, "dropped": self.dropped,
+                "latency": self.latency.snapshot()}
+
+
+class PriorityQueue(Generic[T]):
     """
-    Async message bus that decouples chat channels from the agent core.
+    Bounded multi-lane queue.
 
-    Channels push messages to the inbound queue, and the agent processes
-    them and pushes responses to the outbound queue.
+    ``get`` always serves the highest-priority non-empty lane, FIFO within a
+    lane. When the queue is full a ``block`` put waits for space, while a
+    ``drop_oldest`` put evicts the oldest message from the lowest-priority
+    non-empty lane that is not above its own. Lanes listed in ``unbounded``
+    skip the limit (but still count towards it). Latency is measured from put to get.
     """
 
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+    def __init__(self, lanes: tuple[str, ...], maxsize: int = 0, unbounded: tuple[str, ...] = ()):
+        self.maxsize = maxsize
+        self.unbounded = set(unbounded)
+        self.lanes = {name: _Lane[T](name) for name in lanes}
+        self._order = list(self.lanes.values())
+        self._size = 0
+        self._items_ready = asyncio.Event()
+        self._space_ready = asyncio.Event()
+        self._space_ready.set()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self._size
+
+    async def put(self, item: T, lane: str, policy: str = BLOCK) -> bool:
+        """Enqueue an item. Returns False if it was dropped."""
+        target = self.lanes[lane]
+        while self.full() and lane not in self.unbounded:
+            if policy == DROP_OLDEST:
+                if self._evict(self._order.index(target)):
+                    break
+                target.dropped += 1  # Only higher-priority work is queued: drop the newcomer
+                return False
+            self._space_ready.clear()
+            await self._space_ready.wait()
+        target.items.append((time.monotonic(), item))
+        target.enqueued += 1
+        self._size += 1
+        self._items_ready.set()
+        return True
+
+    def _evict(self, floor: int) -> bool:
+        for lane in reversed(self._order[floor:]):
+            if lane.items:
+                lane.items.popleft()
+                lane.dropped += 1
+                self._size -= 1
+                return True
+        return False
+
+    async def get(self, lanes: tuple[str, ...] | None = None) -> T:
+        """Dequeue from the highest-priority non-empty lane, optionally only from ``lanes``."""
+        order = self._order if lanes is None else [self.lanes[name] for name in lanes]
+        while not any(lane.items for lane in order):
+            self._items_ready.clear()
+            await self._items_ready.wait()
+        for lane in order:
+            if lane.items:
+                enqueued_at, item = lane.items.popleft()
+                lane.latency.observe((time.monotonic() - enqueued_at) * 1000)
+                self._size -= 1
+                self._space_ready.set()
+                return item
+        raise RuntimeError("queue size out of sync with lanes")
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": self._size, "maxsize": self.maxsize,
+                "lanes": {name: lane.stats() for name, lane in self.lanes.items()}}
+
+
+class BaseMessageBus(ABC):
+    """
+    Interface shared by the message bus backends.
+
+    Channels publish inbound messages and consume outbound ones; the agent
+    does the reverse. Inbound messages are split into priority lanes (control
+    commands such as ``/stop``, interactive users, then system/subagent
+    follow-ups, then cron/heartbeat work). Both directions are bounded.
+    Overflow handling is per source: ``policies`` maps a channel name or lane
+    name to ``block`` (apply backpressure) or ``drop_oldest``. Background work
+    drops by default and everything else blocks; control commands are never
+    held back by a full bus. Outbound stays a single FIFO lane so per-chat
+    ordering is never changed.
+    """
+
+    def __init__(
+        self,
+        max_inbound: int = 1000,
+        max_outbound: int = 1000,
+        policies: dict[str, str] | None = None,
+    ):
+        self.max_inbound = max_inbound
+        self.max_outbound = max_outbound
+        self.policies = {LANE_BACKGROUND: DROP_OLDEST, **(policies or {})}
+
+    @staticmethod
+    def lane_for(msg: InboundMessage) -> str:
+        """Priority lane for an inbound message (``metadata["_lane"]`` overrides)."""
+        if msg.content.strip().lower() in CONTROL_COMMANDS:
+            return LANE_CONTROL
+        lane = msg.metadata.get("_lane")
+        if lane in INBOUND_LANES:
+            return lane
+        if msg.channel in _BACKGROUND_SOURCES or msg.sender_id in _BACKGROUND_SOURCES:
+            return LANE_BACKGROUND
+        if msg.channel == "system":
+            return LANE_SYSTEM
+        return LANE_INTERACTIVE
+
+    def _policy(self, source: str, lane: str) -> str:
+        return self.policies.get(source) or self.policies.get(lane) or BLOCK
+
+    @abstractmethod
+    async def publish_inbound(self, msg: InboundMessage) -> None:
+        """Publish a message from a channel to the agent."""
+        pass
+
+    @abstractmethod
+    async def consume_inbound(self, lanes: tuple[str, ...] | None = None) -> InboundMessage:
+        """Consume the next inbound message, optionally only from ``lanes`` (blocks until available)."""
+        pass
+
+    @abstractmethod
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        """Publish a response from the agent to channels."""
+        pass
+
+    @abstractmethod
+    async def consume_outbound(self) -> OutboundMessage:
+        """Consume the next outbound message (blocks until available)."""
+        pass
+
+    @property
+    @abstractmethod
+    def inbound_size(self) -> int:
+        """Number of pending inbound messages."""
+        pass
+
+    @property
+    @abstractmethod
+    def outbound_size(self) -> int:
+        """Number of pending outbound messages."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, drop counters and latency histograms for both directions."""
+        pass
+
+    def close(self) -> None:
+        """Release backend resources."""
+        pass
+
+
+class MessageBus(BaseMessageBus):
+    """In-process message bus backed by two asyncio priority queues."""
+
+    def __init__(
+        self,
+        max_inbound: int = 1000,
+        max_outbound: int = 1000,
+        policies: dict[str, str] | None = None,
+    ):
+        super().__init__(max_inbound, max_outbound, policies)
+        self.inbound: PriorityQueue[InboundMessage] = PriorityQueue(
+            INBOUND_LANES, max_inbound, unbounded=(LANE_CONTROL,),
+        )
+        self.outbound: PriorityQueue[OutboundMessage] = PriorityQueue((LANE_INTERACTIVE,), max_outbound)
 
     async def publish_inbound(self, msg: InboundMessage) -> None:
         """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
+        lane = self.lane_for(msg)
+        if not await self.inbound.put(msg, lane, self._policy(msg.channel, lane)):
+            logger.warning("Inbound bus full, dropped {} message from {}", lane, msg.channel)
 
-    async def consume_inbound(self) -> InboundMessage:
-        """Consume the next inbound message (blocks until available)."""
-        return await self.inbound.get()
+    async def consume_inbound(self, lanes: tuple[str, ...] | None = None) -> InboundMessage:
+        """Consume the next inbound message, optionally only from ``lanes`` (blocks until available)."""
+        return await self.inbound.get(lanes)
 
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
-        await self.outbound.put(msg)
+        if not await self.outbound.put(msg, LANE_INTERACTIVE, self._policy(msg.channel, "outbound")):
+            logger.warning("Outbound bus full, dropped message to {}", msg.channel)
 
     async def consume_outbound(self) -> OutboundMessage:
         """Consume the next outbound message (blocks until available)."""
@@ -42,3 +277,7 @@ class MessageBus:
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
         return self.outbound.qsize()
+
+    def stats(self) -> dict[str, Any]:
+        """Per-lane depth, drop counters and latency histograms for both directions."""
+        return {"inbound": self.inbound.stats(), "outbound": self.outbound.stats()}
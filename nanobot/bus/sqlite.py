@@ -0,0 +1,266 @@
+"""SQLite-backed message bus for running channels and agent workers in separate processes."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import (
+    DROP_OLDEST,
+    INBOUND_LANES,
+    LANE_CONTROL,
+    BaseMessageBus,
+    LatencyHistogram,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inbound (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shard INTEGER NOT NULL,
+    lane INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    enqueued REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS inbound_claim ON inbound (shard, lane, id);
+CREATE TABLE IF NOT EXISTS outbound (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    enqueued REAL NOT NULL
+);
+"""
+
+
+def shard_for(key: str, workers: int) -> int:
+    """Stable worker index for an affinity key (same key, same worker, across processes)."""
+    return zlib.crc32(key.encode("utf-8")) % max(1, workers)
+
+
+def _encode_inbound(msg: InboundMessage) -> str:
+    data = asdict(msg)
+    data["timestamp"] = msg.timestamp.isoformat()
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _decode_inbound(payload: str) -> InboundMessage:
+    data = json.loads(payload)
+    data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    return InboundMessage(**data)
+
+
+class SqliteMessageBus(BaseMessageBus):
+    """
+    Message bus backend over a shared SQLite file (WAL mode).
+
+    Channel frontends and N agent worker processes open the same database.
+    Every inbound message is written to the shard ``crc32(affinity_key) %
+    workers``. Worker ``i`` only claims rows from shard ``i``, so one
+    session's messages are always handled in order by a single process.
+    Outbound messages go to one shared queue that the frontend drains.
+
+    Rows are claimed with ``DELETE ... RETURNING``, so a message is delivered
+    at most once. Consumers poll: an idle bus costs one indexed query per
+    ``poll_interval``. ``worker_index=None`` means this process does not
+    consume inbound messages (a frontend).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        workers: int = 1,
+        worker_index: int | None = None,
+        max_inbound: int = 1000,
+        max_outbound: int = 1000,
+        policies: dict[str, str] | None = None,
+        poll_interval: float = 0.05,
+    ):
+        super().__init__(max_inbound, max_outbound, policies)
+        if worker_index is not None and not 0 <= worker_index < workers:
+            raise ValueError(f"worker_index must be in [0, {workers})")
+        self.path = Path(path)
+        self.workers = max(1, workers)
+        self.worker_index = worker_index
+        self.poll_interval = poll_interval
+        self.dropped = {"inbound": 0, "outbound": 0}
+        self.latency = {"inbound": LatencyHistogram(), "outbound": LatencyHistogram()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._claims: dict[str, asyncio.Future] = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _run(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def _claim(self, direction: str, claim, slot: str | None = None) -> tuple[str, float]:
+        """
+        Poll until ``claim`` returns a row.
+
+        A claim deletes its row, so it must not be lost when the caller is
+        cancelled (e.g. ``wait_for`` timing out) while the query is running.
+        The in-flight claim is shielded and handed to the next caller with the
+        same ``slot`` (the direction by default).
+        """
+        slot = slot or direction
+        while True:
+            task = self._claims.pop(slot, None) or asyncio.ensure_future(asyncio.to_thread(claim))
+            try:
+                row = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    self._claims[slot] = task
+                raise
+            if row is not None:
+                self.latency[direction].observe((time.time() - row[1]) * 1000)
+                return row
+            await asyncio.sleep(self.poll_interval)
+
+    # ---- inbound ----
+
+    def _insert_inbound(self, shard: int, lane: int, payload: str, policy: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.max_inbound > 0 and lane != INBOUND_LANES.index(LANE_CONTROL):
+                    (size,) = self._conn.execute("SELECT COUNT(*) FROM inbound").fetchone()
+                    if size >= self.max_inbound:
+                        if policy != DROP_OLDEST:
+                            self._conn.execute("ROLLBACK")
+                            return False
+                        victim = self._conn.execute(
+                            "SELECT id FROM inbound WHERE lane >= ? ORDER BY lane DESC, id LIMIT 1", (lane,)
+                        ).fetchone()
+                        if victim is None:
+                            self._conn.execute("ROLLBACK")
+                            self.dropped["inbound"] += 1
+                            return False  # Only higher-priority work is queued: drop the newcomer
+                        self._conn.execute("DELETE FROM inbound WHERE id = ?", victim)
+                        self.dropped["inbound"] += 1
+                self._conn.execute(
+                    "INSERT INTO inbound (shard, lane, payload, enqueued) VALUES (?, ?, ?, ?)",
+                    (shard, lane, payload, time.time()),
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def publish_inbound(self, msg: InboundMessage) -> None:
+        """Publish a message to the worker that owns its session."""
+        lane = self.lane_for(msg)
+        policy = self._policy(msg.channel, lane)
+        shard = shard_for(msg.affinity_key, self.workers)
+        payload = _encode_inbound(msg)
+        # A full bus under the block policy waits for workers to drain it
+        while not await asyncio.to_thread(self._insert_inbound, shard, INBOUND_LANES.index(lane), payload, policy):
+            if policy == DROP_OLDEST:
+                logger.warning("Inbound bus full, dropped {} message from {}", lane, msg.channel)
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    def _claim_inbound(self, lanes: tuple[int, ...]) -> tuple[str, float] | None:
+        rows = self._run(
+            "DELETE FROM inbound WHERE id = (SELECT id FROM inbound WHERE shard = ?"
+            f" AND lane IN ({', '.join('?' * len(lanes))}) ORDER BY lane, id LIMIT 1) RETURNING payload, enqueued",
+            (self.worker_index, *lanes),
+        )
+        return rows[0] if rows else None
+
+    async def consume_inbound(self, lanes: tuple[str, ...] | None = None) -> InboundMessage:
+        """Claim the next message for this worker's shard, optionally only from ``lanes``."""
+        if self.worker_index is None:
+            raise RuntimeError("This bus has no worker_index and cannot consume inbound messages")
+        lanes = lanes or INBOUND_LANES
+        indexes = tuple(INBOUND_LANES.index(lane) for lane in lanes)
+        # Each lane set has its own claim slot, so a claim for one consumer never reaches another
+        payload, _ = await self._claim(
+            "inbound", lambda: self._claim_inbound(indexes), slot="inbound:" + ",".join(lanes),
+        )
+        return _decode_inbound(payload)
+
+    # ---- outbound ----
+
+    def _insert_outbound(self, payload: str, policy: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.max_outbound > 0:
+                    (size,) = self._conn.execute("SELECT COUNT(*) FROM outbound").fetchone()
+                    if size >= self.max_outbound:
+                        if policy != DROP_OLDEST:
+                            self._conn.execute("ROLLBACK")
+                            return False
+                        self._conn.execute("DELETE FROM outbound WHERE id = (SELECT MIN(id) FROM outbound)")
+                        self.dropped["outbound"] += 1
+                self._conn.execute(
+                    "INSERT INTO outbound (payload, enqueued) VALUES (?, ?)", (payload, time.time())
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        """Publish a response for the channel frontend to deliver."""
+        payload = json.dumps(asdict(msg), ensure_ascii=False)
+        policy = self._policy(msg.channel, "outbound")
+        while not await asyncio.to_thread(self._insert_outbound, payload, policy):
+            await asyncio.sleep(self.poll_interval)
+
+    def _claim_outbound(self) -> tuple[str, float] | None:
+        rows = self._run(
+            "DELETE FROM outbound WHERE id = (SELECT MIN(id) FROM outbound) RETURNING payload, enqueued"
+        )
+        return rows[0] if rows else None
+
+    async def consume_outbound(self) -> OutboundMessage:
+        """Claim the next outbound message (blocks until available)."""
+        payload, _ = await self._claim("outbound", self._claim_outbound)
+        return OutboundMessage(**json.loads(payload))
+
+    # ---- metrics ----
+
+    @property
+    def inbound_size(self) -> int:
+        """Number of pending inbound messages across all shards."""
+        return self._run("SELECT COUNT(*) FROM inbound")[0][0]
+
+    @property
+    def outbound_size(self) -> int:
+        """Number of pending outbound messages."""
+        return self._run("SELECT COUNT(*) FROM outbound")[0][0]
+
+    def stats(self) -> dict[str, Any]:
+        """Per-shard/lane depth plus this process's drop counters and latency histograms."""
+        depth: dict[str, dict[str, int]] = {}
+        for shard, lane, count in self._run(
+            "SELECT shard, lane, COUNT(*) FROM inbound GROUP BY shard, lane"
+        ):
+            depth.setdefault(str(shard), {})[INBOUND_LANES[lane]] = count
+        return {
+            "backend": "sqlite",
+            "inbound": {"size": self.inbound_size, "maxsize": self.max_inbound, "shards": depth,
+                        "dropped": self.dropped["inbound"], "latency": self.latency["inbound"].snapshot()},
+            "outbound": {"size": self.outbound_size, "maxsize": self.max_outbound,
+                         "dropped": self.dropped["outbound"], "latency": self.latency["outbound"].snapshot()},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                logger.debug("Error closing bus database: {}", e)
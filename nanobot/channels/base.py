@@ -1,12 +1,17 @@
 """Base channel interface for chat platforms."""
 
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
+
+if TYPE_CHECKING:
+    from nanobot.channels.coalesce import InboundCoalescer
 
 
 class BaseChannel(ABC):
@@ -18,8 +23,16 @@ class BaseChannel(ABC):
     """
     
     name: str = "base"
+
+    # Channels that can edit a sent message in place receive streamed progress
+    # (metadata "_stream"/"_stream_id"); others only get the final reply.
+    supports_streaming: bool = False
+
+    # Channels where back-to-back messages are separate requests (e.g. email)
+    # opt out of inbound coalescing.
+    coalesce_inbound: bool = True
     
-    def __init__(self, config: Any, bus: MessageBus):
+    def __init__(self, config: Any, bus: BaseMessageBus):
         """
         Initialize the channel.
         
@@ -29,6 +42,7 @@ class BaseChannel(ABC):
         """
         self.config = config
         self.bus = bus
+        self.coalescer: InboundCoalescer | None = None  # Set by ChannelManager when enabled
         self._running = False
     
     @abstractmethod
@@ -95,7 +109,8 @@ class BaseChannel(ABC):
         """
         Handle an incoming message from the chat platform.
         
-        This method checks permissions and forwards to the bus.
+        This method checks permissions and forwards to the bus (through the
+        coalescer, when one is attached).
         
         Args:
             sender_id: The sender's identifier.
@@ -123,7 +138,10 @@ class BaseChannel(ABC):
             session_key_override=session_key,
         )
         
-        await self.bus.publish_inbound(msg)
+        if self.coalescer is not None:
+            await self.coalescer.add(msg)
+        else:
+            await self.bus.publish_inbound(msg)
     
     @property
     def is_running(self) -> bool:
@@ -0,0 +1,114 @@
+"""Debounce rapid-fire inbound messages into a single agent turn."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import BaseMessageBus
+
+
+@dataclass
+class _Pending:
+    """Messages buffered for one session."""
+    messages: list[InboundMessage] = field(default_factory=list)
+    first_at: float = 0.0
+    timer: asyncio.Task | None = None
+
+
+def merge_messages(messages: list[InboundMessage]) -> InboundMessage:
+    """
+    Merge consecutive messages from one session into one.
+
+    Text is joined line by line (prefixed with the sender when several people
+    spoke), media lists are concatenated, and metadata comes from the last
+    message plus ``coalesced_count`` and the original ``message_ids``.
+    """
+    if len(messages) == 1:
+        return messages[0]
+    last = messages[-1]
+    multi_sender = len({m.sender_id for m in messages}) > 1
+    lines = [
+        f"{m.sender_id}: {m.content}" if multi_sender else m.content
+        for m in messages if m.content
+    ]
+    metadata = {**last.metadata, "coalesced_count": len(messages)}
+    ids = [m.metadata["message_id"] for m in messages if m.metadata.get("message_id") is not None]
+    if ids:
+        metadata["message_ids"] = ids
+    return InboundMessage(
+        channel=last.channel,
+        sender_id=last.sender_id,
+        chat_id=last.chat_id,
+        content="\n".join(lines),
+        timestamp=messages[0].timestamp,
+        media=[path for m in messages for path in m.media],
+        metadata=metadata,
+        session_key_override=last.session_key_override,
+    )
+
+
+class InboundCoalescer:
+    """
+    Per-session debounce stage in front of the bus.
+
+    A message opens (or extends) a window of ``window_ms``. When the window
+    passes with no new message from the same session, everything buffered is
+    published as one turn. ``max_wait_ms`` caps how long a steady stream of
+    messages can hold a turn back. Slash commands are never merged: they flush
+    the session's buffer first and are then published on their own, so
+    ordering is kept.
+    """
+
+    def __init__(self, bus: BaseMessageBus, window_ms: int, max_wait_ms: int = 3000):
+        self.bus = bus
+        self.window = window_ms / 1000
+        self.max_wait = max(window_ms, max_wait_ms) / 1000
+        self._pending: dict[str, _Pending] = {}
+        self.merged = 0  # Messages saved by coalescing
+
+    async def add(self, msg: InboundMessage) -> None:
+        """Buffer a message, or publish it immediately if it is a command."""
+        key = msg.session_key
+        if msg.content.lstrip().startswith("/"):
+            await self.flush(key)
+            await self.bus.publish_inbound(msg)
+            return
+        state = self._pending.get(key)
+        if state is None:
+            state = self._pending[key] = _Pending(first_at=time.monotonic())
+        state.messages.append(msg)
+        if state.timer:
+            state.timer.cancel()
+        delay = min(self.window, state.first_at + self.max_wait - time.monotonic())
+        state.timer = asyncio.create_task(self._flush_after(key, max(0.0, delay)))
+
+    async def _flush_after(self, key: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        state = self._pending.get(key)
+        if state is not None and state.timer is asyncio.current_task():
+            state.timer = None  # Keep flush() from cancelling this task mid-publish
+        await self.flush(key)
+
+    async def flush(self, key: str) -> None:
+        """Publish whatever is buffered for a session now."""
+        state = self._pending.pop(key, None)
+        if state is None:
+            return
+        if state.timer:
+            state.timer.cancel()
+        if not state.messages:
+            return
+        if len(state.messages) > 1:
+            self.merged += len(state.messages) - 1
+            logger.debug("Coalesced {} messages for {}", len(state.messages), key)
+        await self.bus.publish_inbound(merge_messages(state.messages))
+
+    async def flush_all(self) -> None:
+        """Publish every buffered session (used on shutdown)."""
+        for key in list(self._pending):
+            await self.flush(key)
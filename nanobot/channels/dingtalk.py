@@ -9,7 +9,7 @@ from loguru import logger
 import httpx
 
 from nanobot.bus.events import OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import DingTalkConfig
 
@@ -97,7 +97,7 @@ class DingTalkChannel(BaseChannel):
 
     name = "dingtalk"
 
-    def __init__(self, config: DingTalkConfig, bus: MessageBus):
+    def __init__(self, config: DingTalkConfig, bus: BaseMessageBus):
         super().__init__(config, bus)
         self.config: DingTalkConfig = config
         self._client: Any = None
@@ -10,7 +10,7 @@ import websockets
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import DiscordConfig
 
@@ -46,8 +46,9 @@ class DiscordChannel(BaseChannel):
     """Discord channel using Gateway websocket."""
 
     name = "discord"
+    supports_streaming = True
 
-    def __init__(self, config: DiscordConfig, bus: MessageBus):
+    def __init__(self, config: DiscordConfig, bus: BaseMessageBus):
         super().__init__(config, bus)
         self.config: DiscordConfig = config
         self._ws: websockets.WebSocketClientProtocol | None = None
@@ -55,6 +56,7 @@ class DiscordChannel(BaseChannel):
         self._heartbeat_task: asyncio.Task | None = None
         self._typing_tasks: dict[str, asyncio.Task] = {}
         self._http: httpx.AsyncClient | None = None
+        self._stream_messages: dict[str, dict[str, str]] = {}  # chat_id -> {stream_id: message_id}
 
     async def start(self) -> None:
         """Start the Discord gateway connection."""
@@ -105,6 +107,11 @@ class DiscordChannel(BaseChannel):
         headers = {"Authorization": f"Bot {self.config.token}"}
 
         try:
+            if (stream_id := msg.metadata.get("_stream_id")) and await self._send_stream_update(
+                url, headers, msg, stream_id
+            ):
+                return
+
             chunks = _split_message(msg.content or "")
             if not chunks:
                 return
@@ -117,18 +124,49 @@ class DiscordChannel(BaseChannel):
                     payload["message_reference"] = {"message_id": msg.reply_to}
                     payload["allowed_mentions"] = {"replied_user": False}
 
-                if not await self._send_payload(url, headers, payload):
+                if await self._send_payload(url, headers, payload) is None:
                     break  # Abort remaining chunks on failure
         finally:
             await self._stop_typing(msg.chat_id)
 
-    async def _send_payload(
-        self, url: str, headers: dict[str, str], payload: dict[str, Any]
+    async def _send_stream_update(
+        self, url: str, headers: dict[str, str], msg: OutboundMessage, stream_id: str
     ) -> bool:
-        """Send a single Discord API payload with retry on rate-limit. Returns True on success."""
+        """Edit a streamed message in place. Returns False if the normal send path should run."""
+        if not msg.metadata.get("_progress"):
+            # Final reply: replace the streamed draft when it fits in one message.
+            message_id = self._stream_messages.pop(msg.chat_id, {}).get(stream_id)
+            if message_id is None:
+                return False
+            if len(msg.content or "") > MAX_MESSAGE_LEN:
+                await self._send_payload(f"{url}/{message_id}", headers, None, method="DELETE")
+                return False
+            data = await self._send_payload(
+                f"{url}/{message_id}", headers, {"content": msg.content}, method="PATCH"
+            )
+            return data is not None
+
+        streams = self._stream_messages.setdefault(msg.chat_id, {})
+        payload = {"content": msg.content[:MAX_MESSAGE_LEN]}
+        if (message_id := streams.get(stream_id)) is None:
+            data = await self._send_payload(url, headers, payload)
+            if data and data.get("id"):
+                streams[stream_id] = str(data["id"])
+        else:
+            await self._send_payload(f"{url}/{message_id}", headers, payload, method="PATCH")
+        return True
+
+    async def _send_payload(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, Any] | None,
+        method: str = "POST",
+    ) -> dict[str, Any] | None:
+        """Send a single Discord API request with retry on rate-limit. Returns the body on success, None on failure."""
         for attempt in range(3):
             try:
-                response = await self._http.post(url, headers=headers, json=payload)
+                response = await self._http.request(method, url, headers=headers, json=payload)
                 if response.status_code == 429:
                     data = response.json()
                     retry_after = float(data.get("retry_after", 1.0))
@@ -136,13 +174,13 @@ class DiscordChannel(BaseChannel):
                     await asyncio.sleep(retry_after)
                     continue
                 response.raise_for_status()
-                return True
+                return response.json() if response.content else {}
             except Exception as e:
                 if attempt == 2:
                     logger.error("Error sending Discord message: {}", e)
                 else:
                     await asyncio.sleep(1)
-        return False
+        return None
 
     async def _gateway_loop(self) -> None:
         """Main gateway loop: identify, heartbeat, dispatch events."""
@@ -17,7 +17,7 @@ from typing import Any
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import EmailConfig
 
@@ -35,6 +35,7 @@ class EmailChannel(BaseChannel):
     """
 
     name = "email"
+    coalesce_inbound = False
     _IMAP_MONTHS = (
         "Jan",
         "Feb",
@@ -50,7 +51,7 @@ class EmailChannel(BaseChannel):
         "Dec",
     )
 
-    def __init__(self, config: EmailConfig, bus: MessageBus):
+    def __init__(self, config: EmailConfig, bus: BaseMessageBus):
         super().__init__(config, bus)
         self.config: EmailConfig = config
         self._last_subject_by_chat: dict[str, str] = {}
@@ -12,7 +12,7 @@ from typing import Any
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import FeishuConfig
 
@@ -241,7 +241,7 @@ class FeishuChannel(BaseChannel):
     
     name = "feishu"
     
-    def __init__(self, config: FeishuConfig, bus: MessageBus):
+    def __init__(self, config: FeishuConfig, bus: BaseMessageBus):
         super().__init__(config, bus)
         self.config: FeishuConfig = config
         self._client: Any = None
@@ -3,14 +3,56 @@
 from __future__ import annotations
 
 import asyncio
+import random
+from collections import deque
 from typing import Any
 
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.coalesce import InboundCoalescer
 from nanobot.config.schema import Config
+from nanobot.utils.http import HttpClientPool
+
+
+class _Outbox:
+    """Bounded FIFO of messages waiting for one destination."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, maxsize)
+        self.items: deque[OutboundMessage] = deque()
+        self.dropped = 0
+        self.space = asyncio.Event()
+
+    def put(self, msg: OutboundMessage) -> bool:
+        """
+        Append a message without waiting; returns False if the buffer is full of replies.
+
+        Progress updates are superseded by later ones, so a full buffer first
+        sheds its oldest progress message (or the progress newcomer). Replies
+        are never dropped: the caller has to wait for ``space`` and retry.
+        """
+        if len(self.items) < self.maxsize:
+            self.items.append(msg)
+            return True
+        stale = next((m for m in self.items if m.metadata.get("_progress")), None)
+        if stale is not None:
+            self.items.remove(stale)
+            self.items.append(msg)
+            self.dropped += 1
+            return True
+        if msg.metadata.get("_progress"):
+            self.dropped += 1
+            return True  # The newcomer is the one to shed
+        self.space.clear()
+        return False
+
+    def pop(self) -> OutboundMessage:
+        msg = self.items.popleft()
+        self.space.set()
+        return msg
 
 
 class ChannelManager:
@@ -21,15 +63,29 @@ class ChannelManager:
     - Initialize enabled channels (Telegram, WhatsApp, etc.)
     - Start/stop channels
     - Route outbound messages
+
+    Outbound delivery fans out to one worker per destination (chat, or channel
+    when ``outbound_per_chat`` is off), so a slow upload or rate-limit sleep
+    only delays its own destination. Each destination keeps FIFO order, has a
+    bounded buffer and retries failed sends with jittered backoff. Progress
+    updates are shed from a full buffer; a buffer full of replies holds the
+    dispatcher, so the bounded outbound bus pushes back on the agent instead
+    of losing replies.
     """
     
-    def __init__(self, config: Config, bus: MessageBus):
+    def __init__(self, config: Config, bus: BaseMessageBus, http: HttpClientPool | None = None):
         self.config = config
         self.bus = bus
+        self.http = http
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self._outboxes: dict[tuple[str, ...], _Outbox] = {}
+        self._senders: dict[tuple[str, ...], asyncio.Task] = {}
+        self.send_failures = 0
+        self.coalescer: InboundCoalescer | None = None
         
         self._init_channels()
+        self._init_coalescing()
     
     def _init_channels(self) -> None:
         """Initialize channels based on config."""
@@ -42,6 +98,7 @@ class ChannelManager:
                     self.config.channels.telegram,
                     self.bus,
                     groq_api_key=self.config.providers.groq.api_key,
+                    http=self.http,
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -137,6 +194,16 @@ class ChannelManager:
             except ImportError as e:
                 logger.warning("QQ channel not available: {}", e)
     
+    def _init_coalescing(self) -> None:
+        """Attach one shared inbound coalescer to channels that allow it."""
+        cfg = self.config.channels
+        if cfg.coalesce_ms <= 0:
+            return
+        self.coalescer = InboundCoalescer(self.bus, cfg.coalesce_ms, cfg.coalesce_max_ms)
+        for channel in self.channels.values():
+            if channel.coalesce_inbound:
+                channel.coalescer = self.coalescer
+    
     async def _start_channel(self, name: str, channel: BaseChannel) -> None:
         """Start a channel and log any exceptions."""
         try:
@@ -166,6 +233,10 @@ class ChannelManager:
         """Stop all channels and the dispatcher."""
         logger.info("Stopping all channels...")
         
+        # Hand buffered inbound messages to the agent
+        if self.coalescer:
+            await self.coalescer.flush_all()
+        
         # Stop dispatcher
         if self._dispatch_task:
             self._dispatch_task.cancel()
@@ -174,6 +245,14 @@ class ChannelManager:
             except asyncio.CancelledError:
                 pass
         
+        # Give destination workers a moment to flush, then cancel the rest
+        senders = list(self._senders.values())
+        if senders:
+            _, pending = await asyncio.wait(senders, timeout=5.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*senders, return_exceptions=True)
+        
         # Stop all channels
         for name, channel in self.channels.items():
             try:
@@ -200,11 +279,10 @@ class ChannelManager:
                         continue
                 
                 channel = self.channels.get(msg.channel)
+                if channel and msg.metadata.get("_stream") and not channel.supports_streaming:
+                    continue
                 if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error("Error sending to {}: {}", msg.channel, e)
+                    await self._enqueue_outbound(msg)
                 else:
                     logger.warning("Unknown channel: {}", msg.channel)
                     
@@ -213,6 +291,53 @@ class ChannelManager:
             except asyncio.CancelledError:
                 break
     
+    def _destination(self, msg: OutboundMessage) -> tuple[str, ...]:
+        if self.config.channels.outbound_per_chat:
+            return (msg.channel, msg.chat_id)
+        return (msg.channel,)
+
+    async def _enqueue_outbound(self, msg: OutboundMessage) -> None:
+        """Buffer a message for its destination, waiting while that buffer is full of replies."""
+        key = self._destination(msg)
+        while True:
+            outbox = self._outboxes.get(key)
+            if outbox is None:
+                outbox = self._outboxes[key] = _Outbox(self.config.channels.outbound_buffer)
+            accepted = outbox.put(msg)
+            if key not in self._senders:
+                self._senders[key] = asyncio.create_task(self._deliver(key, outbox))
+            if accepted:
+                return
+            logger.warning("Outbox for {} is full, holding outbound dispatch until it drains", ":".join(key))
+            await outbox.space.wait()
+
+    async def _deliver(self, key: tuple[str, ...], outbox: _Outbox) -> None:
+        """Send one destination's messages in order, then exit once its buffer is drained."""
+        try:
+            while outbox.items:
+                await self._send_with_retry(outbox.pop())
+        finally:
+            self._senders.pop(key, None)
+            if not outbox.items:
+                self._outboxes.pop(key, None)
+
+    async def _send_with_retry(self, msg: OutboundMessage) -> None:
+        """Send a message, retrying failures with jittered exponential backoff."""
+        channel = self.channels[msg.channel]
+        retries = 0 if msg.metadata.get("_progress") else self.config.channels.send_retries
+        for attempt in range(retries + 1):
+            try:
+                await channel.send(msg)
+                return
+            except Exception as e:
+                if attempt == retries:
+                    self.send_failures += 1
+                    logger.error("Error sending to {}: {}", msg.channel, e)
+                    return
+                delay = self.config.channels.send_retry_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning("Send to {}:{} failed ({}), retrying in {:.1f}s", msg.channel, msg.chat_id, e, delay)
+                await asyncio.sleep(delay)
+
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
         return self.channels.get(name)
@@ -222,7 +347,8 @@ class ChannelManager:
         return {
             name: {
                 "enabled": True,
-                "running": channel.is_running
+                "running": channel.is_running,
+                "pending": sum(len(box.items) for key, box in self._outboxes.items() if key[0] == name),
             }
             for name, channel in self.channels.items()
         }
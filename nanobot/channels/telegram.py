@@ -10,9 +10,10 @@ from telegram.ext import Application, CommandHandler, MessageHandler, filters, C
 from telegram.request import HTTPXRequest
 
 from nanobot.bus.events import OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import BaseMessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import TelegramConfig
+from nanobot.utils.http import HttpClientPool
 
 
 def _markdown_to_telegram_html(text: str) -> str:
@@ -106,26 +107,31 @@ class TelegramChannel(BaseChannel):
     """
     
     name = "telegram"
+    supports_streaming = True
     
     # Commands registered with Telegram's command menu
     BOT_COMMANDS = [
         BotCommand("start", "Start the bot"),
         BotCommand("new", "Start a new conversation"),
+        BotCommand("stop", "Stop the current task"),
         BotCommand("help", "Show available commands"),
     ]
     
     def __init__(
         self,
         config: TelegramConfig,
-        bus: MessageBus,
+        bus: BaseMessageBus,
         groq_api_key: str = "",
+        http: HttpClientPool | None = None,
     ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
+        self.http = http
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[str, asyncio.Task] = {}  # chat_id -> typing loop task
+        self._stream_messages: dict[str, dict[str, int]] = {}  # chat_id -> {stream_id: message_id}
     
     async def start(self) -> None:
         """Start the Telegram bot with long polling."""
@@ -146,6 +152,7 @@ class TelegramChannel(BaseChannel):
         # Add command handlers
         self._app.add_handler(CommandHandler("start", self._on_start))
         self._app.add_handler(CommandHandler("new", self._forward_command))
+        self._app.add_handler(CommandHandler("stop", self._forward_command))
         self._app.add_handler(CommandHandler("help", self._on_help))
         
         # Add message handler for text, photos, voice, documents
@@ -233,6 +240,11 @@ class TelegramChannel(BaseChannel):
                     allow_sending_without_reply=True
                 )
 
+        if (stream_id := msg.metadata.get("_stream_id")) and await self._send_stream_update(
+            chat_id, msg, stream_id, reply_params
+        ):
+            return
+
         # Send media files
         for media_path in (msg.media or []):
             try:
@@ -280,6 +292,52 @@ class TelegramChannel(BaseChannel):
                     except Exception as e2:
                         logger.error("Error sending Telegram message: {}", e2)
     
+    async def _send_stream_update(
+        self, chat_id: int, msg: OutboundMessage, stream_id: str, reply_params: ReplyParameters | None
+    ) -> bool:
+        """Edit a streamed message in place. Returns False if the normal send path should run."""
+        if not msg.metadata.get("_progress"):
+            # Final reply: replace the streamed draft when it fits in one message.
+            message_id = self._stream_messages.pop(msg.chat_id, {}).get(stream_id)
+            if message_id is None:
+                return False
+            if msg.media or len(msg.content) > 4000:
+                try:
+                    await self._app.bot.delete_message(chat_id=chat_id, message_id=message_id)
+                except Exception as e:
+                    logger.debug("Failed to delete streamed draft: {}", e)
+                return False
+            try:
+                await self._app.bot.edit_message_text(
+                    chat_id=chat_id, message_id=message_id,
+                    text=_markdown_to_telegram_html(msg.content), parse_mode="HTML",
+                )
+            except Exception as e:
+                logger.warning("HTML edit failed, falling back to plain text: {}", e)
+                try:
+                    await self._app.bot.edit_message_text(
+                        chat_id=chat_id, message_id=message_id, text=msg.content,
+                    )
+                except Exception as e2:
+                    logger.debug("Failed to finalize streamed message: {}", e2)
+                    return False
+            return True
+
+        # Progress snapshot: plain text, since partial markdown may not parse as HTML.
+        streams = self._stream_messages.setdefault(msg.chat_id, {})
+        text = msg.content[:4000]
+        try:
+            if (message_id := streams.get(stream_id)) is None:
+                sent = await self._app.bot.send_message(
+                    chat_id=chat_id, text=text, reply_parameters=reply_params,
+                )
+                streams[stream_id] = sent.message_id
+            else:
+                await self._app.bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=text)
+        except Exception as e:
+            logger.debug("Telegram stream update failed: {}", e)
+        return True
+
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
         if not update.message or not update.effective_user:
@@ -299,6 +357,7 @@ class TelegramChannel(BaseChannel):
         await update.message.reply_text(
             "🐈 nanobot commands:\n"
             "/new — Start a new conversation\n"
+            "/stop — Stop the current task\n"
             "/help — Show available commands"
         )
 
@@ -377,7 +436,7 @@ class TelegramChannel(BaseChannel):
                 # Handle voice transcription
                 if media_type == "voice" or media_type == "audio":
                     from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
+                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key, http=self.http)
                     transcription = await transcriber.transcribe(file_path)
                     if transcription:
                         logger.info("Transcribed {}: {}...", media_type, transcription[:50])
@@ -267,6 +267,46 @@ def _make_provider(config: Config):
     )
 
 
+def _make_bus(config: Config, worker_index: int | None = None):
+    """Create the message bus selected by config.bus (in-process or SQLite-backed)."""
+    from nanobot.bus.queue import MessageBus
+
+    cfg = config.bus
+    if cfg.backend == "sqlite":
+        from nanobot.bus.sqlite import SqliteMessageBus
+        from nanobot.config.loader import get_data_dir
+
+        path = Path(cfg.path).expanduser() if cfg.path else get_data_dir() / "bus.db"
+        return SqliteMessageBus(path, cfg.workers, worker_index, cfg.max_inbound, cfg.max_outbound, cfg.policies)
+    if cfg.backend != "memory":
+        console.print(f"[red]Error: Unknown bus backend '{cfg.backend}'.[/red]")
+        raise typer.Exit(1)
+    return MessageBus(cfg.max_inbound, cfg.max_outbound, cfg.policies)
+
+
+def _trace_path(config: Config) -> Path:
+    from nanobot.config.loader import get_data_dir
+
+    return Path(config.tracing.path).expanduser() if config.tracing.path else get_data_dir() / "traces" / "spans.jsonl"
+
+
+def _make_tracer(config: Config):
+    """Create the span tracer; spans go to the trace file when tracing is enabled."""
+    from nanobot.utils.tracing import Tracer
+
+    if not config.tracing.enabled:
+        return Tracer(enabled=False)
+    return Tracer(_trace_path(config), max_bytes=config.tracing.max_file_mb * 1024 * 1024)
+
+
+def _make_usage_ledger():
+    """Open the shared token usage ledger (~/.nanobot/usage.db)."""
+    from nanobot.agent.usage import UsageLedger
+    from nanobot.config.loader import get_data_dir
+
+    return UsageLedger(get_data_dir() / "usage.db")
+
+
 # ============================================================================
 # Gateway / Server
 # ============================================================================
@@ -276,16 +316,18 @@ def _make_provider(config: Config):
 def gateway(
     port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+    role: str = typer.Option("all", "--role", help="all, frontend (channels only) or worker (agent only); split roles need bus.backend=sqlite"),
+    worker: int = typer.Option(0, "--worker", "-w", help="Worker index when --role worker (0 also runs cron and heartbeat)"),
 ):
     """Start the nanobot gateway."""
     from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
     from nanobot.session.manager import SessionManager
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.utils.http import HttpClientPool
     
     if verbose:
         import logging
@@ -294,32 +336,71 @@ def gateway(
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
     
     config = load_config()
-    bus = MessageBus()
-    provider = _make_provider(config)
-    session_manager = SessionManager(config.workspace_path)
+    if role not in ("all", "frontend", "worker"):
+        console.print(f"[red]Error: Unknown role '{role}'.[/red]")
+        raise typer.Exit(1)
+    if role != "all" and config.bus.backend == "memory":
+        console.print("[red]Error: --role frontend/worker requires bus.backend = \"sqlite\".[/red]")
+        raise typer.Exit(1)
+    if role == "all" and config.bus.backend == "sqlite" and config.bus.workers > 1:
+        # A combined process only consumes shard 0; the other shards would never be served
+        console.print(
+            f"[red]Error: bus.workers = {config.bus.workers} needs one --role worker process per shard "
+            "(plus --role frontend); --role all runs a single worker.[/red]"
+        )
+        raise typer.Exit(1)
+    run_agent = role in ("all", "worker")
+    run_channels = role in ("all", "frontend")
+    run_scheduler = role == "all" or (role == "worker" and worker == 0)
+    bus = _make_bus(config, worker_index=(worker if role == "worker" else 0) if run_agent else None)
+    tracer = _make_tracer(config)
+    session_manager = SessionManager(
+        config.workspace_path,
+        max_cached=config.agents.defaults.session_cache_size,
+        ttl=config.agents.defaults.session_cache_ttl,
+        tail_messages=max(500, config.agents.defaults.memory_window),
+    )
+    http = HttpClientPool()  # Shared by web tools, subagents and voice transcription
     
     # Create cron service first (callback set after agent creation)
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
     cron = CronService(cron_store_path)
     
-    # Create agent with cron service
-    agent = AgentLoop(
-        bus=bus,
-        provider=provider,
-        workspace=config.workspace_path,
-        model=config.agents.defaults.model,
-        temperature=config.agents.defaults.temperature,
-        max_tokens=config.agents.defaults.max_tokens,
-        max_iterations=config.agents.defaults.max_tool_iterations,
-        memory_window=config.agents.defaults.memory_window,
-        brave_api_key=config.tools.web.search.api_key or None,
-        exec_config=config.tools.exec,
-        cron_service=cron,
-        restrict_to_workspace=config.tools.restrict_to_workspace,
-        session_manager=session_manager,
-        mcp_servers=config.tools.mcp_servers,
-        channels_config=config.channels,
-    )
+    # Create agent with cron service (frontend-only processes have none)
+    agent = None
+    if run_agent:
+        provider = _make_provider(config)
+        agent = AgentLoop(
+            bus=bus,
+            provider=provider,
+            workspace=config.workspace_path,
+            model=config.agents.defaults.model,
+            temperature=config.agents.defaults.temperature,
+            max_tokens=config.agents.defaults.max_tokens,
+            max_iterations=config.agents.defaults.max_tool_iterations,
+            memory_window=config.agents.defaults.memory_window,
+            brave_api_key=config.tools.web.search.api_key or None,
+            exec_config=config.tools.exec,
+            web_cache_config=config.tools.web.cache,
+            cron_service=cron,
+            restrict_to_workspace=config.tools.restrict_to_workspace,
+            session_manager=session_manager,
+            mcp_servers=config.tools.mcp_servers,
+            channels_config=config.channels,
+            max_concurrency=config.agents.defaults.max_concurrency,
+            max_parallel_tools=config.tools.max_parallel_tool_calls,
+            stream_responses=config.agents.defaults.stream_responses,
+            stream_interval_ms=config.agents.defaults.stream_interval_ms,
+            history_max_tokens=config.agents.defaults.history_max_tokens,
+            tokenizer=config.agents.defaults.tokenizer,
+            supersede_turns=config.agents.defaults.supersede_turns,
+            tracer=tracer,
+            usage_ledger=_make_usage_ledger(),
+            session_token_budget=config.agents.defaults.session_token_budget,
+            vector_memory_config=config.memory.vector,
+            consolidation_config=config.memory.consolidation,
+            http_pool=http,
+        )
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
@@ -341,7 +422,7 @@ def gateway(
     cron.on_job = on_cron_job
     
     # Create channel manager
-    channels = ChannelManager(config, bus)
+    channels = ChannelManager(config, bus, http=http)
 
     def _pick_heartbeat_target() -> tuple[str, str]:
         """Pick a routable channel/chat target for heartbeat-triggered messages."""
@@ -404,20 +485,25 @@ def gateway(
     
     async def run():
         try:
-            await cron.start()
-            await heartbeat.start()
-            await asyncio.gather(
-                agent.run(),
-                channels.start_all(),
-            )
+            tasks = []
+            if run_scheduler:
+                await cron.start()
+                await heartbeat.start()
+            if run_agent:
+                tasks.append(agent.run())
+            if run_channels:
+                tasks.append(channels.start_all())
+            await asyncio.gather(*tasks)
         except KeyboardInterrupt:
             console.print("\nShutting down...")
         finally:
-            await agent.close_mcp()
+            if run_agent:
+                await agent.close_mcp()
+                agent.stop()
             heartbeat.stop()
             cron.stop()
-            agent.stop()
             await channels.stop_all()
+            await http.aclose()
     
     asyncio.run(run())
 
@@ -445,7 +531,8 @@ def agent(
     
     config = load_config()
     
-    bus = MessageBus()
+    bus = MessageBus(config.bus.max_inbound, config.bus.max_outbound, config.bus.policies)
+    tracer = _make_tracer(config)
     provider = _make_provider(config)
 
     # Create cron service for tool usage (no callback needed for CLI unless running)
@@ -468,10 +555,23 @@ def agent(
         memory_window=config.agents.defaults.memory_window,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        web_cache_config=config.tools.web.cache,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         mcp_servers=config.tools.mcp_servers,
         channels_config=config.channels,
+        max_concurrency=config.agents.defaults.max_concurrency,
+        max_parallel_tools=config.tools.max_parallel_tool_calls,
+        stream_responses=config.agents.defaults.stream_responses,
+        stream_interval_ms=config.agents.defaults.stream_interval_ms,
+        history_max_tokens=config.agents.defaults.history_max_tokens,
+        tokenizer=config.agents.defaults.tokenizer,
+        supersede_turns=config.agents.defaults.supersede_turns,
+        tracer=tracer,
+        usage_ledger=_make_usage_ledger(),
+        session_token_budget=config.agents.defaults.session_token_budget,
+        vector_memory_config=config.memory.vector,
+        consolidation_config=config.memory.consolidation,
     )
     
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -530,7 +630,9 @@ def agent(
                         if msg.metadata.get("_progress"):
                             is_tool_hint = msg.metadata.get("_tool_hint", False)
                             ch = agent_loop.channels_config
-                            if ch and is_tool_hint and not ch.send_tool_hints:
+                            if msg.metadata.get("_stream"):
+                                pass  # partial text snapshots; the final reply is printed in full
+                            elif ch and is_tool_hint and not ch.send_tool_hints:
                                 pass
                             elif ch and not is_tool_hint and not ch.send_progress:
                                 pass
@@ -948,6 +1050,7 @@ def cron_run(
     config = load_config()
     provider = _make_provider(config)
     bus = MessageBus()
+    tracer = _make_tracer(config)
     agent_loop = AgentLoop(
         bus=bus,
         provider=provider,
@@ -959,9 +1062,22 @@ def cron_run(
         memory_window=config.agents.defaults.memory_window,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        web_cache_config=config.tools.web.cache,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         mcp_servers=config.tools.mcp_servers,
         channels_config=config.channels,
+        max_concurrency=config.agents.defaults.max_concurrency,
+        max_parallel_tools=config.tools.max_parallel_tool_calls,
+        stream_responses=config.agents.defaults.stream_responses,
+        stream_interval_ms=config.agents.defaults.stream_interval_ms,
+        history_max_tokens=config.agents.defaults.history_max_tokens,
+        tokenizer=config.agents.defaults.tokenizer,
+        supersede_turns=config.agents.defaults.supersede_turns,
+        tracer=tracer,
+        usage_ledger=_make_usage_ledger(),
+        session_token_budget=config.agents.defaults.session_token_budget,
+        vector_memory_config=config.memory.vector,
+        consolidation_config=config.memory.consolidation,
     )
 
     store_path = get_data_dir() / "cron" / "jobs.json"
@@ -1033,6 +1149,67 @@ def status():
                 has_key = bool(p.api_key)
                 console.print(f"{spec.label}: {'[green]✓[/green]' if has_key else '[dim]not set[/dim]'}")
 
+    _print_usage()
+
+
+def _print_usage(days: int = 7) -> None:
+    """Print token usage from the ledger, if any has been recorded."""
+    from nanobot.config.loader import get_data_dir
+
+    if not (get_data_dir() / "usage.db").exists():
+        return
+    ledger = _make_usage_ledger()
+    try:
+        by_day = ledger.summary(by="day", days=days)
+        if not by_day:
+            return
+        console.print(f"\nToken usage (last {days} days)")
+        for by in ("day", "model", "channel", "session"):
+            rows = by_day if by == "day" else ledger.summary(by=by, days=days, limit=5)
+            table = Table(title=f"By {by}")
+            for col in (by.capitalize(), "Calls", "Prompt", "Cached", "Completion", "Total"):
+                table.add_column(col, justify="left" if col == by.capitalize() else "right")
+            for r in rows:
+                table.add_row(str(r[by]), f"{r['calls']:,}", f"{r['prompt_tokens']:,}", f"{r['cached_tokens']:,}",
+                              f"{r['completion_tokens']:,}", f"{r['total_tokens']:,}")
+            console.print(table)
+    finally:
+        ledger.close()
+
+
+@app.command()
+def stats(
+    since: float = typer.Option(24.0, "--since", help="Only include spans from the last N hours (0 = all)"),
+    kind: str = typer.Option(None, "--kind", "-k", help="Only show one span kind (e.g. llm_call)"),
+):
+    """Show agent latency percentiles from the trace file."""
+    import time
+
+    from nanobot.config.loader import load_config
+    from nanobot.utils.tracing import SpanStats, read_trace_file
+
+    config = load_config()
+    path = _trace_path(config)
+    if not path.exists():
+        console.print(f"No traces yet at {path}")
+        return
+
+    cutoff = time.time() - since * 3600 if since > 0 else 0.0
+    summary = SpanStats.from_records(read_trace_file(path), since=cutoff).summary()
+    if kind:
+        summary = {k: v for k, v in summary.items() if k == kind}
+    if not summary:
+        console.print("No matching spans.")
+        return
+
+    table = Table(title=f"Span latency (ms) — {path}")
+    for col in ("Span", "Count", "Errors", "p50", "p95", "p99", "Max"):
+        table.add_column(col, justify="left" if col == "Span" else "right")
+    for name, row in summary.items():
+        table.add_row(name, str(row["count"]), str(row["errors"]),
+                      *(f"{row[k]:.1f}" for k in ("p50", "p95", "p99", "max")))
+    console.print(table)
+
 
 # ============================================================================
 # OAuth Login
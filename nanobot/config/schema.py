@@ -170,6 +170,12 @@ class ChannelsConfig(Base):
 
     send_progress: bool = True    # stream agent's text progress to the channel
     send_tool_hints: bool = False  # stream tool-call hints (e.g. read_file("…"))
+    outbound_buffer: int = 100  # Pending messages buffered per destination; a full buffer holds outbound dispatch
+    outbound_per_chat: bool = True  # One delivery worker per chat (False: one per channel)
+    send_retries: int = 2  # Extra attempts when channel.send raises
+    send_retry_delay: float = 1.0  # Base delay (seconds) for jittered exponential backoff
+    coalesce_ms: int = 0  # Merge a session's messages arriving within this window into one turn (0 = off)
+    coalesce_max_ms: int = 3000  # Longest a steady stream of messages can delay the merged turn
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
@@ -190,6 +196,15 @@ class AgentDefaults(Base):
     temperature: float = 0.1
     max_tool_iterations: int = 40
     memory_window: int = 100
+    history_max_tokens: int = 32000  # Token budget for conversation history in the prompt
+    tokenizer: str = "heuristic"  # "heuristic" or "tiktoken[:<encoding>]"
+    max_concurrency: int = 4  # Max agent turns processed concurrently (across sessions)
+    stream_responses: bool = False  # Stream LLM text to channels that can edit messages in place
+    stream_interval_ms: int = 1000  # Min delay between streamed progress updates
+    supersede_turns: bool = False  # A newer message from the same session cancels its in-flight turn
+    session_token_budget: int = 0  # Max prompt+completion tokens per session per day (0 = unlimited)
+    session_cache_size: int = 256  # Max sessions kept in memory; least recently used are evicted
+    session_cache_ttl: int = 3600  # Evict sessions idle for this many seconds (0 = never)
 
 
 class AgentsConfig(Base):
@@ -228,6 +243,55 @@ class ProvidersConfig(Base):
     github_copilot: ProviderConfig = Field(default_factory=ProviderConfig)  # Github Copilot (OAuth)
 
 
+class BusConfig(Base):
+    """Message bus limits and overflow policies."""
+
+    max_inbound: int = 1000  # 0 = unbounded
+    max_outbound: int = 1000
+    # Overflow policy per channel name or lane ("interactive", "system", "background", "outbound"):
+    # "block" applies backpressure, "drop_oldest" evicts. Background work drops by default.
+    policies: dict[str, str] = Field(default_factory=dict)
+    backend: str = "memory"  # "memory" (single process) or "sqlite" (shared by frontend and worker processes)
+    path: str = ""  # SQLite bus file (default: ~/.nanobot/bus.db)
+    workers: int = 1  # Number of agent worker processes sharing the sqlite bus
+
+
+class TracingConfig(Base):
+    """Agent turn tracing (span timings written as JSONL, summarised by `nanobot stats`)."""
+
+    enabled: bool = True
+    path: str = ""  # Trace file (default: ~/.nanobot/traces/spans.jsonl)
+    max_file_mb: int = 20  # Rotate to <path>.1 beyond this size
+
+
+class VectorMemoryConfig(Base):
+    """Embedding retrieval over MEMORY.md and HISTORY.md (requires numpy)."""
+
+    enabled: bool = False  # Inject only the top-k relevant memories instead of all of MEMORY.md
+    embedding_model: str = ""  # LiteLLM embedding model; "" = built-in local hashing embedder
+    api_key: str = ""
+    api_base: str | None = None
+    dim: int = 512  # Vector size of the built-in embedder
+    top_k: int = 8
+    min_score: float = 0.2  # Cosine similarity below which a memory is not injected
+
+
+class ConsolidationConfig(Base):
+    """Background memory consolidation."""
+
+    model: str = ""  # Model for consolidation calls (e.g. a cheaper one); "" = the agent model
+    workers: int = 2  # Sessions consolidated concurrently
+    max_retries: int = 2
+    retry_delay: float = 2.0  # Seconds before the first retry; doubles each attempt
+
+
+class MemoryConfig(Base):
+    """Agent memory configuration."""
+
+    vector: VectorMemoryConfig = Field(default_factory=VectorMemoryConfig)
+    consolidation: ConsolidationConfig = Field(default_factory=ConsolidationConfig)
+
+
 class GatewayConfig(Base):
     """Gateway/server configuration."""
 
@@ -242,10 +306,21 @@ class WebSearchConfig(Base):
     max_results: int = 5
 
 
+class WebCacheConfig(Base):
+    """Cache for web_fetch/web_search results."""
+
+    enabled: bool = True
+    ttl_seconds: int = 900
+    max_memory_mb: int = 32
+    persist: bool = True  # Also keep entries under <workspace>/.cache/web across restarts
+    max_disk_mb: int = 256
+
+
 class WebToolsConfig(Base):
     """Web tools configuration."""
 
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    cache: WebCacheConfig = Field(default_factory=WebCacheConfig)
 
 
 class ExecToolConfig(Base):
@@ -271,6 +346,7 @@ class ToolsConfig(Base):
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
+    max_parallel_tool_calls: int = 4  # Concurrent side-effect-free tool calls per LLM turn (1 = serial)
     mcp_servers: dict[str, MCPServerConfig] = Field(default_factory=dict)
 
 
@@ -281,6 +357,9 @@ class Config(BaseSettings):
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
 
     @property
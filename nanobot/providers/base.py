@@ -2,7 +2,32 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, AsyncIterator
+
+import json_repair
+
+
+def parse_usage(usage: Any) -> dict[str, int]:
+    """
+    Normalise a provider usage object into prompt/completion/total/cached token counts.
+
+    Cached prompt tokens come from ``prompt_tokens_details.cached_tokens``
+    (OpenAI style) or ``cache_read_input_tokens`` (Anthropic via LiteLLM).
+    """
+    if not usage:
+        return {}
+    get = usage.get if isinstance(usage, dict) else lambda k, d=None: getattr(usage, k, d)
+    out = {
+        "prompt_tokens": get("prompt_tokens") or 0,
+        "completion_tokens": get("completion_tokens") or 0,
+        "total_tokens": get("total_tokens") or 0,
+    }
+    details = get("prompt_tokens_details")
+    cached = (details.get("cached_tokens") if isinstance(details, dict)
+              else getattr(details, "cached_tokens", None)) or get("cache_read_input_tokens")
+    if isinstance(cached, int) and cached:
+        out["cached_tokens"] = cached
+    return out
 
 
 @dataclass
@@ -28,6 +53,80 @@ class LLMResponse:
         return len(self.tool_calls) > 0
 
 
+@dataclass
+class LLMStreamChunk:
+    """
+    One event of a streaming chat completion.
+
+    Intermediate chunks carry a text ``delta``; the last chunk carries the
+    assembled ``response`` (content, tool calls, usage) and no delta.
+    """
+    delta: str = ""
+    response: LLMResponse | None = None
+
+
+class StreamAccumulator:
+    """Assemble OpenAI-style chat completion chunks into an LLMResponse."""
+
+    def __init__(self) -> None:
+        self._content: list[str] = []
+        self._reasoning: list[str] = []
+        self._tool_calls: dict[int, dict[str, str]] = {}
+        self.finish_reason = "stop"
+        self.usage: dict[str, int] = {}
+
+    def add(self, chunk: Any) -> str:
+        """Fold one chunk into the response and return its text delta."""
+        usage = getattr(chunk, "usage", None)
+        if usage:
+            self.usage = parse_usage(usage)
+        if not getattr(chunk, "choices", None):
+            return ""
+
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+        delta = choice.delta
+        if delta is None:
+            return ""
+
+        if reasoning := getattr(delta, "reasoning_content", None):
+            self._reasoning.append(reasoning)
+        for tc in getattr(delta, "tool_calls", None) or []:
+            index = tc.index if tc.index is not None else len(self._tool_calls)
+            buf = self._tool_calls.setdefault(index, {"id": "", "name": "", "arguments": ""})
+            if tc.id:
+                buf["id"] = tc.id
+            if tc.function:
+                if tc.function.name:
+                    buf["name"] = tc.function.name
+                if tc.function.arguments:
+                    buf["arguments"] += tc.function.arguments
+
+        text = delta.content or ""
+        if text:
+            self._content.append(text)
+        return text
+
+    def build(self) -> LLMResponse:
+        """Return the assembled response."""
+        tool_calls = [
+            ToolCallRequest(
+                id=buf["id"],
+                name=buf["name"],
+                arguments=json_repair.loads(buf["arguments"]) if buf["arguments"] else {},
+            )
+            for _, buf in sorted(self._tool_calls.items())
+        ]
+        return LLMResponse(
+            content="".join(self._content) or None,
+            tool_calls=tool_calls,
+            finish_reason=self.finish_reason,
+            usage=self.usage,
+            reasoning_content="".join(self._reasoning) or None,
+        )
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -103,6 +202,29 @@ class LLMProvider(ABC):
             LLMResponse with content and/or tool calls.
         """
         pass
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a chat completion as text deltas followed by the final response.
+
+        Providers without native streaming fall back to a single ``chat()`` call.
+        Errors are reported like ``chat()``: as a final response with
+        ``finish_reason="error"``.
+        """
+        response = await self.chat(
+            messages=messages, tools=tools, model=model,
+            max_tokens=max_tokens, temperature=temperature,
+        )
+        if response.content and response.finish_reason != "error":
+            yield LLMStreamChunk(delta=response.content)
+        yield LLMStreamChunk(response=response)
     
     @abstractmethod
     def get_default_model(self) -> str:
@@ -3,12 +3,19 @@
 import json
 import json_repair
 import os
-from typing import Any
+from typing import Any, AsyncIterator
 
 import litellm
 from litellm import acompletion
 
-from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.base import (
+    LLMProvider,
+    LLMResponse,
+    LLMStreamChunk,
+    StreamAccumulator,
+    ToolCallRequest,
+    parse_usage,
+)
 from nanobot.providers.registry import find_by_model, find_gateway
 
 
@@ -163,27 +170,15 @@ class LiteLLMProvider(LLMProvider):
             sanitized.append(clean)
         return sanitized
 
-    async def chat(
+    def _build_kwargs(
         self,
         messages: list[dict[str, Any]],
-        tools: list[dict[str, Any]] | None = None,
-        model: str | None = None,
-        max_tokens: int = 4096,
-        temperature: float = 0.7,
-    ) -> LLMResponse:
-        """
-        Send a chat completion request via LiteLLM.
-        
-        Args:
-            messages: List of message dicts with 'role' and 'content'.
-            tools: Optional list of tool definitions in OpenAI format.
-            model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
-            max_tokens: Maximum tokens in response.
-            temperature: Sampling temperature.
-        
-        Returns:
-            LLMResponse with content and/or tool calls.
-        """
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        max_tokens: int,
+        temperature: float,
+    ) -> dict[str, Any]:
+        """Build acompletion() kwargs shared by chat() and chat_stream()."""
         original_model = model or self.default_model
         model = self._resolve_model(original_model)
 
@@ -219,7 +214,30 @@ class LiteLLMProvider(LLMProvider):
         if tools:
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
+        return kwargs
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """
+        Send a chat completion request via LiteLLM.
         
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            tools: Optional list of tool definitions in OpenAI format.
+            model: Model identifier (e.g., 'anthropic/claude-sonnet-4-5').
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+        
+        Returns:
+            LLMResponse with content and/or tool calls.
+        """
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature)
         try:
             response = await acompletion(**kwargs)
             return self._parse_response(response)
@@ -229,6 +247,32 @@ class LiteLLMProvider(LLMProvider):
                 content=f"Error calling LLM: {str(e)}",
                 finish_reason="error",
             )
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a chat completion via LiteLLM (stream=True)."""
+        kwargs = self._build_kwargs(messages, tools, model, max_tokens, temperature)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+        acc = StreamAccumulator()
+        try:
+            stream = await acompletion(**kwargs)
+            async for chunk in stream:
+                if delta := acc.add(chunk):
+                    yield LLMStreamChunk(delta=delta)
+        except Exception as e:
+            yield LLMStreamChunk(response=LLMResponse(
+                content=f"Error calling LLM: {str(e)}",
+                finish_reason="error",
+            ))
+            return
+        yield LLMStreamChunk(response=acc.build())
     
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
@@ -249,13 +293,7 @@ class LiteLLMProvider(LLMProvider):
                     arguments=args,
                 ))
         
-        usage = {}
-        if hasattr(response, "usage") and response.usage:
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            }
+        usage = parse_usage(getattr(response, "usage", None))
         
         reasoning_content = getattr(message, "reasoning_content", None) or None
         
@@ -5,13 +5,13 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import json
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, AsyncIterator
 
 import httpx
 from loguru import logger
 
 from oauth_cli_kit import get_token as get_codex_token
-from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.base import LLMProvider, LLMResponse, LLMStreamChunk, ToolCallRequest
 
 DEFAULT_CODEX_URL = "https://chatgpt.com/backend-api/codex/responses"
 DEFAULT_ORIGINATOR = "nanobot"
@@ -32,6 +32,20 @@ class OpenAICodexProvider(LLMProvider):
         max_tokens: int = 4096,
         temperature: float = 0.7,
     ) -> LLMResponse:
+        response: LLMResponse | None = None
+        async for chunk in self.chat_stream(messages, tools, model, max_tokens, temperature):
+            if chunk.response is not None:
+                response = chunk.response
+        return response or LLMResponse(content="Error calling Codex: empty stream", finish_reason="error")
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[LLMStreamChunk]:
         model = model or self.default_model
         system_prompt, input_items = _convert_messages(messages)
 
@@ -58,22 +72,19 @@ class OpenAICodexProvider(LLMProvider):
 
         try:
             try:
-                content, tool_calls, finish_reason = await _request_codex(url, headers, body, verify=True)
+                async for chunk in _stream_codex(url, headers, body, verify=True):
+                    yield chunk
             except Exception as e:
                 if "CERTIFICATE_VERIFY_FAILED" not in str(e):
                     raise
                 logger.warning("SSL certificate verification failed for Codex API; retrying with verify=False")
-                content, tool_calls, finish_reason = await _request_codex(url, headers, body, verify=False)
-            return LLMResponse(
-                content=content,
-                tool_calls=tool_calls,
-                finish_reason=finish_reason,
-            )
+                async for chunk in _stream_codex(url, headers, body, verify=False):
+                    yield chunk
         except Exception as e:
-            return LLMResponse(
+            yield LLMStreamChunk(response=LLMResponse(
                 content=f"Error calling Codex: {str(e)}",
                 finish_reason="error",
-            )
+            ))
 
     def get_default_model(self) -> str:
         return self.default_model
@@ -97,18 +108,19 @@ def _build_headers(account_id: str, token: str) -> dict[str, str]:
     }
 
 
-async def _request_codex(
+async def _stream_codex(
     url: str,
     headers: dict[str, str],
     body: dict[str, Any],
     verify: bool,
-) -> tuple[str, list[ToolCallRequest], str]:
+) -> AsyncGenerator[LLMStreamChunk, None]:
     async with httpx.AsyncClient(timeout=60.0, verify=verify) as client:
         async with client.stream("POST", url, headers=headers, json=body) as response:
             if response.status_code != 200:
                 text = await response.aread()
                 raise RuntimeError(_friendly_error(response.status_code, text.decode("utf-8", "ignore")))
-            return await _consume_sse(response)
+            async for chunk in _consume_sse(response):
+                yield chunk
 
 
 def _convert_tools(tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -242,11 +254,13 @@ async def _iter_sse(response: httpx.Response) -> AsyncGenerator[dict[str, Any],
         buffer.append(line)
 
 
-async def _consume_sse(response: httpx.Response) -> tuple[str, list[ToolCallRequest], str]:
+async def _consume_sse(response: httpx.Response) -> AsyncGenerator[LLMStreamChunk, None]:
+    """Yield text deltas as they arrive, then the assembled response."""
     content = ""
     tool_calls: list[ToolCallRequest] = []
     tool_call_buffers: dict[str, dict[str, Any]] = {}
     finish_reason = "stop"
+    usage: dict[str, int] = {}
 
     async for event in _iter_sse(response):
         event_type = event.get("type")
@@ -262,7 +276,10 @@ async def _consume_sse(response: httpx.Response) -> tuple[str, list[ToolCallRequ
                     "arguments": item.get("arguments") or "",
                 }
         elif event_type == "response.output_text.delta":
-            content += event.get("delta") or ""
+            delta = event.get("delta") or ""
+            if delta:
+                content += delta
+                yield LLMStreamChunk(delta=delta)
         elif event_type == "response.function_call_arguments.delta":
             call_id = event.get("call_id")
             if call_id and call_id in tool_call_buffers:
@@ -291,12 +308,33 @@ async def _consume_sse(response: httpx.Response) -> tuple[str, list[ToolCallRequ
                     )
                 )
         elif event_type == "response.completed":
-            status = (event.get("response") or {}).get("status")
-            finish_reason = _map_finish_reason(status)
+            completed = event.get("response") or {}
+            finish_reason = _map_finish_reason(completed.get("status"))
+            usage = _parse_codex_usage(completed.get("usage"))
         elif event_type in {"error", "response.failed"}:
             raise RuntimeError("Codex response failed")
 
-    return content, tool_calls, finish_reason
+    yield LLMStreamChunk(response=LLMResponse(
+        content=content,
+        tool_calls=tool_calls,
+        finish_reason=finish_reason,
+        usage=usage,
+    ))
+
+
+def _parse_codex_usage(usage: dict[str, Any] | None) -> dict[str, int]:
+    """Map Responses API usage (input/output tokens) onto the chat-completions names."""
+    if not usage:
+        return {}
+    out = {
+        "prompt_tokens": usage.get("input_tokens") or 0,
+        "completion_tokens": usage.get("output_tokens") or 0,
+        "total_tokens": usage.get("total_tokens") or 0,
+    }
+    cached = (usage.get("input_tokens_details") or {}).get("cached_tokens")
+    if cached:
+        out["cached_tokens"] = cached
+    return out
 
 
 _FINISH_REASON_MAP = {"completed": "stop", "incomplete": "length", "failed": "error", "cancelled": "error"}
@@ -1,16 +1,24 @@
 """Session management for conversation history."""
 
 import json
+import os
 import shutil
+import time
+import weakref
+from array import array
+from collections import OrderedDict
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, BinaryIO
 
 from loguru import logger
 
 from nanobot.utils.helpers import ensure_dir, safe_filename
 
+if TYPE_CHECKING:
+    from nanobot.utils.tokens import TokenCounter
+
 
 @dataclass
 class Session:
@@ -30,6 +38,17 @@ class Session:
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
     last_consolidated: int = 0  # Number of messages already consolidated to files
+    # Persistence bookkeeping owned by SessionManager: messages already on disk (-1 forces a
+    # full rewrite) and metadata records appended since the file was last compacted.
+    _persisted: int = field(default=-1, init=False, repr=False, compare=False)
+    _appends: int = field(default=0, init=False, repr=False, compare=False)
+    # Per-message token counts (aligned with messages) and the counter that produced them.
+    _token_counts: list[int] = field(default_factory=list, init=False, repr=False, compare=False)
+    _token_counter: Any = field(default=None, init=False, repr=False, compare=False)
+    # Messages before messages[0] that were left on disk by a tail load. messages, last_consolidated
+    # and _persisted are all relative to the loaded window.
+    _offset: int = field(default=0, init=False, repr=False, compare=False)
+    _saved_state: tuple | None = field(default=None, init=False, repr=False, compare=False)
     
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """Add a message to the session."""
@@ -42,10 +61,50 @@ class Session:
         self.messages.append(msg)
         self.updated_at = datetime.now()
     
-    def get_history(self, max_messages: int = 500) -> list[dict[str, Any]]:
+    def token_counts(self, counter: "TokenCounter") -> list[int]:
+        """Per-message token counts, computed once per message and cached."""
+        if counter is not self._token_counter or len(self._token_counts) > len(self.messages):
+            self._token_counter = counter
+            self._token_counts = []
+        for m in self.messages[len(self._token_counts):]:
+            self._token_counts.append(counter.count_message(m))
+        return self._token_counts
+
+    def window_start(
+        self,
+        max_messages: int = 500,
+        max_tokens: int | None = None,
+        counter: "TokenCounter | None" = None,
+    ) -> int:
+        """
+        Index of the first message in the recent-history window.
+
+        The window holds at most max_messages messages and, when a counter is
+        given, at most max_tokens tokens. It never starts on a tool result, so
+        a tool call and its results are always kept or dropped together.
+        """
+        floor = max(len(self.messages) - max_messages, 0)
+        counts = self.token_counts(counter) if max_tokens is not None and counter else None
+        start = len(self.messages)
+        total = 0
+        for i in range(len(self.messages) - 1, floor - 1, -1):
+            if counts is not None:
+                total += counts[i]
+                if total > max_tokens:
+                    break
+            if self.messages[i].get("role") != "tool":
+                start = i
+        return start
+
+    def get_history(
+        self,
+        max_messages: int = 500,
+        max_tokens: int | None = None,
+        counter: "TokenCounter | None" = None,
+    ) -> list[dict[str, Any]]:
         """Get recent messages in LLM format, preserving tool metadata."""
         out: list[dict[str, Any]] = []
-        for m in self.messages[-max_messages:]:
+        for m in self.messages[self.window_start(max_messages, max_tokens, counter):]:
             entry: dict[str, Any] = {"role": m["role"], "content": m.get("content", "")}
             for k in ("tool_calls", "tool_call_id", "name"):
                 if k in m:
@@ -58,20 +117,57 @@ class Session:
         self.messages = []
         self.last_consolidated = 0
         self.updated_at = datetime.now()
+        self._persisted = -1
+        self._offset = 0
+        self._token_counts = []
+
+
+_METADATA_PREFIX = b'{"_type": "metadata"'  # How json.dumps renders _metadata_record lines
 
 
 class SessionManager:
     """
     Manages conversation sessions.
 
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are stored as JSONL files in the sessions directory. Saves only append
+    the new messages plus a trailing metadata record; the last metadata record in a
+    file wins. Every ``compact_every`` appends the file is rewritten (metadata first,
+    then messages) via a temp file and atomic rename.
+
+    A ``<file>.idx`` sidecar holds the byte offset of every message line, so loading
+    reads only the last ``tail_messages`` messages (and any not yet consolidated)
+    instead of parsing the whole file. Loaded sessions live in an LRU cache bounded
+    by ``max_cached`` entries and ``ttl`` seconds of inactivity; evicted sessions
+    with unsaved changes are flushed first. A session evicted while something still
+    holds it is handed back as the same object rather than loaded twice.
     """
 
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        compact_every: int = 50,
+        max_cached: int = 256,
+        ttl: float = 3600,
+        tail_messages: int = 500,
+    ):
         self.workspace = workspace
         self.sessions_dir = ensure_dir(self.workspace / "sessions")
         self.legacy_sessions_dir = Path.home() / ".nanobot" / "sessions"
-        self._cache: dict[str, Session] = {}
+        self.compact_every = compact_every
+        self.max_cached = max(1, max_cached)
+        self.ttl = ttl
+        self.tail_messages = tail_messages
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        self._live: weakref.WeakValueDictionary[str, Session] = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        """Session cache counters."""
+        return {"cached": len(self._cache), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
     
     def _get_session_path(self, key: str) -> Path:
         """Get the file path for a session."""
@@ -82,6 +178,10 @@ class SessionManager:
         """Legacy global session path (~/.nanobot/sessions/)."""
         safe_key = safe_filename(key.replace(":", "_"))
         return self.legacy_sessions_dir / f"{safe_key}.jsonl"
+
+    @staticmethod
+    def _index_path(path: Path) -> Path:
+        return path.with_name(path.name + ".idx")
     
     def get_or_create(self, key: str) -> Session:
         """
@@ -93,18 +193,68 @@ class SessionManager:
         Returns:
             The session.
         """
-        if key in self._cache:
-            return self._cache[key]
-        
-        session = self._load(key)
-        if session is None:
-            session = Session(key=key)
-        
-        self._cache[key] = session
+        self._expire()
+        session = self._cache.get(key)
+        if session is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            session = self._live.get(key)
+            if session is None:
+                session = self._load(key) or Session(key=key)
+                session._saved_state = self._state(session)
+        self._remember(session)
         return session
-    
+
+    @staticmethod
+    def _state(session: Session) -> tuple:
+        return (
+            len(session.messages), session._offset, session.last_consolidated, session.updated_at,
+            json.dumps(session.metadata, sort_keys=True, default=str),
+        )
+
+    def is_dirty(self, session: Session) -> bool:
+        """True if the session has changes that were not saved."""
+        return session._saved_state != self._state(session)
+
+    def _remember(self, session: Session) -> None:
+        key = session.key
+        self._cache[key] = session
+        self._cache.move_to_end(key)
+        self._last_used[key] = time.monotonic()
+        self._live[key] = session
+        while len(self._cache) > self.max_cached:
+            self._evict(next(iter(self._cache)))
+
+    def _expire(self) -> None:
+        """Evict sessions idle for longer than the TTL (the cache is ordered by last use)."""
+        if self.ttl <= 0:
+            return
+        cutoff = time.monotonic() - self.ttl
+        while self._cache:
+            key = next(iter(self._cache))
+            if self._last_used.get(key, 0) > cutoff:
+                break
+            self._evict(key)
+
+    def _evict(self, key: str) -> None:
+        session = self._cache.pop(key)
+        self._last_used.pop(key, None)
+        self.evictions += 1
+        if self.is_dirty(session):
+            try:
+                self._write(session)
+            except OSError:
+                logger.exception("Failed to flush evicted session {}", key)
+
+    def flush(self) -> None:
+        """Save every loaded session (cached or still referenced elsewhere) with unsaved changes."""
+        for session in list(self._live.values()):
+            if self.is_dirty(session):
+                self._write(session)
+
     def _load(self, key: str) -> Session | None:
-        """Load a session from disk."""
+        """Load a session from disk (only its tail when the offset index is valid)."""
         path = self._get_session_path(key)
         if not path.exists():
             legacy_path = self._get_legacy_session_path(key)
@@ -119,59 +269,232 @@ class SessionManager:
             return None
 
         try:
-            messages = []
-            metadata = {}
-            created_at = None
-            last_consolidated = 0
-
-            with open(path, encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    data = json.loads(line)
-
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                        last_consolidated = data.get("last_consolidated", 0)
-                    else:
-                        messages.append(data)
-
-            return Session(
+            with open(path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                offsets = self._read_index(path, size)
+                if offsets is not None:
+                    meta = self._read_trailing_metadata(path) or self._first_metadata(f) or {}
+                    base = self._window_base(len(offsets), meta.get("last_consolidated", 0))
+                    f.seek(offsets[base] if base < len(offsets) else size)
+                    messages, _, intact = self._parse(f, key)
+                else:
+                    f.seek(0)
+                    messages, meta, intact, offsets = self._parse_indexing(f, key)
+                    base = self._window_base(len(messages), meta.get("last_consolidated", 0)) if intact else 0
+                    messages = messages[base:]
+                    if intact:
+                        self._write_index(path, offsets, size)
+
+            created_at, updated_at = meta.get("created_at"), meta.get("updated_at")
+            session = Session(
                 key=key,
                 messages=messages,
-                created_at=created_at or datetime.now(),
-                metadata=metadata,
-                last_consolidated=last_consolidated
+                created_at=datetime.fromisoformat(created_at) if created_at else datetime.now(),
+                updated_at=datetime.fromisoformat(updated_at) if updated_at else datetime.now(),
+                metadata=meta.get("metadata", {}),
+                last_consolidated=max(meta.get("last_consolidated", 0) - base, 0),
             )
+            session._offset = base
+            session._persisted = len(messages) if intact else -1
+            session._appends = meta.get("appends", max(meta.get("_records", 1) - 1, 0))
+            return session
         except Exception as e:
             logger.warning("Failed to load session {}: {}", key, e)
             return None
-    
+
+    def _window_base(self, total: int, last_consolidated: int) -> int:
+        """First message to load: the last tail_messages, plus everything not yet consolidated."""
+        return max(0, min(last_consolidated, total - self.tail_messages, total))
+
+    @staticmethod
+    def _parse(f: BinaryIO, key: str) -> tuple[list[dict[str, Any]], dict[str, Any], bool]:
+        """Messages and the last metadata record from the current position to EOF."""
+        messages: list[dict[str, Any]] = []
+        meta: dict[str, Any] = {}
+        intact = True
+        for raw in f:
+            if not raw.strip():
+                continue
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                # A torn trailing write from a crash; drop it and rewrite on next save.
+                logger.warning("Skipping corrupt line in session {}", key)
+                intact = False
+                continue
+            if not raw.endswith(b"\n"):
+                intact = False
+            if data.get("_type") == "metadata":
+                meta = data
+            else:
+                messages.append(data)
+        return messages, meta, intact
+
+    def _parse_indexing(self, f: BinaryIO, key: str) -> tuple[list[dict[str, Any]], dict[str, Any], bool, array]:
+        """Full parse from the start of the file, recording message line offsets."""
+        offsets = array("Q")
+        messages: list[dict[str, Any]] = []
+        meta: dict[str, Any] = {}
+        records = 0
+        intact = True
+        pos = 0
+        for raw in f:
+            line_start, pos = pos, pos + len(raw)
+            if not raw.strip():
+                continue
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                logger.warning("Skipping corrupt line in session {}", key)
+                intact = False
+                continue
+            if not raw.endswith(b"\n"):
+                intact = False
+            if data.get("_type") == "metadata":
+                meta = data
+                records += 1
+            else:
+                messages.append(data)
+                offsets.append(line_start)
+        meta["_records"] = records
+        return messages, meta, intact, offsets
+
+    @staticmethod
+    def _first_metadata(f: BinaryIO) -> dict[str, Any] | None:
+        f.seek(0)
+        first = f.readline()
+        if not first.startswith(_METADATA_PREFIX):
+            return None
+        try:
+            return json.loads(first)
+        except ValueError:
+            return None
+
+    def _read_index(self, path: Path, size: int) -> array | None:
+        """Message line offsets from the sidecar index, or None if it does not match the file."""
+        try:
+            data = self._index_path(path).read_bytes()
+        except OSError:
+            return None
+        if len(data) < 8 or len(data) % 8:
+            return None
+        index = array("Q")
+        index.frombytes(data)
+        if index[0] != size:
+            return None  # Written by a crashed save or for another version of the file
+        return index[1:]
+
+    def _write_index(self, path: Path, offsets: array, size: int) -> None:
+        try:
+            with open(self._index_path(path), "wb") as f:
+                f.write(array("Q", [size]).tobytes())
+                f.write(offsets.tobytes())
+        except OSError as e:
+            logger.warning("Failed to write session index for {}: {}", path.name, e)
+
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
+        """Save a session to disk, appending only messages not yet persisted."""
+        self._write(session)
+        self._remember(session)
+
+    def _write(self, session: Session) -> None:
         path = self._get_session_path(session.key)
+        if (
+            session._persisted < 0
+            or session._persisted > len(session.messages)
+            or session._appends >= self.compact_every
+            or not path.exists()
+        ):
+            self._rewrite(path, session)
+        else:
+            self._append(path, session)
+        session._saved_state = self._state(session)
 
-        with open(path, "w", encoding="utf-8") as f:
-            metadata_line = {
-                "_type": "metadata",
-                "key": session.key,
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata,
-                "last_consolidated": session.last_consolidated
-            }
-            f.write(json.dumps(metadata_line, ensure_ascii=False) + "\n")
-            for msg in session.messages:
-                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+    @staticmethod
+    def _metadata_record(session: Session) -> dict[str, Any]:
+        return {
+            "_type": "metadata",
+            "key": session.key,
+            "created_at": session.created_at.isoformat(),
+            "updated_at": session.updated_at.isoformat(),
+            "metadata": session.metadata,
+            "last_consolidated": session.last_consolidated + session._offset,
+        }
 
-        self._cache[session.key] = session
+    def _append(self, path: Path, session: Session) -> None:
+        """Append new messages followed by a metadata record in a single fsynced write."""
+        lines = [json.dumps(msg, ensure_ascii=False).encode() + b"\n" for msg in session.messages[session._persisted:]]
+        record = self._metadata_record(session)
+        record["appends"] = session._appends + 1  # Lets a tail load know when to compact
+        lines.append(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+        with open(path, "ab") as f:
+            start = f.seek(0, os.SEEK_END)
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+        self._extend_index(path, start, end, lines[:-1])
+        session._persisted = len(session.messages)
+        session._appends += 1
+
+    def _extend_index(self, path: Path, start: int, end: int, lines: list[bytes]) -> None:
+        """Append offsets for lines written at ``start``; drop the index if it was already stale."""
+        index_path = self._index_path(path)
+        try:
+            with open(index_path, "r+b") as f:
+                header = array("Q")
+                header.frombytes(f.read(8))
+                if header[0] != start:
+                    raise ValueError("stale")
+                offsets, pos = array("Q"), start
+                for line in lines:
+                    offsets.append(pos)
+                    pos += len(line)
+                f.seek(0, os.SEEK_END)
+                f.write(offsets.tobytes())
+                f.seek(0)
+                f.write(array("Q", [end]).tobytes())
+        except FileNotFoundError:
+            pass  # Rebuilt by the next full load
+        except (OSError, ValueError):
+            index_path.unlink(missing_ok=True)
+
+    def _rewrite(self, path: Path, session: Session) -> None:
+        """Write a compacted copy of the session and atomically swap it into place."""
+        tmp = path.with_name(path.name + ".tmp")
+        offsets = array("Q")
+        if session._offset and not path.exists():
+            logger.warning("Session file for {} disappeared; {} unloaded messages lost", session.key, session._offset)
+            session._offset = 0
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(self._metadata_record(session), ensure_ascii=False).encode() + b"\n")
+            if session._offset:
+                # Messages left on disk by a tail load are copied over without parsing them
+                with open(path, "rb") as old:
+                    copied = 0
+                    for raw in old:
+                        if copied == session._offset:
+                            break
+                        if raw.strip() and not raw.startswith(_METADATA_PREFIX):
+                            offsets.append(f.tell())
+                            f.write(raw if raw.endswith(b"\n") else raw + b"\n")
+                            copied += 1
+            for msg in session.messages:
+                offsets.append(f.tell())
+                f.write(json.dumps(msg, ensure_ascii=False).encode() + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp, path)
+        self._write_index(path, offsets, size)
+        session._persisted = len(session.messages)
+        session._appends = 0
     
     def invalidate(self, key: str) -> None:
-        """Remove a session from the in-memory cache."""
+        """Remove a session from the in-memory cache so the next access reloads it from disk."""
         self._cache.pop(key, None)
+        self._last_used.pop(key, None)
+        self._live.pop(key, None)
     
     def list_sessions(self) -> list[dict[str, Any]]:
         """
@@ -184,20 +507,38 @@ class SessionManager:
         
         for path in self.sessions_dir.glob("*.jsonl"):
             try:
-                # Read just the metadata line
+                # Read the leading metadata line, then prefer a newer trailing record
                 with open(path, encoding="utf-8") as f:
                     first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            key = data.get("key") or path.stem.replace("_", ":", 1)
-                            sessions.append({
-                                "key": key,
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
+                if not first_line:
+                    continue
+                data = json.loads(first_line)
+                if data.get("_type") != "metadata":
+                    continue
+                latest = self._read_trailing_metadata(path) or data
+                key = data.get("key") or path.stem.replace("_", ":", 1)
+                sessions.append({
+                    "key": key,
+                    "created_at": data.get("created_at"),
+                    "updated_at": latest.get("updated_at"),
+                    "path": str(path)
+                })
             except Exception:
                 continue
         
         return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+
+    @staticmethod
+    def _read_trailing_metadata(path: Path, block: int = 8192) -> dict[str, Any] | None:
+        """Return the metadata record on the last line of a session file, if any."""
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - block, 0))
+            tail = f.read().rstrip(b"\n")
+        last = tail.rsplit(b"\n", 1)[-1]
+        try:
+            data = json.loads(last)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) and data.get("_type") == "metadata" else None
@@ -0,0 +1,69 @@
+"""HTML to text/markdown extraction.
+
+Kept free of heavy imports: extract_html runs in worker processes, which only
+import this module.
+"""
+
+import html
+import re
+import time
+from typing import Any, Callable
+
+
+def strip_tags(text: str) -> str:
+    """Remove HTML tags and decode entities."""
+    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
+    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
+    text = re.sub(r'<[^>]+>', '', text)
+    return html.unescape(text).strip()
+
+
+def normalize_whitespace(text: str) -> str:
+    """Normalize whitespace."""
+    text = re.sub(r'[ \t]+', ' ', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert HTML to markdown."""
+    # Convert links, headings, lists before stripping tags
+    text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
+                  lambda m: f'[{strip_tags(m[2])}]({m[1]})', html, flags=re.I)
+    text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
+                  lambda m: f'\n{"#" * int(m[1])} {strip_tags(m[2])}\n', text, flags=re.I)
+    text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {strip_tags(m[1])}', text, flags=re.I)
+    text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
+    text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
+    return normalize_whitespace(strip_tags(text))
+
+
+def extract_html(document: str, mode: str = "markdown") -> tuple[str, float]:
+    """
+    Extract the readable content of an HTML page with Readability.
+
+    Returns:
+        (text, seconds spent) — text is prefixed with the page title as a heading.
+    """
+    from readability import Document
+
+    started = time.perf_counter()
+    doc = Document(document)
+    summary = doc.summary()
+    content = html_to_markdown(summary) if mode == "markdown" else strip_tags(summary)
+    title = doc.title()
+    text = f"# {title}\n\n{content}" if title else content
+    return text, time.perf_counter() - started
+
+
+def serve_extractions(conn: Any, fn: Callable[[str, str], tuple[str, float]] = extract_html) -> None:
+    """Extraction worker process loop: one (document, mode) request in, one (ok, result) reply out."""
+    conn.send((True, None))  # Ready: imports are done, so callers time only the extraction
+    while True:
+        try:
+            document, mode = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, fn(document, mode)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))  # Not every exception pickles
@@ -0,0 +1,100 @@
+"""Shared, lifecycle-managed HTTP client pool."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from urllib.parse import urlparse
+
+import httpx
+from loguru import logger
+
+MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpClientPool:
+    """
+    One keep-alive httpx.AsyncClient shared by tools and providers.
+
+    Reusing the client keeps DNS lookups, TCP/TLS handshakes and HTTP/2
+    connections warm across calls. Requests made through the pool are also
+    capped per host so one slow site cannot take every connection. The client
+    is created on first use and must be closed with ``aclose()``.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        max_per_host: int = 8,
+        timeout: float = 30.0,
+        http2: bool | None = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.http2 = _http2_available() if http2 is None else http2
+        self._client: httpx.AsyncClient | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first access."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                max_redirects=MAX_REDIRECTS,
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def host_slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the per-host connection slots for the duration of a request."""
+        host = urlparse(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        async with slot:
+            yield
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request on the shared client, respecting the per-host limit."""
+        async with self.host_slot(url):
+            return await self.client.request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Stream a response body on the shared client, respecting the per-host limit."""
+        async with self.host_slot(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close pooled connections. The pool can be reused afterwards."""
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception as e:
+                logger.debug("Error closing HTTP client: {}", e)
+            self._client = None
+        self._host_slots.clear()
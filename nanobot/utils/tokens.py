@@ -0,0 +1,72 @@
+"""Token counting for context budgeting."""
+
+import json
+import math
+from typing import Any, Callable
+
+from loguru import logger
+
+_MESSAGE_OVERHEAD = 4  # Role and separator tokens per chat message
+_IMAGE_TOKENS = 765  # Rough cost of one image part
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast heuristic: ~4 ASCII chars per token, ~1 token per CJK/other multi-byte char."""
+    if not text:
+        return 0
+    extra = len(text.encode("utf-8")) - len(text)
+    return math.ceil(len(text) / 4 + extra / 3)
+
+
+class TokenCounter:
+    """
+    Counts tokens in chat messages.
+
+    The text tokenizer is pluggable; by default a fast heuristic is used so no
+    tokenizer download or model-specific vocabulary is needed.
+    """
+
+    def __init__(self, count_text: Callable[[str], int] | None = None, name: str = "heuristic"):
+        self.count_text = count_text or estimate_tokens
+        self.name = name
+
+    @classmethod
+    def from_name(cls, name: str) -> "TokenCounter":
+        """
+        Create a counter by name: "heuristic" or "tiktoken[:<encoding>]".
+
+        Falls back to the heuristic if the tokenizer cannot be loaded.
+        """
+        if name.startswith("tiktoken"):
+            encoding_name = name.partition(":")[2] or "cl100k_base"
+            try:
+                import tiktoken
+
+                encoding = tiktoken.get_encoding(encoding_name)
+                return cls(lambda text: len(encoding.encode(text, disallowed_special=())), name=name)
+            except Exception as e:
+                logger.warning("Tokenizer {} unavailable, using heuristic: {}", name, e)
+        elif name != "heuristic":
+            logger.warning("Unknown tokenizer {}, using heuristic", name)
+        return cls()
+
+    def count_message(self, msg: dict[str, Any]) -> int:
+        """Count tokens of one chat message, including tool calls."""
+        total = _MESSAGE_OVERHEAD
+        content = msg.get("content")
+        if isinstance(content, str):
+            total += self.count_text(content)
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "text":
+                    total += self.count_text(part.get("text", ""))
+                else:
+                    total += _IMAGE_TOKENS
+        if msg.get("tool_calls"):
+            total += self.count_text(json.dumps(msg["tool_calls"], ensure_ascii=False))
+        if msg.get("name"):
+            total += self.count_text(msg["name"])
+        return total
+
+    def count_messages(self, messages: list[dict[str, Any]]) -> int:
+        return sum(self.count_message(m) for m in messages)
@@ -0,0 +1,167 @@
+"""Lightweight span tracing for agent turns."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from loguru import logger
+
+# (trace_id, span_id) of the innermost open span in the current task
+_current: ContextVar[tuple[str, str] | None] = ContextVar("nanobot_span", default=None)
+
+
+class Span:
+    """One timed operation. Attributes can be added while it is open."""
+
+    __slots__ = ("kind", "trace_id", "span_id", "parent_id", "start", "attrs", "outcome")
+
+    def __init__(self, kind: str, trace_id: str, parent_id: str | None, attrs: dict[str, Any]):
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.attrs = attrs
+        self.outcome = "ok"
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class SpanStats:
+    """Per-kind latency aggregates over a bounded window of recent spans."""
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._durations: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+
+    def add(self, kind: str, ms: float, outcome: str = "ok") -> None:
+        if kind not in self._durations:
+            self._durations[kind] = deque(maxlen=self.window)
+        self._durations[kind].append(ms)
+        self._counts[kind] = self._counts.get(kind, 0) + 1
+        if outcome != "ok":
+            self._errors[kind] = self._errors.get(kind, 0) + 1
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """{kind: {count, errors, p50, p95, p99, max}} with durations in milliseconds."""
+        out = {}
+        for kind, values in sorted(self._durations.items()):
+            ordered = sorted(values)
+            out[kind] = {
+                "count": self._counts[kind],
+                "errors": self._errors.get(kind, 0),
+                "p50": round(percentile(ordered, 0.50), 2),
+                "p95": round(percentile(ordered, 0.95), 2),
+                "p99": round(percentile(ordered, 0.99), 2),
+                "max": round(ordered[-1], 2),
+            }
+        return out
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]], since: float = 0.0) -> "SpanStats":
+        stats = cls(window=1_000_000)
+        for r in records:
+            if r.get("start", 0) >= since:
+                stats.add(r["kind"], r["ms"], r.get("outcome", "ok"))
+        return stats
+
+
+def read_trace_file(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield span records from a trace file and its rotated predecessor, oldest first."""
+    for p in (path.with_name(path.name + ".1"), path):
+        if not p.exists():
+            continue
+        with open(p, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn line from a concurrent writer
+
+
+class Tracer:
+    """
+    Records nested spans (turn → iteration → llm_call / tool_call, ...).
+
+    Parent/child links follow the running task through a ContextVar, so
+    spans opened inside ``asyncio.gather`` children attach to the right
+    parent. Finished spans go to an in-process ``SpanStats`` aggregator and,
+    when ``path`` is set, are appended to a JSONL file. Records are buffered
+    and written when a root span closes. The file rotates to ``<name>.1``
+    once it passes ``max_bytes``.
+    """
+
+    def __init__(self, path: Path | None = None, max_bytes: int = 20 * 1024 * 1024, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = SpanStats()
+        self._buffer: list[str] = []
+
+    @contextmanager
+    def span(self, kind: str, **attrs: Any) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current span."""
+        parent = _current.get()
+        trace_id = parent[0] if parent else uuid.uuid4().hex[:16]
+        span = Span(kind, trace_id, parent[1] if parent else None, attrs)
+        token = _current.set((trace_id, span.span_id))
+        try:
+            yield span
+        except BaseException as e:
+            span.outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+            span.attrs.setdefault("error", f"{type(e).__name__}: {e}"[:200])
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        ms = (time.time() - span.start) * 1000
+        self.stats.add(span.kind, ms, span.outcome)
+        if self.path is None:
+            return
+        self._buffer.append(json.dumps({
+            "trace": span.trace_id, "span": span.span_id, "parent": span.parent_id,
+            "kind": span.kind, "start": round(span.start, 6), "ms": round(ms, 3),
+            "outcome": span.outcome, **span.attrs,
+        }, ensure_ascii=False, default=str))
+        if span.parent_id is None or len(self._buffer) >= 256:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered records to the trace file."""
+        if not self._buffer or self.path is None:
+            return
+        data = "\n".join(self._buffer) + "\n"
+        self._buffer.clear()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists() and self.path.stat().st_size + len(data) > self.max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning("Failed to write trace file {}: {}", self.path, e)
@@ -0,0 +1,191 @@
+"""Tests for concurrent per-session dispatch in AgentLoop.run."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.message import MessageTool
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMResponse
+
+
+def _make_loop(tmp_path: Path, bus: MessageBus | None = None, **kwargs) -> AgentLoop:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(bus=bus or MessageBus(), provider=provider, workspace=tmp_path, model="test-model", **kwargs)
+    loop.tools.get_definitions = MagicMock(return_value=[])
+    return loop
+
+
+async def _collect(bus: MessageBus, n: int) -> list[str]:
+    out = []
+    while len(out) < n:
+        msg = await asyncio.wait_for(bus.consume_outbound(), timeout=2.0)
+        if not msg.metadata.get("_progress"):
+            out.append(msg.content)
+    return out
+
+
+@pytest.mark.asyncio
+async def test_slow_session_does_not_block_other_sessions(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path)
+    release = asyncio.Event()
+
+    async def _chat(messages, **kwargs):
+        text = messages[-1]["content"]
+        if text == "slow":
+            await release.wait()
+        return LLMResponse(content=f"re:{text}")
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u1", "a", "slow"))
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u2", "b", "fast"))
+        assert await _collect(loop.bus, 1) == ["re:fast"]
+        release.set()
+        assert await _collect(loop.bus, 1) == ["re:slow"]
+    finally:
+        loop.stop()
+        await runner
+
+
+@pytest.mark.asyncio
+async def test_messages_within_session_stay_ordered(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path)
+    active = 0
+    max_active = 0
+
+    async def _chat(messages, **kwargs):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return LLMResponse(content=f"re:{messages[-1]['content']}")
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        for i in range(4):
+            await loop.bus.publish_inbound(InboundMessage("telegram", "u1", "a", f"m{i}"))
+        assert await _collect(loop.bus, 4) == ["re:m0", "re:m1", "re:m2", "re:m3"]
+        assert max_active == 1
+    finally:
+        loop.stop()
+        await runner
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_is_respected(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path, max_concurrency=2)
+    active = 0
+    max_active = 0
+
+    async def _chat(messages, **kwargs):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return LLMResponse(content="ok")
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        for i in range(5):
+            await loop.bus.publish_inbound(InboundMessage("telegram", "u", f"chat{i}", "hi"))
+        await _collect(loop.bus, 5)
+        assert max_active == 2
+    finally:
+        loop.stop()
+        await runner
+
+
+@pytest.mark.asyncio
+async def test_backlog_stays_on_bus_and_is_served_by_priority(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path, bus=MessageBus(max_inbound=5), max_concurrency=1)
+    seen: list[str] = []
+
+    async def _chat(messages, **kwargs):
+        text = messages[-1]["content"]
+        seen.append(text)
+        if text == "slow":
+            await asyncio.Event().wait()
+        return LLMResponse(content=f"re:{text}")
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "slow"))
+        while seen != ["slow"]:
+            await asyncio.sleep(0.01)
+        for i in range(3):
+            await loop.bus.publish_inbound(
+                InboundMessage("telegram", "u", f"bg{i}", f"bg{i}", metadata={"_lane": "background"})
+            )
+        for i in range(2):
+            await loop.bus.publish_inbound(InboundMessage("telegram", "u", f"i{i}", f"i{i}"))
+        blocked = asyncio.create_task(loop.bus.publish_inbound(InboundMessage("telegram", "u", "i2", "i2")))
+        await asyncio.sleep(0.05)
+
+        assert loop.bus.inbound_size == 5 and not blocked.done()  # Backpressure instead of unbounded queues
+        assert list(loop._session_workers) == ["telegram:a"]
+
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "/stop"))  # Bypasses the full bus
+        assert await _collect(loop.bus, 1) == ["Stopped."]
+        await _collect(loop.bus, 6)
+        await blocked
+        assert seen == ["slow", "i0", "i1", "i2", "bg0", "bg1", "bg2"]
+        assert loop.bus.stats()["inbound"]["lanes"]["background"]["latency"]["count"] == 3
+    finally:
+        loop.stop()
+        await runner
+
+
+@pytest.mark.asyncio
+async def test_back_to_back_stops_never_reach_the_provider(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path)
+    seen: list[str] = []
+
+    async def _chat(messages, **kwargs):
+        seen.append(messages[-1]["content"])
+        return LLMResponse(content="ok")
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        for text in ("/stop", "hi", "/stop", "hi", "/stop", "/stop"):
+            await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", text))
+        replies = await _collect(loop.bus, 6)
+        assert sorted(replies) == ["Nothing to stop."] * 4 + ["ok"] * 2
+        assert seen == ["hi", "hi"]
+    finally:
+        loop.stop()
+        await runner
+
+
+@pytest.mark.asyncio
+async def test_message_tool_context_is_per_task() -> None:
+    sent = []
+
+    async def _send(msg):
+        sent.append((msg.channel, msg.chat_id, msg.content))
+
+    tool = MessageTool(send_callback=_send)
+
+    async def _turn(channel: str, chat_id: str) -> bool:
+        tool.set_context(channel, chat_id)
+        tool.start_turn()
+        await asyncio.sleep(0.01)
+        await tool.execute(content=f"to {chat_id}")
+        return tool._sent_in_turn
+
+    results = await asyncio.gather(_turn("telegram", "a"), _turn("discord", "b"))
+
+    assert results == [True, True]
+    assert sorted(sent) == [("discord", "b", "to b"), ("telegram", "a", "to a")]
@@ -0,0 +1,135 @@
+"""Tests for per-destination outbound delivery in ChannelManager."""
+
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.channels.manager import ChannelManager, _Outbox
+from nanobot.config.schema import Config
+
+
+class _FakeChannel(BaseChannel):
+    name = "fake"
+
+    def __init__(self, bus: MessageBus, slow_chat: str | None = None, failures: int = 0):
+        super().__init__(None, bus)
+        self.slow_chat = slow_chat
+        self.failures = failures
+        self.sent: list[tuple[str, str]] = []
+        self.release = asyncio.Event()
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        if msg.chat_id == self.slow_chat:
+            await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("boom")
+        self.sent.append((msg.chat_id, msg.content))
+
+
+def _manager(channel: _FakeChannel, **channels_cfg) -> tuple[ChannelManager, MessageBus]:
+    config = Config()
+    config.channels.send_retry_delay = 0.001
+    for k, v in channels_cfg.items():
+        setattr(config.channels, k, v)
+    manager = ChannelManager(config, channel.bus)
+    manager.channels["fake"] = channel
+    return manager, channel.bus
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slow_chat_does_not_block_others_and_order_is_kept() -> None:
+    channel = _FakeChannel(MessageBus(), slow_chat="slow")
+    manager, _ = _manager(channel)
+
+    await manager._enqueue_outbound(OutboundMessage(channel="fake", chat_id="slow", content="s1"))
+    for i in range(3):
+        await manager._enqueue_outbound(OutboundMessage(channel="fake", chat_id="a", content=f"a{i}"))
+    await manager._enqueue_outbound(OutboundMessage(channel="fake", chat_id="slow", content="s2"))
+    await _settle()
+
+    assert channel.sent == [("a", "a0"), ("a", "a1"), ("a", "a2")]
+    assert manager.get_status()["fake"]["pending"] == 1
+
+    channel.release.set()
+    await _settle()
+    assert channel.sent[3:] == [("slow", "s1"), ("slow", "s2")]
+    assert not manager._senders and not manager._outboxes
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_with_backoff() -> None:
+    channel = _FakeChannel(MessageBus(), failures=2)
+    manager, _ = _manager(channel, send_retries=2)
+
+    await manager._enqueue_outbound(OutboundMessage(channel="fake", chat_id="a", content="hello"))
+    for _ in range(50):
+        await asyncio.sleep(0.005)
+        if channel.sent:
+            break
+
+    assert channel.sent == [("a", "hello")]
+    assert manager.send_failures == 0
+
+
+def test_full_outbox_sheds_progress_but_never_replies() -> None:
+    box = _Outbox(2)
+    assert box.put(OutboundMessage(channel="fake", chat_id="a", content="p", metadata={"_progress": True}))
+    assert box.put(OutboundMessage(channel="fake", chat_id="a", content="final1"))
+    assert box.put(OutboundMessage(channel="fake", chat_id="a", content="final2"))
+    assert [m.content for m in box.items] == ["final1", "final2"]
+
+    assert box.put(OutboundMessage(channel="fake", chat_id="a", content="p2", metadata={"_progress": True}))
+    assert not box.put(OutboundMessage(channel="fake", chat_id="a", content="final3"))
+    assert [m.content for m in box.items] == ["final1", "final2"]
+    assert box.dropped == 2 and not box.space.is_set()
+
+    box.pop()
+    assert box.space.is_set()
+    assert box.put(OutboundMessage(channel="fake", chat_id="a", content="final3"))
+
+
+@pytest.mark.asyncio
+async def test_stalled_destination_pushes_back_without_losing_replies() -> None:
+    channel = _FakeChannel(MessageBus(max_outbound=1), slow_chat="slow")
+    manager, bus = _manager(channel, outbound_buffer=2)
+    dispatcher = asyncio.create_task(manager._dispatch_outbound())
+    try:
+        await bus.publish_outbound(OutboundMessage(channel="fake", chat_id="a", content="a0"))
+        for i in range(5):
+            await bus.publish_outbound(OutboundMessage(channel="fake", chat_id="slow", content=f"s{i}"))
+        publisher = asyncio.create_task(
+            bus.publish_outbound(OutboundMessage(channel="fake", chat_id="a", content="a1"))
+        )
+        await _settle()
+
+        # s0 is being sent, s1/s2 fill the buffer, s3 holds the dispatcher and s4 the bus
+        assert channel.sent == [("a", "a0")]
+        assert [m.content for m in manager._outboxes[("fake", "slow")].items] == ["s1", "s2"]
+        assert not publisher.done()
+
+        channel.release.set()
+        await asyncio.wait_for(publisher, 1.0)
+        for _ in range(50):
+            await asyncio.sleep(0.005)
+            if len(channel.sent) == 7:
+                break
+        assert [m for m in channel.sent if m[0] == "slow"] == [("slow", f"s{i}") for i in range(5)]
+        assert channel.sent[-1] == ("a", "a1")
+    finally:
+        dispatcher.cancel()
+        await asyncio.gather(dispatcher, return_exceptions=True)
@@ -128,3 +128,14 @@ def test_litellm_provider_canonicalizes_github_copilot_hyphen_prefix():
 def test_openai_codex_strip_prefix_supports_hyphen_and_underscore():
     assert _strip_model_prefix("openai-codex/gpt-5.1-codex") == "gpt-5.1-codex"
     assert _strip_model_prefix("openai_codex/gpt-5.1-codex") == "gpt-5.1-codex"
+
+
+def test_gateway_role_all_rejects_multiple_sqlite_workers():
+    config = Config()
+    config.bus.backend = "sqlite"
+    config.bus.workers = 3
+    with patch("nanobot.config.loader.load_config", return_value=config):
+        result = runner.invoke(app, ["gateway"])
+
+    assert result.exit_code == 1
+    assert "bus.workers = 3" in result.stdout
@@ -509,10 +509,11 @@ class TestConsolidationDeduplicationGuard:
 
         consolidation_calls = 0
 
-        async def _fake_consolidate(_session, archive_all: bool = False) -> None:
+        async def _fake_consolidate(_session, archive_all: bool = False) -> bool:
             nonlocal consolidation_calls
             consolidation_calls += 1
             await asyncio.sleep(0.05)
+            return True
 
         loop._consolidate_memory = _fake_consolidate  # type: ignore[method-assign]
 
@@ -524,6 +525,7 @@ class TestConsolidationDeduplicationGuard:
         assert consolidation_calls == 1, (
             f"Expected exactly 1 consolidation, got {consolidation_calls}"
         )
+        assert loop.consolidation.coalesced == 1
 
     @pytest.mark.asyncio
     async def test_new_command_guard_prevents_concurrent_consolidation(
@@ -555,13 +557,14 @@ class TestConsolidationDeduplicationGuard:
         active = 0
         max_active = 0
 
-        async def _fake_consolidate(_session, archive_all: bool = False) -> None:
+        async def _fake_consolidate(_session, archive_all: bool = False) -> bool:
             nonlocal consolidation_calls, active, max_active
             consolidation_calls += 1
             active += 1
             max_active = max(max_active, active)
             await asyncio.sleep(0.05)
             active -= 1
+            return True
 
         loop._consolidate_memory = _fake_consolidate  # type: ignore[method-assign]
 
@@ -580,8 +583,8 @@ class TestConsolidationDeduplicationGuard:
         )
 
     @pytest.mark.asyncio
-    async def test_consolidation_tasks_are_referenced(self, tmp_path: Path) -> None:
-        """create_task results are tracked in _consolidation_tasks while in flight."""
+    async def test_consolidation_jobs_are_tracked(self, tmp_path: Path) -> None:
+        """Queued consolidation is tracked by the service while in flight and cleared after."""
         from nanobot.agent.loop import AgentLoop
         from nanobot.bus.events import InboundMessage
         from nanobot.bus.queue import MessageBus
@@ -605,9 +608,10 @@ class TestConsolidationDeduplicationGuard:
 
         started = asyncio.Event()
 
-        async def _slow_consolidate(_session, archive_all: bool = False) -> None:
+        async def _slow_consolidate(_session, archive_all: bool = False) -> bool:
             started.set()
             await asyncio.sleep(0.1)
+            return True
 
         loop._consolidate_memory = _slow_consolidate  # type: ignore[method-assign]
 
@@ -615,12 +619,13 @@ class TestConsolidationDeduplicationGuard:
         await loop._process_message(msg)
 
         await started.wait()
-        assert len(loop._consolidation_tasks) == 1, "Task must be referenced while in-flight"
+        assert loop.consolidation.is_pending("cli:test"), "Job must be tracked while in-flight"
+        assert loop.consolidation.stats()["running"] == 1
 
         await asyncio.sleep(0.15)
-        assert len(loop._consolidation_tasks) == 0, (
-            "Task reference must be removed after completion"
-        )
+        assert not loop.consolidation.is_pending("cli:test"), "Job must be removed after completion"
+        assert loop.consolidation.stats()["completed"] == 1
+        await loop.consolidation.stop()
 
     @pytest.mark.asyncio
     async def test_new_waits_for_inflight_consolidation_and_preserves_messages(
@@ -812,8 +817,8 @@ class TestConsolidationDeduplicationGuard:
         loop.sessions.save(session)
 
         # Ensure lock exists before /new.
-        _ = loop._get_consolidation_lock(session.key)
-        assert session.key in loop._consolidation_locks
+        _ = loop.consolidation.lock(session.key)
+        assert session.key in loop.consolidation._locks
 
         async def _ok_consolidate(sess, archive_all: bool = False) -> bool:
             return True
@@ -825,4 +830,91 @@ class TestConsolidationDeduplicationGuard:
 
         assert response is not None
         assert "new session started" in response.content.lower()
-        assert session.key not in loop._consolidation_locks
+        assert session.key not in loop.consolidation._locks
+
+
+class TestConsolidationService:
+    """Worker pool, retries and model selection of the consolidation service."""
+
+    @pytest.mark.asyncio
+    async def test_bounded_workers_and_retry_with_backoff(self) -> None:
+        from nanobot.agent.consolidation import ConsolidationService
+
+        active = max_active = 0
+        attempts: dict[str, int] = {}
+
+        async def _consolidate(session: Session) -> bool:
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            attempts[session.key] = attempts.get(session.key, 0) + 1
+            if session.key == "s0" and attempts["s0"] < 3:
+                raise RuntimeError("provider down")
+            return True
+
+        service = ConsolidationService(_consolidate, workers=2, max_retries=2, retry_delay=0.001)
+        for i in range(6):
+            assert service.submit(Session(key=f"s{i}"))
+        assert not service.submit(Session(key="s5"))  # Coalesced into the queued job
+        assert service.stats()["queued"] == 6
+
+        await service.join()
+        stats = service.stats()
+        assert max_active == 2
+        assert attempts["s0"] == 3 and stats["retries"] == 2
+        assert (stats["completed"], stats["failed"], stats["coalesced"]) == (6, 0, 1)
+        assert stats["lag"]["count"] == 6 and stats["queued"] == stats["running"] == 0
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_trigger_during_a_run_queues_one_more_pass(self) -> None:
+        from nanobot.agent.consolidation import ConsolidationService
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+        runs = 0
+
+        async def _consolidate(session: Session) -> bool:
+            nonlocal runs
+            runs += 1
+            started.set()
+            await release.wait()
+            return True
+
+        service = ConsolidationService(_consolidate, workers=1)
+        session = Session(key="s")
+        assert service.submit(session)
+        await started.wait()
+
+        assert service.submit(session)  # Already running: a second pass is queued
+        assert not service.submit(session)  # Folded into that pass
+        release.set()
+        await service.join()
+
+        stats = service.stats()
+        assert runs == 2 and not service.is_pending("s")
+        assert (stats["completed"], stats["coalesced"]) == (2, 1)
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_consolidation_uses_configured_model(self, tmp_path: Path) -> None:
+        from nanobot.agent.loop import AgentLoop
+        from nanobot.bus.queue import MessageBus
+        from nanobot.config.schema import ConsolidationConfig
+        from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+        provider = MagicMock()
+        provider.chat = AsyncMock(return_value=LLMResponse(content=None, tool_calls=[ToolCallRequest(
+            "c1", "save_memory", {"history_entry": "[2025-01-01 10:00] Chatted.", "memory_ops": []},
+        )]))
+        loop = AgentLoop(
+            bus=MessageBus(), provider=provider, workspace=tmp_path, model="big-model", memory_window=10,
+            consolidation_config=ConsolidationConfig(model="small-model"),
+        )
+        session = create_session_with_messages("cli:test", 12)
+
+        assert await loop._consolidate_memory(session)
+        assert provider.chat.call_args.kwargs["model"] == "small-model"
+        assert session.last_consolidated > 0
@@ -0,0 +1,42 @@
+"""Tests for the section cache in ContextBuilder."""
+
+import os
+from pathlib import Path
+
+from nanobot.agent.context import ContextBuilder
+
+
+def test_system_prompt_prefix_is_stable_and_cached(tmp_path: Path) -> None:
+    (tmp_path / "AGENTS.md").write_text("be helpful", encoding="utf-8")
+    ctx = ContextBuilder(tmp_path)
+
+    first = ctx.build_system_prompt()
+    misses = ctx.cache_misses
+    second = ctx.build_system_prompt()
+
+    assert first == second
+    assert "Current Time" not in first
+    assert ctx.cache_misses == misses
+    assert ctx.cache_stats["hits"] >= 4
+
+    messages = ctx.build_messages([], "hi", channel="cli", chat_id="direct")
+    assert messages[0]["content"].startswith(first)
+    assert "## Current Time" in messages[0]["content"]
+
+
+def test_changed_file_rebuilds_only_its_section(tmp_path: Path) -> None:
+    ctx = ContextBuilder(tmp_path)
+    ctx.build_system_prompt()
+    misses = ctx.cache_misses
+
+    ctx.memory.write_long_term("user likes tea")
+    prompt = ctx.build_system_prompt()
+
+    assert "user likes tea" in prompt
+    assert ctx.cache_misses == misses + 1
+
+    # Same size, different content: mtime still invalidates.
+    ctx.memory.write_long_term("user likes tee")
+    st = ctx.memory.memory_file.stat()
+    os.utime(ctx.memory.memory_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert "user likes tee" in ctx.build_system_prompt()
@@ -0,0 +1,86 @@
+"""Tests for filesystem tools: paging, atomic writes, off-loop I/O."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.tools import filesystem
+from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+
+
+@pytest.mark.asyncio
+async def test_read_file_pages_by_line(tmp_path: Path) -> None:
+    (tmp_path / "log.txt").write_text("".join(f"line {i}\n" for i in range(1, 201)), encoding="utf-8")
+    tool = ReadFileTool(workspace=tmp_path)
+
+    page = await tool.execute(path="log.txt", offset=130, limit=2)
+    assert page == "line 130\nline 131\n\n[lines 130-131 of 200; continue with offset=132]"
+
+    tail = await tool.execute(path="log.txt", offset=199, limit=5)
+    assert tail == "line 199\nline 200\n\n[lines 199-200 of 200]"
+    assert "past the end" in await tool.execute(path="log.txt", offset=500)
+
+
+@pytest.mark.asyncio
+async def test_read_file_respects_max_bytes_and_reuses_index(tmp_path: Path) -> None:
+    path = tmp_path / "big.txt"
+    path.write_text("".join(f"{i:04d}\n" for i in range(1000)) + "no newline", encoding="utf-8")
+    tool = ReadFileTool(workspace=tmp_path)
+
+    first = await tool.execute(path="big.txt", max_bytes=12)
+    assert first == "0000\n0001\n\n[lines 1-2 of 1001; continue with offset=3]"
+    index = filesystem._line_indexes[str(path.resolve())]
+
+    last = await tool.execute(path="big.txt", offset=1000)
+    assert last == "0999\nno newline\n[lines 1000-1001 of 1001]"
+    assert filesystem._line_indexes[str(path.resolve())] is index
+
+    long_line = await tool.execute(path="big.txt", offset=1001, max_bytes=4)
+    assert long_line.startswith("no n\n[line 1001 of 1001, truncated at 4 bytes")
+
+    path.write_text("changed\n", encoding="utf-8")
+    assert await tool.execute(path="big.txt", limit=1) == "changed\n\n[lines 1-1 of 1]"
+
+
+@pytest.mark.asyncio
+async def test_read_file_caps_requested_max_bytes(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(filesystem, "_MAX_READ_BYTES", 10)
+    (tmp_path / "log.txt").write_text("".join(f"{i:04d}\n" for i in range(100)), encoding="utf-8")
+    tool = ReadFileTool(workspace=tmp_path)
+
+    page = await tool.execute(path="log.txt", max_bytes=10**9)
+    assert page == "0000\n0001\n\n[lines 1-2 of 100; continue with offset=3]"
+
+
+@pytest.mark.asyncio
+async def test_write_and_edit_are_atomic_and_keep_mode(tmp_path: Path) -> None:
+    target = tmp_path / "script.sh"
+    target.write_text("echo old\n", encoding="utf-8")
+    target.chmod(0o755)
+
+    assert "Successfully edited" in await EditFileTool(workspace=tmp_path).execute(
+        path="script.sh", old_text="old", new_text="new"
+    )
+    assert target.read_text(encoding="utf-8") == "echo new\n"
+    assert target.stat().st_mode & 0o777 == 0o755
+
+    await WriteFileTool(workspace=tmp_path).execute(path="sub/new.txt", content="hello")
+    assert (tmp_path / "sub" / "new.txt").read_text(encoding="utf-8") == "hello"
+    assert sorted(p.name for p in tmp_path.rglob("*")) == ["new.txt", "script.sh", "sub"]
+
+
+@pytest.mark.asyncio
+async def test_blocking_io_runs_off_the_event_loop(tmp_path: Path, monkeypatch) -> None:
+    threads = []
+    original = ListDirTool._list
+
+    def _spy(self, path):
+        threads.append(threading.current_thread().name)
+        return original(self, path)
+
+    monkeypatch.setattr(ListDirTool, "_list", _spy)
+    await ListDirTool(workspace=tmp_path).execute(path=".")
+
+    assert threads and threads[0].startswith("nanobot-fs")
+    assert filesystem._io_executor._max_workers == filesystem._IO_WORKERS
@@ -0,0 +1,63 @@
+"""Tests for the shared HTTP client pool."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from nanobot.agent.tools.web import WebFetchTool
+from nanobot.utils.http import HttpClientPool
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_client_and_can_be_reopened() -> None:
+    pool = HttpClientPool(http2=False)
+    client = pool.client
+    assert pool.client is client
+
+    await pool.aclose()
+    assert client.is_closed
+    assert pool.client is not client
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_caps_concurrent_requests() -> None:
+    active = 0
+    peak = 0
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, text="ok")
+
+    pool = HttpClientPool(max_per_host=2, http2=False)
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    await asyncio.gather(*(pool.get("https://example.com/x") for _ in range(6)))
+    await pool.aclose()
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_web_fetch_uses_injected_pool() -> None:
+    calls = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(200, json={"hello": "world"})
+
+    pool = HttpClientPool(http2=False)
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    tool = WebFetchTool(http=pool)
+
+    for _ in range(2):
+        result = json.loads(await tool.execute(url="https://api.example.com/data"))
+        assert result["extractor"] == "json"
+    assert len(calls) == 2
+    assert not pool.client.is_closed
+    await pool.aclose()
@@ -0,0 +1,74 @@
+"""Tests for per-session inbound message coalescing."""
+
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.coalesce import InboundCoalescer, merge_messages
+
+
+def _msg(content: str, chat_id: str = "c1", sender: str = "u1", **kw) -> InboundMessage:
+    return InboundMessage(channel="telegram", sender_id=sender, chat_id=chat_id, content=content, **kw)
+
+
+async def _drain(bus: MessageBus) -> list[InboundMessage]:
+    out = []
+    while bus.inbound_size:
+        out.append(await bus.consume_inbound())
+    return out
+
+
+@pytest.mark.asyncio
+async def test_burst_from_one_session_becomes_one_turn() -> None:
+    bus = MessageBus()
+    coalescer = InboundCoalescer(bus, window_ms=30)
+
+    await coalescer.add(_msg("hey", metadata={"message_id": 1}))
+    await coalescer.add(_msg("other chat", chat_id="c2"))
+    await coalescer.add(_msg("look at this", media=["/tmp/a.jpg"], metadata={"message_id": 2}))
+    await coalescer.add(_msg("thoughts?", metadata={"message_id": 3, "is_group": False}))
+    assert bus.inbound_size == 0
+
+    await asyncio.sleep(0.1)
+    merged = {m.chat_id: m for m in await _drain(bus)}
+
+    assert merged["c1"].content == "hey\nlook at this\nthoughts?"
+    assert merged["c1"].media == ["/tmp/a.jpg"]
+    assert merged["c1"].metadata == {"message_id": 3, "is_group": False,
+                                     "coalesced_count": 3, "message_ids": [1, 2, 3]}
+    assert merged["c2"].content == "other chat"
+    assert coalescer.merged == 2
+
+
+@pytest.mark.asyncio
+async def test_command_flushes_buffer_and_is_not_merged() -> None:
+    bus = MessageBus()
+    coalescer = InboundCoalescer(bus, window_ms=1000)
+
+    await coalescer.add(_msg("first"))
+    await coalescer.add(_msg("/new"))
+
+    assert [m.content for m in await _drain(bus)] == ["first", "/new"]
+
+
+@pytest.mark.asyncio
+async def test_max_wait_caps_a_steady_stream() -> None:
+    bus = MessageBus()
+    coalescer = InboundCoalescer(bus, window_ms=40, max_wait_ms=60)
+
+    for i in range(6):
+        await coalescer.add(_msg(f"m{i}"))
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.1)
+
+    turns = await _drain(bus)
+    assert len(turns) >= 2
+    assert "\n".join(t.content for t in turns) == "\n".join(f"m{i}" for i in range(6))
+
+
+def test_group_merge_labels_senders() -> None:
+    merged = merge_messages([_msg("hi", sender="alice"), _msg("yo", sender="bob")])
+    assert merged.content == "alice: hi\nbob: yo"
+    assert merged.sender_id == "bob"
@@ -0,0 +1,141 @@
+"""Tests for operation-based MEMORY.md updates during consolidation."""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.memory_doc import MemoryDocument, MemoryOpError
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+from nanobot.session.manager import Session
+
+MEMORY = """# Memory
+
+## User
+- Lives in Lisbon
+- Works as a  *cellist*   <!-- hand formatted -->
+
+## Projects
+* Garden controller on a Raspberry Pi
+    (waters at 6am)
+"""
+
+
+def test_annotated_ids_and_untouched_sections_kept_verbatim() -> None:
+    doc = MemoryDocument(MEMORY)
+    assert "- [2.1] Lives in Lisbon" in doc.annotated()
+    assert "- [3.1] Garden controller on a Raspberry Pi (waters at 6am)" in doc.annotated()
+    assert doc.render() == MEMORY
+
+    assert doc.apply([{"op": "update", "id": "3.1", "text": "Garden controller moved to an ESP32"}]) == 1
+    rendered = doc.render()
+    assert "- Works as a  *cellist*   <!-- hand formatted -->" in rendered  # Section 2 not rewritten
+    assert rendered.endswith("## Projects\n- Garden controller moved to an ESP32\n")
+
+
+def test_ops_are_all_or_nothing() -> None:
+    doc = MemoryDocument(MEMORY)
+    with pytest.raises(MemoryOpError, match="operation 2"):
+        doc.apply([{"op": "delete", "id": "2.1"}, {"op": "update", "id": "2.9", "text": "x"}])
+    assert doc.render() == MEMORY
+
+    with pytest.raises(MemoryOpError, match="changed twice"):
+        doc.apply([{"op": "delete", "id": "2.1"}, {"op": "update", "id": "2.1", "text": "x"}])
+
+    # Ids refer to the numbering before the batch, even after an earlier delete
+    assert doc.apply([
+        {"op": "delete", "id": "2.1"},
+        {"op": "update", "id": "2.2", "text": "Plays cello professionally"},
+        {"op": "add", "section": "user", "text": "Has a cat named Miso"},
+        {"op": "add", "section": "Travel", "text": "Visiting Tokyo in May"},
+        {"op": "add", "section": "User", "text": "has a cat named miso"},  # Duplicate, skipped
+    ]) == 4
+    assert doc.render() == MEMORY.replace(
+        "- Lives in Lisbon\n- Works as a  *cellist*   <!-- hand formatted -->\n",
+        "- Plays cello professionally\n- Has a cat named Miso\n",
+    ) + "\n## Travel\n\n- Visiting Tokyo in May\n\n"
+
+
+def test_delete_targets_the_given_duplicate_fact() -> None:
+    doc = MemoryDocument("# M\n\n- a\n- a\n- b\n")
+    assert doc.apply([{"op": "delete", "id": "1.2"}, {"op": "update", "id": "1.1", "text": "c"}]) == 2
+    assert doc.render() == "# M\n\n- c\n- b\n"
+
+
+def test_template_placeholders_replaced_and_footer_kept() -> None:
+    template = (Path(__file__).parents[1] / "nanobot" / "templates" / "memory" / "MEMORY.md").read_text()
+    doc = MemoryDocument(template)
+    doc.apply([{"op": "add", "section": "Preferences", "text": "Prefers short answers"}])
+    rendered = doc.render()
+    assert "## Preferences\n\n- Prefers short answers\n\n## Project Context" in rendered
+    assert "(User preferences learned over time)" not in rendered
+    assert rendered.endswith(template[template.index("---"):])
+
+
+def _provider(arguments: dict) -> MagicMock:
+    provider = MagicMock()
+
+    async def _chat(**kwargs):
+        provider.prompt = kwargs["messages"][1]["content"]
+        return LLMResponse(content=None, tool_calls=[ToolCallRequest("c1", "save_memory", arguments)])
+
+    provider.chat = _chat
+    return provider
+
+
+def _session() -> Session:
+    session = Session(key="cli:test")
+    for i in range(10):
+        session.add_message("user", f"msg{i}")
+    return session
+
+
+@pytest.mark.asyncio
+async def test_consolidate_applies_ops_and_appends_history(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(MEMORY)
+    provider = _provider({
+        "history_entry": "[2025-01-01 10:00] Talked about the cat.",
+        "memory_ops": '[{"op": "add", "section": "User", "text": "Has a cat"}]',  # Stringified by some models
+    })
+
+    assert await store.consolidate(_session(), provider, "m", memory_window=4)
+
+    assert "- [2.2] Works as a" in provider.prompt
+    assert "- Has a cat\n\n## Projects" in store.read_long_term()
+    assert "Talked about the cat" in store.history_file.read_text()
+
+
+@pytest.mark.asyncio
+async def test_consolidate_rejects_invalid_ops_without_writing(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(MEMORY)
+    session = _session()
+    provider = _provider({
+        "history_entry": "[2025-01-01 10:00] Something.",
+        "memory_ops": [{"op": "add", "section": "User", "text": "ok"}, {"op": "delete", "id": "7.1"}],
+    })
+
+    assert not await store.consolidate(session, provider, "m", memory_window=4)
+
+    assert store.read_long_term() == MEMORY
+    assert not store.history_file.exists()
+    assert session.last_consolidated == 0
+
+
+@pytest.mark.asyncio
+async def test_consolidate_rejects_id_ops_when_memory_changed_meanwhile(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(MEMORY)
+    provider = MagicMock()
+
+    async def _chat(**kwargs):
+        store.apply_memory_ops([{"op": "delete", "id": "2.1"}])  # A concurrent consolidation renumbers facts
+        return LLMResponse(content=None, tool_calls=[ToolCallRequest("c1", "save_memory", {
+            "history_entry": "[2025-01-01 10:00] Something.", "memory_ops": [{"op": "delete", "id": "2.1"}],
+        })])
+
+    provider.chat = _chat
+    assert not await store.consolidate(_session(), provider, "m", memory_window=4)
+    assert "Works as a" in store.read_long_term()  # The stale id did not delete the wrong fact
@@ -0,0 +1,63 @@
+"""Tests for the HISTORY.md full-text index and memory_search tool."""
+
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.history_index import HistoryIndex, to_match_query
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.memory import MemorySearchTool
+
+
+def _store(tmp_path: Path) -> MemoryStore:
+    store = MemoryStore(tmp_path)
+    store.append_history("[2024-01-05 09:00] Planned the Berlin trip with Alice; flights booked for March.")
+    store.append_history("[2024-03-10 18:30] Discussed the quarterly budget review and a deadline on Friday.")
+    store.append_history("[2025-02-01 12:00] User asked about Berlin restaurants for the anniversary dinner.")
+    return store
+
+
+@pytest.mark.asyncio
+async def test_append_indexes_incrementally_and_ranks(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    db = store.history_index._db()
+    assert db.execute("SELECT COUNT(*) FROM entries").fetchone() == (0,)  # Appends never index on the caller
+    await store.index_history()
+    assert db.execute("SELECT COUNT(*) FROM entries").fetchone() == (3,)
+    assert db.execute("SELECT value FROM state WHERE key = 'offset'").fetchone() == (
+        store.history_file.stat().st_size,
+    )
+
+    hits = store.history_index.search("berlin dinner")
+    assert [h["ts"] for h in hits] == ["2025-02-01 12:00", "2024-01-05 09:00"]  # Both terms rank first
+    assert "**Berlin**" in hits[0]["snippet"]
+    assert store.history_index.search("budgets")[0]["ts"] == "2024-03-10 18:30"  # Stemmed match
+
+
+def test_date_range_filters(tmp_path: Path) -> None:
+    index = _store(tmp_path).history_index
+    assert [h["ts"] for h in index.search("berlin", since="2025-01-01")] == ["2025-02-01 12:00"]
+    assert [h["ts"] for h in index.search("berlin", until="2024-01-05")] == ["2024-01-05 09:00"]
+    assert index.search("berlin", since="2024-02-01", until="2024-12-31") == []
+
+
+def test_rewritten_history_is_reindexed(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    store.history_file.write_text("[2024-06-01 10:00] Only the garden project remains.\n\n", encoding="utf-8")
+    fresh = HistoryIndex(store.history_file, store.history_index.index_path)  # e.g. another process
+
+    assert fresh.search("berlin") == []
+    assert [h["ts"] for h in fresh.search("garden")] == ["2024-06-01 10:00"]
+    store.append_history("[2024-06-02 10:00] More garden work.")
+    assert len(fresh.search("garden")) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_search_tool_output_and_validation(tmp_path: Path) -> None:
+    tool = MemorySearchTool(_store(tmp_path).history_index)
+
+    result = await tool.execute(query="quarterly deadline")
+    assert result.startswith("[2024-03-10 18:30]") and "**deadline**" in result
+    assert await tool.execute(query="nothing-like-this") == "No history entries match: nothing-like-this"
+    assert "YYYY-MM-DD" in await tool.execute(query="berlin", since="last week")
+    assert to_match_query('a "quoted" OR (b)') == '"a"* OR "quoted"* OR "or"* OR "b"*'
@@ -0,0 +1,78 @@
+"""Tests for the bounded, prioritised MessageBus."""
+
+import asyncio
+
+import pytest
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import LatencyHistogram, MessageBus
+
+
+def _msg(content: str, channel: str = "telegram", sender: str = "u") -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id=sender, chat_id="c", content=content)
+
+
+@pytest.mark.asyncio
+async def test_interactive_lane_is_served_first() -> None:
+    bus = MessageBus()
+    await bus.publish_inbound(_msg("cron", channel="cron"))
+    await bus.publish_inbound(_msg("subagent", channel="system", sender="subagent"))
+    await bus.publish_inbound(_msg("user1"))
+    await bus.publish_inbound(_msg("user2"))
+
+    order = [(await bus.consume_inbound()).content for _ in range(4)]
+
+    assert order == ["user1", "user2", "subagent", "cron"]
+    lanes = bus.stats()["inbound"]["lanes"]
+    assert lanes["interactive"]["latency"]["count"] == 2
+    assert lanes["background"]["enqueued"] == 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_policy_applies_backpressure() -> None:
+    bus = MessageBus(max_inbound=2)
+    await bus.publish_inbound(_msg("a"))
+    await bus.publish_inbound(_msg("b"))
+
+    pending = asyncio.create_task(bus.publish_inbound(_msg("c")))
+    await asyncio.sleep(0.01)
+    assert not pending.done()
+
+    assert (await bus.consume_inbound()).content == "a"
+    await asyncio.wait_for(pending, 1.0)
+    assert bus.inbound_size == 2
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_evicts_lower_priority_work_first() -> None:
+    bus = MessageBus(max_inbound=2, policies={"telegram": "drop_oldest"})
+    await bus.publish_inbound(_msg("heartbeat", channel="heartbeat"))
+    await bus.publish_inbound(_msg("u1"))
+    await bus.publish_inbound(_msg("u2"))  # Evicts the heartbeat
+    await bus.publish_inbound(_msg("u3"))  # Evicts u1
+    await bus.publish_inbound(_msg("late", channel="cron"))  # Nothing lower to evict: dropped
+
+    assert [(await bus.consume_inbound()).content for _ in range(2)] == ["u2", "u3"]
+    lanes = bus.stats()["inbound"]["lanes"]
+    assert lanes["background"]["dropped"] == 2
+    assert lanes["interactive"]["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_consumer_does_not_lose_messages() -> None:
+    bus = MessageBus()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.consume_outbound(), timeout=0.01)
+
+    await bus.publish_outbound(OutboundMessage(channel="cli", chat_id="x", content="hi"))
+    assert (await bus.consume_outbound()).content == "hi"
+
+
+def test_latency_histogram_quantiles() -> None:
+    hist = LatencyHistogram()
+    for ms in [0.5] * 90 + [70] * 9 + [60000]:
+        hist.observe(ms)
+
+    assert hist.quantile(0.5) == 1.0
+    assert hist.quantile(0.95) == 100.0
+    assert hist.quantile(1.0) == 60000
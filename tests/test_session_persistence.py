@@ -0,0 +1,176 @@
+"""Tests for append-only session persistence."""
+
+import json
+from pathlib import Path
+
+from nanobot.session.manager import Session, SessionManager
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line]
+
+
+def test_save_appends_only_new_messages(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("telegram:1")
+    session.add_message("user", "hello")
+    manager.save(session)
+    path = manager._get_session_path(session.key)
+    head = path.read_bytes()
+
+    session.add_message("assistant", "hi")
+    session.last_consolidated = 1
+    manager.save(session)
+
+    data = path.read_bytes()
+    assert data.startswith(head)
+    tail = [json.loads(line) for line in data[len(head):].decode().splitlines()]
+    assert [r.get("content") for r in tail] == ["hi", None]
+    assert tail[-1]["_type"] == "metadata"
+
+    reloaded = SessionManager(tmp_path).get_or_create("telegram:1")
+    assert [m["content"] for m in reloaded.messages] == ["hello", "hi"]
+    assert reloaded.last_consolidated == 1
+
+
+def test_loads_legacy_file_and_appends_to_it(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    path = manager._get_session_path("cli:legacy")
+    path.write_text(
+        json.dumps({"_type": "metadata", "key": "cli:legacy", "created_at": "2025-01-01T00:00:00",
+                    "metadata": {}, "last_consolidated": 0}) + "\n"
+        + json.dumps({"role": "user", "content": "old"}) + "\n",
+        encoding="utf-8",
+    )
+
+    session = manager.get_or_create("cli:legacy")
+    session.add_message("user", "new")
+    manager.save(session)
+
+    assert [r.get("content") for r in _lines(path)] == [None, "old", "new", None]
+    assert manager.list_sessions()[0]["updated_at"] == session.updated_at.isoformat()
+
+
+def test_compaction_rewrites_file_after_threshold(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, compact_every=3)
+    session = manager.get_or_create("cli:c")
+    for i in range(5):
+        session.add_message("user", f"m{i}")
+        manager.save(session)
+
+    records = _lines(manager._get_session_path(session.key))
+    assert sum(1 for r in records if r.get("_type") == "metadata") < 5
+    assert [r["content"] for r in records if "role" in r] == [f"m{i}" for i in range(5)]
+
+
+def test_clear_forces_full_rewrite(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = manager.get_or_create("cli:x")
+    session.add_message("user", "a")
+    session.add_message("user", "b")
+    manager.save(session)
+
+    session.clear()
+    session.add_message("user", "c")
+    session.add_message("user", "d")
+    manager.save(session)
+
+    records = _lines(manager._get_session_path(session.key))
+    assert [r["content"] for r in records if "role" in r] == ["c", "d"]
+
+
+def test_torn_trailing_line_is_skipped_and_repaired(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path)
+    session = Session(key="cli:t")
+    session.add_message("user", "ok")
+    manager.save(session)
+    path = manager._get_session_path(session.key)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"role": "user", "cont')
+
+    fresh = SessionManager(tmp_path)
+    loaded = fresh.get_or_create("cli:t")
+    assert [m["content"] for m in loaded.messages] == ["ok"]
+
+    loaded.add_message("user", "after")
+    fresh.save(loaded)
+    assert [r["content"] for r in _lines(path) if "role" in r] == ["ok", "after"]
+
+
+def _saved_session(tmp_path: Path, count: int, last_consolidated: int) -> SessionManager:
+    manager = SessionManager(tmp_path, compact_every=1000)
+    session = manager.get_or_create("cli:long")
+    for i in range(count):
+        session.add_message("user", f"m{i}")
+        if i % 10 == 9:
+            manager.save(session)
+    session.last_consolidated = last_consolidated
+    manager.save(session)
+    return manager
+
+
+def test_tail_load_reads_only_recent_and_unconsolidated_messages(tmp_path: Path) -> None:
+    _saved_session(tmp_path, 100, last_consolidated=70)
+    session = SessionManager(tmp_path, tail_messages=10).get_or_create("cli:long")
+    assert [m["content"] for m in session.messages] == [f"m{i}" for i in range(70, 100)]
+    assert session.last_consolidated == 0 and session._offset == 70
+
+    _saved_session(tmp_path / "b", 100, last_consolidated=95)
+    session = SessionManager(tmp_path / "b", tail_messages=10).get_or_create("cli:long")
+    assert [m["content"] for m in session.messages] == [f"m{i}" for i in range(90, 100)]
+    assert session.last_consolidated == 5
+
+
+def test_tail_loaded_session_keeps_unloaded_prefix_on_disk(tmp_path: Path) -> None:
+    _saved_session(tmp_path, 100, last_consolidated=95)
+    manager = SessionManager(tmp_path, tail_messages=10, compact_every=1)
+    session = manager.get_or_create("cli:long")
+    session.add_message("assistant", "appended")
+    manager.save(session)  # Append
+    session.add_message("assistant", "rewritten")
+    manager.save(session)  # Compaction rewrite
+
+    path = manager._get_session_path("cli:long")
+    assert _lines(path)[0] == {**_lines(path)[0], "_type": "metadata", "last_consolidated": 95}
+    full = SessionManager(tmp_path, tail_messages=1000).get_or_create("cli:long")
+    assert [m["content"] for m in full.messages] == [f"m{i}" for i in range(100)] + ["appended", "rewritten"]
+    assert full.last_consolidated == 95 and full._offset == 0
+
+
+def test_stale_index_falls_back_to_full_parse(tmp_path: Path) -> None:
+    manager = _saved_session(tmp_path, 20, last_consolidated=0)
+    path = manager._get_session_path("cli:long")
+    assert path.with_name(path.name + ".idx").exists()
+    with open(path, "a", encoding="utf-8") as f:  # Written by something that does not maintain the index
+        f.write(json.dumps({"role": "user", "content": "external"}) + "\n")
+
+    session = SessionManager(tmp_path).get_or_create("cli:long")
+    assert session.messages[-1]["content"] == "external" and len(session.messages) == 21
+
+
+def test_lru_eviction_flushes_unsaved_sessions(tmp_path: Path) -> None:
+    manager = SessionManager(tmp_path, max_cached=2)
+    a = manager.get_or_create("cli:a")
+    a.add_message("user", "unsaved")
+    manager.get_or_create("cli:b")
+    manager.get_or_create("cli:c")
+
+    assert list(manager._cache) == ["cli:b", "cli:c"]
+    assert manager.cache_stats["evictions"] == 1
+    assert [m["content"] for m in SessionManager(tmp_path).get_or_create("cli:a").messages] == ["unsaved"]
+    assert manager.get_or_create("cli:a") is a  # Still referenced, so not loaded a second time
+
+
+def test_idle_sessions_expire(tmp_path: Path, monkeypatch) -> None:
+    import nanobot.session.manager as module
+
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    manager = SessionManager(tmp_path, ttl=60)
+    manager.get_or_create("cli:idle")
+    now[0] += 30
+    manager.get_or_create("cli:busy")
+    now[0] += 45
+    manager.get_or_create("cli:busy")
+
+    assert list(manager._cache) == ["cli:busy"]
@@ -0,0 +1,89 @@
+"""Tests for the skill index and frontmatter parser."""
+
+import os
+from pathlib import Path
+
+from nanobot.agent.skills import SkillsLoader, parse_frontmatter
+
+
+def _write_skill(root: Path, name: str, frontmatter: str, body: str = "body") -> Path:
+    path = root / name / "SKILL.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\n{frontmatter}\n---\n{body}\n", encoding="utf-8")
+    return path
+
+
+def test_parse_frontmatter_subset() -> None:
+    meta = parse_frontmatter(
+        "---\n"
+        "name: demo\n"
+        "description: \"Quoted: with colon\"\n"
+        "always: true\n"
+        "homepage: https://example.com/:help\n"
+        "metadata: {\"nanobot\": {\"requires\": {\"bins\": [\"git\"]}}}\n"
+        "tags:\n"
+        "  - a\n"
+        "  - b\n"
+        "nested:\n"
+        "  env: [FOO, BAR]\n"
+        "  count: 3\n"
+        "---\nbody\n"
+    )
+    assert meta == {
+        "name": "demo",
+        "description": "Quoted: with colon",
+        "always": True,
+        "homepage": "https://example.com/:help",
+        "metadata": {"nanobot": {"requires": {"bins": ["git"]}}},
+        "tags": ["a", "b"],
+        "nested": {"env": ["FOO", "BAR"], "count": 3},
+    }
+    assert parse_frontmatter("no frontmatter") is None
+
+
+def test_workspace_overrides_builtin_and_entries_are_reused(tmp_path: Path) -> None:
+    builtin = tmp_path / "builtin"
+    _write_skill(builtin, "alpha", "description: builtin alpha")
+    _write_skill(builtin, "beta", "description: builtin beta")
+    _write_skill(tmp_path / "ws" / "skills", "alpha", "description: workspace alpha")
+    loader = SkillsLoader(tmp_path / "ws", builtin_skills_dir=builtin)
+
+    skills = loader.list_skills()
+    assert [(s["name"], s["source"]) for s in skills] == [("alpha", "workspace"), ("beta", "builtin")]
+    assert loader.get_skill_metadata("alpha")["description"] == "workspace alpha"
+
+    entry = loader.index.get("beta")
+    loader.index.refresh(force=True)
+    assert loader.index.get("beta") is entry
+
+
+def test_index_picks_up_new_and_edited_skills(tmp_path: Path) -> None:
+    builtin = tmp_path / "builtin"
+    path = _write_skill(builtin, "alpha", "description: one")
+    loader = SkillsLoader(tmp_path / "ws", builtin_skills_dir=builtin, cache_ttl=3600)
+    version = loader.fingerprint()
+
+    _write_skill(builtin, "gamma", "description: new")
+    assert [s["name"] for s in loader.list_skills()] == ["alpha", "gamma"]
+
+    path.write_text("---\ndescription: two\n---\nbody\n", encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    loader.index.refresh(force=True)
+    assert loader.get_skill_metadata("alpha")["description"] == "two"
+    assert loader.fingerprint() != version
+
+
+def test_availability_is_cached_until_ttl(tmp_path: Path, monkeypatch) -> None:
+    builtin = tmp_path / "builtin"
+    _write_skill(builtin, "needs-env", 'metadata: {"nanobot": {"requires": {"env": ["SKILL_TEST_KEY"]}}}')
+    monkeypatch.delenv("SKILL_TEST_KEY", raising=False)
+    loader = SkillsLoader(tmp_path / "ws", builtin_skills_dir=builtin, cache_ttl=3600)
+
+    assert loader.list_skills() == []
+    monkeypatch.setenv("SKILL_TEST_KEY", "x")
+    assert loader.list_skills() == []
+
+    loader.index.ttl = 0
+    assert [s["name"] for s in loader.list_skills()] == ["needs-env"]
+    assert "ENV: SKILL_TEST_KEY" not in loader.build_skills_summary()
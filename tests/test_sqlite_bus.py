@@ -0,0 +1,131 @@
+"""Tests for the SQLite-backed multi-process message bus."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import TURN_LANES, BaseMessageBus, MessageBus
+from nanobot.bus.sqlite import SqliteMessageBus, shard_for
+
+
+def _msg(chat_id: str, content: str, channel: str = "telegram") -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id=chat_id, content=content,
+                          metadata={"message_id": 7})
+
+
+@pytest.mark.asyncio
+async def test_messages_round_trip_between_frontend_and_worker(tmp_path: Path) -> None:
+    db = tmp_path / "bus.db"
+    frontend = SqliteMessageBus(db, poll_interval=0.01)
+    worker = SqliteMessageBus(db, worker_index=0, poll_interval=0.01)
+
+    sent = _msg("42", "hello")
+    await frontend.publish_inbound(sent)
+    received = await asyncio.wait_for(worker.consume_inbound(), 1.0)
+    assert received == sent
+
+    await worker.publish_outbound(OutboundMessage(channel="telegram", chat_id="42", content="hi", media=["a.png"]))
+    reply = await asyncio.wait_for(frontend.consume_outbound(), 1.0)
+    assert (reply.chat_id, reply.content, reply.media) == ("42", "hi", ["a.png"])
+
+    with pytest.raises(RuntimeError):
+        await frontend.consume_inbound()
+
+
+@pytest.mark.asyncio
+async def test_sessions_stick_to_one_worker_in_order(tmp_path: Path) -> None:
+    db = tmp_path / "bus.db"
+    frontend = SqliteMessageBus(db, workers=2)
+    workers = [SqliteMessageBus(db, workers=2, worker_index=i, poll_interval=0.01) for i in range(2)]
+
+    chats = [str(i) for i in range(8)]
+    for n in range(3):
+        for chat in chats:
+            await frontend.publish_inbound(_msg(chat, f"{chat}-{n}"))
+    # A subagent result follows its origin session to the same worker
+    await frontend.publish_inbound(_msg("telegram:0", "announce", channel="system"))
+
+    seen: dict[int, list[InboundMessage]] = {0: [], 1: []}
+    for i, bus in enumerate(workers):
+        while bus.inbound_size and len(seen[0]) + len(seen[1]) < 25:
+            try:
+                seen[i].append(await asyncio.wait_for(bus.consume_inbound(), 0.1))
+            except asyncio.TimeoutError:
+                break
+
+    assert len(seen[0]) + len(seen[1]) == 25
+    for i, msgs in seen.items():
+        for msg in msgs:
+            assert shard_for(msg.affinity_key, 2) == i
+        for chat in chats:
+            contents = [m.content for m in msgs if m.chat_id == chat]
+            assert contents in ([], [f"{chat}-0", f"{chat}-1", f"{chat}-2"])
+    owner = shard_for("telegram:0", 2)
+    assert seen[owner][-1].content == "announce"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_consume_keeps_claimed_message(tmp_path: Path) -> None:
+    db = tmp_path / "bus.db"
+    bus = SqliteMessageBus(db, worker_index=0, poll_interval=0.01)
+
+    for _ in range(5):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bus.consume_inbound(), 0.001)
+        await bus.publish_inbound(_msg("1", "x"))
+        msg = await asyncio.wait_for(bus.consume_inbound(), 1.0)
+        assert msg.content == "x"
+    assert bus.inbound_size == 0
+    assert bus.stats()["inbound"]["latency"]["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_control_lane_bypasses_full_bus_and_can_be_consumed_alone(tmp_path: Path) -> None:
+    bus = SqliteMessageBus(tmp_path / "bus.db", worker_index=0, max_inbound=1, poll_interval=0.01)
+    await bus.publish_inbound(_msg("1", "hello"))
+    await asyncio.wait_for(bus.publish_inbound(_msg("1", "/stop")), 1.0)
+
+    stop = await asyncio.wait_for(bus.consume_inbound(lanes=("control",)), 1.0)
+    assert stop.content == "/stop"
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.consume_inbound(lanes=("control",)), 0.05)
+    assert (await asyncio.wait_for(bus.consume_inbound(), 1.0)).content == "hello"
+
+
+@pytest.mark.asyncio
+async def test_dropped_newcomer_is_reported(tmp_path: Path) -> None:
+    bus = SqliteMessageBus(tmp_path / "bus.db", worker_index=0, max_inbound=1, policies={"telegram": "drop_oldest"})
+    await bus.publish_inbound(_msg("1", "first"))
+    await asyncio.wait_for(bus.publish_inbound(_msg("2", "late", channel="cron")), 1.0)  # Nothing lower to evict
+
+    assert not bus._insert_inbound(0, 3, "{}", "drop_oldest")  # Reported as not accepted
+    assert bus.stats()["inbound"]["dropped"] == 2 and bus.inbound_size == 1
+    assert (await asyncio.wait_for(bus.consume_inbound(), 1.0)).content == "first"
+
+
+@pytest.mark.asyncio
+async def test_turn_consumer_never_claims_control_messages(tmp_path: Path) -> None:
+    bus = SqliteMessageBus(tmp_path / "bus.db", worker_index=0, poll_interval=0.01)
+    await bus.publish_inbound(_msg("1", "/stop"))
+    await bus.publish_inbound(_msg("1", "/stop"))
+    await bus.publish_inbound(_msg("1", "hi"))
+
+    assert (await asyncio.wait_for(bus.consume_inbound(lanes=TURN_LANES), 1.0)).content == "hi"
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.consume_inbound(lanes=TURN_LANES), 0.05)
+    for _ in range(2):
+        assert (await asyncio.wait_for(bus.consume_inbound(lanes=("control",)), 1.0)).content == "/stop"
+
+
+@pytest.mark.asyncio
+async def test_outbound_limit_holds_across_processes(tmp_path: Path) -> None:
+    db = tmp_path / "bus.db"
+    workers = [SqliteMessageBus(db, 2, i, max_outbound=3) for i in range(2)]
+    assert all(isinstance(bus, BaseMessageBus) and not isinstance(bus, MessageBus) for bus in workers)
+
+    results = await asyncio.gather(*(
+        asyncio.to_thread(workers[i % 2]._insert_outbound, "{}", "block") for i in range(10)
+    ))
+    assert results.count(True) == 3 and workers[0].outbound_size == 3
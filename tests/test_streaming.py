@@ -0,0 +1,113 @@
+"""Tests for streaming chat completions from provider to bus."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse, LLMStreamChunk, StreamAccumulator
+from nanobot.providers.openai_codex_provider import _consume_sse
+
+
+def _chunk(content=None, tool_calls=None, finish_reason=None, usage=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls, reasoning_content=None)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)],
+        usage=usage,
+    )
+
+
+def _tc(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def test_stream_accumulator_assembles_text_and_tool_calls() -> None:
+    acc = StreamAccumulator()
+    deltas = [
+        acc.add(_chunk(content="Let me ")),
+        acc.add(_chunk(content="check.")),
+        acc.add(_chunk(tool_calls=[_tc(0, id="call_1", name="read_file", arguments='{"pa')])),
+        acc.add(_chunk(tool_calls=[_tc(0, arguments='th": "a.txt"}')])),
+        acc.add(_chunk(finish_reason="tool_calls")),
+        acc.add(SimpleNamespace(
+            choices=[],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        )),
+    ]
+    response = acc.build()
+
+    assert "".join(deltas) == "Let me check."
+    assert response.content == "Let me check."
+    assert response.finish_reason == "tool_calls"
+    assert response.usage["total_tokens"] == 15
+    assert response.tool_calls[0].name == "read_file"
+    assert response.tool_calls[0].arguments == {"path": "a.txt"}
+
+
+async def test_default_chat_stream_falls_back_to_chat() -> None:
+    class _Provider(LLMProvider):
+        async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+            return LLMResponse(content="hello")
+
+        def get_default_model(self) -> str:
+            return "m"
+
+    chunks = [c async for c in _Provider().chat_stream(messages=[])]
+    assert [c.delta for c in chunks] == ["hello", ""]
+    assert chunks[-1].response.content == "hello"
+
+
+async def test_codex_sse_yields_deltas_before_final_response() -> None:
+    events = [
+        {"type": "response.output_text.delta", "delta": "Hel"},
+        {"type": "response.output_text.delta", "delta": "lo"},
+        {"type": "response.completed", "response": {"status": "completed"}},
+    ]
+    lines = []
+    for event in events:
+        lines += [f"data: {json.dumps(event)}", ""]
+
+    async def _aiter_lines():
+        for line in lines:
+            yield line
+
+    chunks = [c async for c in _consume_sse(SimpleNamespace(aiter_lines=_aiter_lines))]
+
+    assert [c.delta for c in chunks[:-1]] == ["Hel", "lo"]
+    assert chunks[-1].response.content == "Hello"
+    assert chunks[-1].response.finish_reason == "stop"
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_forwards_stream_snapshots(tmp_path: Path) -> None:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+
+    async def _chat_stream(**kwargs):
+        for piece in ["<think>hmm</think>Hel", "lo ", "world"]:
+            yield LLMStreamChunk(delta=piece)
+        yield LLMStreamChunk(response=LLMResponse(content="<think>hmm</think>Hello world"))
+
+    provider.chat_stream = _chat_stream
+    bus = MessageBus()
+    loop = AgentLoop(
+        bus=bus, provider=provider, workspace=tmp_path, model="test-model",
+        stream_responses=True, stream_interval_ms=0,
+    )
+    loop.tools.get_definitions = MagicMock(return_value=[])
+
+    response = await loop._process_message(InboundMessage("telegram", "u", "c", "hi"))
+
+    snapshots = []
+    while bus.outbound_size:
+        snapshots.append(await bus.consume_outbound())
+    assert [m.content for m in snapshots] == ["Hel", "Hello", "Hello world"]
+    assert all(m.metadata["_stream"] for m in snapshots)
+    assert len({m.metadata["_stream_id"] for m in snapshots}) == 1
+    assert response.content == "Hello world"
+    assert response.metadata["_stream_id"] == snapshots[0].metadata["_stream_id"]
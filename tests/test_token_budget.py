@@ -0,0 +1,72 @@
+"""Tests for token-budgeted history windowing."""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.session.manager import Session
+from nanobot.utils.tokens import TokenCounter, estimate_tokens
+
+
+def _counter() -> tuple[TokenCounter, list[str]]:
+    seen: list[str] = []
+
+    def _count(text: str) -> int:
+        seen.append(text)
+        return len(text)
+
+    return TokenCounter(_count), seen
+
+
+def test_estimate_tokens_handles_ascii_and_cjk() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("你好") == 2
+
+
+def test_token_counts_are_cached_per_message() -> None:
+    counter, seen = _counter()
+    session = Session(key="cli:t")
+    session.add_message("user", "aaaa")
+    session.add_message("assistant", "bb")
+
+    assert session.token_counts(counter) == [8, 6]
+    session.add_message("user", "c")
+    assert session.token_counts(counter) == [8, 6, 5]
+    assert seen == ["aaaa", "bb", "c"]
+
+
+def test_history_window_respects_budget_and_keeps_tool_pairs() -> None:
+    counter, _ = _counter()
+    session = Session(key="cli:t")
+    session.add_message("user", "x" * 50)
+    session.add_message("assistant", "", tool_calls=[{"id": "1", "type": "function",
+                                                      "function": {"name": "f", "arguments": "{}"}}])
+    session.add_message("tool", "r" * 20, tool_call_id="1", name="f")
+    session.add_message("assistant", "done")
+
+    full = session.get_history(max_tokens=10_000, counter=counter)
+    assert [m["role"] for m in full] == ["user", "assistant", "tool", "assistant"]
+
+    # Enough room for the final reply and the tool result, but not the tool call.
+    budget = sum(session.token_counts(counter)[2:]) + 1
+    assert [m["role"] for m in session.get_history(max_tokens=budget, counter=counter)] == ["assistant"]
+
+    assert session.get_history(max_tokens=1, counter=counter) == []
+
+
+def test_consolidation_triggers_on_token_pressure(tmp_path: Path) -> None:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "m"
+    loop = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path,
+                     memory_window=100, history_max_tokens=100)
+    session = Session(key="cli:t")
+    session.add_message("user", "short")
+    assert not loop._needs_consolidation(session)
+
+    session.add_message("user", "x" * 1000)
+    assert loop._needs_consolidation(session)
+
+    session.last_consolidated = 2
+    assert not loop._needs_consolidation(session)
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
@@ -86,3 +87,57 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+class SleepTool(Tool):
+    def __init__(self, name: str, concurrency_safe: bool, log: list[str]):
+        self._name = name
+        self.concurrency_safe = concurrency_safe
+        self._log = log
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "sleep tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"delay": {"type": "number"}}}
+
+    async def execute(self, delay: float = 0.0, **kwargs: Any) -> str:
+        self._log.append(f"start {self._name}")
+        await asyncio.sleep(delay)
+        self._log.append(f"end {self._name}")
+        return f"{self._name}:{delay}"
+
+
+async def test_execute_batch_preserves_order_and_runs_safe_calls_concurrently() -> None:
+    log: list[str] = []
+    reg = ToolRegistry()
+    reg.register(SleepTool("fetch", True, log))
+
+    results = await reg.execute_batch(
+        [("fetch", {"delay": 0.03}), ("fetch", {"delay": 0.01}), ("fetch", {"delay": 0.02})],
+        max_parallel=4,
+    )
+
+    assert results == ["fetch:0.03", "fetch:0.01", "fetch:0.02"]
+    assert log[:3] == ["start fetch"] * 3
+
+
+async def test_execute_batch_serial_tool_acts_as_barrier() -> None:
+    log: list[str] = []
+    reg = ToolRegistry()
+    reg.register(SleepTool("read", True, log))
+    reg.register(SleepTool("write", False, log))
+
+    results = await reg.execute_batch(
+        [("read", {"delay": 0.01}), ("write", {"delay": 0.01}), ("read", {"delay": 0.0})],
+        max_parallel=4,
+    )
+
+    assert results == ["read:0.01", "write:0.01", "read:0.0"]
+    assert log == ["start read", "end read", "start write", "end write", "start read", "end read"]
@@ -0,0 +1,86 @@
+"""Tests for agent turn span tracing."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+from nanobot.utils.tracing import SpanStats, Tracer, percentile, read_trace_file
+
+
+@pytest.mark.asyncio
+async def test_turn_produces_nested_spans_with_usage(tmp_path: Path) -> None:
+    tracer = Tracer(tmp_path / "spans.jsonl")
+    provider = MagicMock()
+    loop = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path, model="m", tracer=tracer)
+    loop.tools.get_definitions = MagicMock(return_value=[])
+    replies = iter([
+        LLMResponse(content=None, tool_calls=[ToolCallRequest("c1", "list_dir", {"path": str(tmp_path)})],
+                    usage={"prompt_tokens": 100, "completion_tokens": 5}),
+        LLMResponse(content="done", usage={"prompt_tokens": 120, "completion_tokens": 3}),
+    ])
+
+    async def _chat(**kwargs):
+        return next(replies)
+
+    provider.chat = _chat
+    await loop._process_message(InboundMessage("telegram", "u", "c", "hi"))
+
+    records = list(read_trace_file(tmp_path / "spans.jsonl"))
+    by_kind: dict[str, list[dict]] = {}
+    for r in records:
+        by_kind.setdefault(r["kind"], []).append(r)
+    assert {k: len(v) for k, v in by_kind.items()} == {
+        "turn": 1, "context_build": 1, "iteration": 2, "llm_call": 2, "tool_call": 1, "session_save": 1,
+    }
+
+    turn = by_kind["turn"][0]
+    assert turn["parent"] is None and turn["session"] == "telegram:c"
+    assert {r["trace"] for r in records} == {turn["trace"]}
+    iteration_ids = {r["span"] for r in by_kind["iteration"]}
+    assert all(r["parent"] in iteration_ids for r in by_kind["llm_call"] + by_kind["tool_call"])
+    assert all(r["parent"] == turn["span"] for r in by_kind["iteration"] + by_kind["session_save"])
+    assert by_kind["llm_call"][0]["usage"] == {"prompt_tokens": 100, "completion_tokens": 5}
+    assert by_kind["tool_call"][0]["tool"] == "list_dir"
+    assert tracer.stats.summary()["llm_call"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_span_outcome_records_errors_and_cancellation() -> None:
+    tracer = Tracer()
+    with pytest.raises(ValueError):
+        with tracer.span("tool_call"):
+            raise ValueError("bad")
+
+    async def _slow():
+        with tracer.span("llm_call"):
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(_slow())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    summary = tracer.stats.summary()
+    assert summary["tool_call"]["errors"] == 1
+    assert summary["llm_call"]["errors"] == 1
+
+
+def test_percentiles_and_file_aggregation(tmp_path: Path) -> None:
+    values = sorted(float(i) for i in range(1, 101))
+    assert (percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99)) == (50.0, 95.0, 99.0)
+
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(path, max_bytes=2000)
+    for i in range(40):
+        with tracer.span("turn", n=i):
+            pass
+    assert path.with_name("spans.jsonl.1").exists()
+    stats = SpanStats.from_records(read_trace_file(path))
+    assert 0 < stats.summary()["turn"]["count"] <= 40
@@ -0,0 +1,160 @@
+"""Tests for /stop, turn supersession and cancellation cleanup."""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+
+class _Counter(Tool):
+    """Fast tool; the second call in a turn never finishes."""
+
+    def __init__(self):
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "count"
+
+    @property
+    def description(self) -> str:
+        return "count"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {}}
+
+    async def execute(self, **kwargs: Any) -> str:
+        self.calls += 1
+        if self.calls > 1:
+            await asyncio.Event().wait()
+        return f"n={self.calls}"
+
+
+def _make_loop(tmp_path: Path, **kwargs) -> AgentLoop:
+    provider = MagicMock()
+    provider.get_default_model.return_value = "test-model"
+    loop = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path, model="test-model", **kwargs)
+    loop.tools.get_definitions = MagicMock(return_value=[])
+    return loop
+
+
+async def _next_reply(bus: MessageBus) -> str:
+    while True:
+        msg = await asyncio.wait_for(bus.consume_outbound(), timeout=2.0)
+        if not msg.metadata.get("_progress"):
+            return msg.content
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_turn_and_keeps_completed_tool_rounds(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path)
+    counter = _Counter()
+    loop.tools.register(counter)
+    call_no = 0
+
+    async def _chat(messages, **kwargs):
+        nonlocal call_no
+        call_no += 1
+        return LLMResponse(content=None, tool_calls=[ToolCallRequest(id=f"c{call_no}", name="count", arguments={})])
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "count twice"))
+        while counter.calls < 2:
+            await asyncio.sleep(0.01)
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "/stop"))
+        assert await _next_reply(loop.bus) == "Stopped."
+    finally:
+        loop.stop()
+        await runner
+
+    saved = loop.sessions.get_or_create("telegram:a").messages
+    assert [m["role"] for m in saved] == ["user", "assistant", "tool", "assistant"]
+    assert saved[1]["tool_calls"][0]["id"] == "c1"
+    assert saved[2]["content"] == "n=1"
+    assert "Stopped" in saved[3]["content"]
+    assert not loop._active_turns
+
+
+@pytest.mark.asyncio
+async def test_newer_message_supersedes_in_flight_turn(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path, supersede_turns=True)
+
+    async def _chat(messages, **kwargs):
+        text = messages[-1]["content"]
+        if text == "old":
+            await asyncio.Event().wait()
+        return LLMResponse(content=f"re:{text}")
+
+    loop.provider.chat = _chat
+    runner = asyncio.create_task(loop.run())
+    try:
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "old"))
+        while "telegram:a" not in loop._active_turns:
+            await asyncio.sleep(0.01)
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "new"))
+        assert await _next_reply(loop.bus) == "re:new"
+    finally:
+        loop.stop()
+        await runner
+
+    contents = [m["content"] for m in loop.sessions.get_or_create("telegram:a").messages]
+    assert contents[0] == "old" and "Stopped" in contents[1]
+    assert contents[2] == "new"
+
+
+@pytest.mark.asyncio
+async def test_stop_with_nothing_running(tmp_path: Path) -> None:
+    loop = _make_loop(tmp_path)
+    runner = asyncio.create_task(loop.run())
+    try:
+        await loop.bus.publish_inbound(InboundMessage("telegram", "u", "a", "/stop"))
+        assert await _next_reply(loop.bus) == "Nothing to stop."
+    finally:
+        loop.stop()
+        await runner
+
+
+@pytest.mark.skipif(os.name == "nt", reason="process groups are POSIX-only")
+@pytest.mark.asyncio
+async def test_cancelled_exec_kills_process_group(tmp_path: Path) -> None:
+    pidfile = tmp_path / "child.pid"
+    tool = ExecTool(working_dir=str(tmp_path), timeout=60)
+    task = asyncio.create_task(tool.execute(command=f"sleep 30 & echo $! > {pidfile}; wait"))
+    while not pidfile.exists() or not pidfile.read_text().strip():
+        await asyncio.sleep(0.01)
+    child = int(pidfile.read_text())
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    for _ in range(100):
+        if not _alive(child):
+            break
+        await asyncio.sleep(0.01)
+    else:
+        pytest.fail("background child survived cancellation")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:  # An unreaped zombie still answers signal 0
+        return Path(f"/proc/{pid}/stat").read_text().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
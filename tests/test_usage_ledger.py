@@ -0,0 +1,104 @@
+"""Tests for token usage accounting and per-session budgets."""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.usage import UsageLedger
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMResponse, ToolCallRequest, parse_usage
+from nanobot.providers.openai_codex_provider import _consume_sse
+
+
+def test_ledger_aggregates_rows_and_survives_reopen(tmp_path: Path) -> None:
+    ledger = UsageLedger(tmp_path / "usage.db")
+    ledger.record("telegram:1", "telegram", "m1", {"prompt_tokens": 100, "completion_tokens": 10, "cached_tokens": 80})
+    ledger.record("telegram:1", "telegram", "m1", {"prompt_tokens": 120, "completion_tokens": 5})
+    ledger.record("slack:2", "slack", "m2", {"prompt_tokens": 50, "completion_tokens": 50})
+    assert ledger.session_total("telegram:1") == 235
+    ledger.close()
+
+    reopened = UsageLedger(tmp_path / "usage.db")
+    assert reopened.session_total("telegram:1") == 235
+    by_session = reopened.summary(by="session")
+    assert by_session[0] == {"session": "telegram:1", "calls": 2, "prompt_tokens": 220, "completion_tokens": 15,
+                             "cached_tokens": 80, "total_tokens": 235}
+    assert [r["model"] for r in reopened.summary(by="model")] == ["m1", "m2"]
+    (rows,) = reopened._conn.execute("SELECT COUNT(*) FROM usage").fetchone()
+    assert rows == 2
+
+
+@pytest.mark.asyncio
+async def test_async_flush_and_budget_fill_do_not_double_count(tmp_path: Path) -> None:
+    ledger = UsageLedger(tmp_path / "usage.db")
+    ledger.record("telegram:1", "telegram", "m1", {"prompt_tokens": 100, "completion_tokens": 10})
+    await ledger.aflush()
+    ledger.close()
+
+    reopened = UsageLedger(tmp_path / "usage.db")
+    reopened.record("telegram:1", "telegram", "m1", {"prompt_tokens": 20, "completion_tokens": 1})
+    totals = await asyncio.gather(reopened.asession_total("telegram:1"), reopened.aflush(),
+                                  reopened.asession_total("telegram:1"))
+    assert totals[0] == totals[2] == 131
+    reopened.record("telegram:1", "telegram", "m1", {"prompt_tokens": 1, "completion_tokens": 0})
+    assert await reopened.asession_total("telegram:1") == 132
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_records_usage_and_enforces_budget(tmp_path: Path) -> None:
+    ledger = UsageLedger(tmp_path / "usage.db")
+    provider = MagicMock()
+    loop = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path, model="m",
+                     usage_ledger=ledger, session_token_budget=1000)
+    loop.tools.get_definitions = MagicMock(return_value=[])
+    calls = 0
+
+    async def _chat(**kwargs):
+        nonlocal calls
+        calls += 1  # A runaway tool loop
+        return LLMResponse(content=None, tool_calls=[ToolCallRequest(f"c{calls}", "list_dir", {"path": "."})],
+                           usage={"prompt_tokens": 300, "completion_tokens": 20})
+
+    provider.chat = _chat
+    response = await loop._process_message(InboundMessage("cli", "u", "x", "go"))
+
+    assert calls == 4  # 4 x 320 tokens crosses the 1000-token budget
+    assert "daily token budget" in response.content
+    assert ledger.summary(by="channel") == [{"channel": "cli", "calls": 4, "prompt_tokens": 1200,
+                                             "completion_tokens": 80, "cached_tokens": 0, "total_tokens": 1280}]
+
+
+def test_parse_usage_reads_cached_tokens() -> None:
+    openai_style = SimpleNamespace(prompt_tokens=10, completion_tokens=2, total_tokens=12,
+                                   prompt_tokens_details=SimpleNamespace(cached_tokens=8))
+    anthropic_style = {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12, "cache_read_input_tokens": 6}
+
+    assert parse_usage(openai_style)["cached_tokens"] == 8
+    assert parse_usage(anthropic_style)["cached_tokens"] == 6
+    assert parse_usage(None) == {}
+
+
+@pytest.mark.asyncio
+async def test_codex_stream_captures_usage() -> None:
+    events = [
+        {"type": "response.output_text.delta", "delta": "hi"},
+        {"type": "response.completed", "response": {"status": "completed", "usage": {
+            "input_tokens": 40, "output_tokens": 3, "total_tokens": 43,
+            "input_tokens_details": {"cached_tokens": 32}}}},
+    ]
+
+    async def _aiter_lines():
+        for event in events:
+            yield f"data: {json.dumps(event)}"
+            yield ""
+
+    chunks = [c async for c in _consume_sse(SimpleNamespace(aiter_lines=_aiter_lines))]
+
+    assert chunks[-1].response.usage == {"prompt_tokens": 40, "completion_tokens": 3,
+                                         "total_tokens": 43, "cached_tokens": 32}
@@ -0,0 +1,118 @@
+"""Tests for the embedding retrieval memory layer."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.vector_memory import HashingEmbedder, SemanticMemory, VectorIndex, split_facts
+
+MEMORY = """# User
+- Lives in Lisbon and works as a cellist
+- Prefers replies in Portuguese
+
+# Projects
+- The garden irrigation controller runs on a Raspberry Pi
+  and waters the tomatoes at 6am
+"""
+
+
+class _CountingEmbedder(HashingEmbedder):
+    def __init__(self) -> None:
+        super().__init__(dim=256)
+        self.embedded: list[str] = []
+
+    async def embed(self, texts):
+        self.embedded.extend(texts)
+        return await super().embed(texts)
+
+
+def _semantic(tmp_path: Path, embedder=None) -> SemanticMemory:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(MEMORY)
+    return SemanticMemory(store, embedder or _CountingEmbedder(), top_k=3, min_score=0.1)
+
+
+def test_split_facts_by_section_and_item() -> None:
+    assert split_facts(MEMORY) == [
+        ("User", "Lives in Lisbon and works as a cellist"),
+        ("User", "Prefers replies in Portuguese"),
+        ("Projects", "The garden irrigation controller runs on a Raspberry Pi and waters the tomatoes at 6am"),
+    ]
+
+
+def test_index_top_k_masks_deleted_rows_and_reloads(tmp_path: Path) -> None:
+    index = VectorIndex(tmp_path / "vec")
+    vectors = np.eye(4, dtype=np.float32) + 0.01
+    index.add(vectors, [{"n": i} for i in range(4)])
+    index.delete([2])
+
+    (hits,) = VectorIndex(tmp_path / "vec").search(vectors[2:3] + vectors[1:2], k=2)
+    assert [row for row, _ in hits] in ([1, 3], [1, 0])
+    assert hits[0][1] > 0.7
+
+    reloaded = VectorIndex(tmp_path / "vec")
+    assert reloaded.count == 4 and reloaded.dead == {2}
+    both = reloaded.search(vectors[[0, 3]], k=1)
+    assert [h[0][0] for h in both] == [0, 3]
+
+
+@pytest.mark.asyncio
+async def test_recall_returns_relevant_fact_and_history(tmp_path: Path) -> None:
+    semantic = _semantic(tmp_path)
+    semantic.store.append_history("[2024-05-01 10:00] Fixed the irrigation controller wiring on the Raspberry Pi.")
+    semantic.store.append_history("[2024-05-02 10:00] Booked a concert in Porto for the quartet.")
+
+    hits = await semantic.recall("is the tomato irrigation controller working?")
+
+    assert hits[0].source == "memory" and "irrigation" in hits[0].text
+    assert any(h.source == "history" and "wiring" in h.text for h in hits)
+    assert all("Portuguese" not in h.text for h in hits)
+
+
+@pytest.mark.asyncio
+async def test_sync_embeds_only_changed_facts_and_new_history(tmp_path: Path) -> None:
+    embedder = _CountingEmbedder()
+    semantic = _semantic(tmp_path, embedder)
+    await semantic.sync()
+    assert len(embedder.embedded) == 3
+
+    embedder.embedded.clear()
+    semantic.store.write_long_term(MEMORY.replace("Portuguese", "English"))
+    semantic.store.append_history("[2024-06-01 09:00] Tuned the cello.")
+    await semantic.sync()
+    assert embedder.embedded == ["User\nPrefers replies in English", "[2024-06-01 09:00] Tuned the cello."]
+    assert semantic.index.live == 4
+
+    embedder.embedded.clear()
+    restarted = SemanticMemory(MemoryStore(tmp_path), embedder)
+    await restarted.sync()
+    assert embedder.embedded == []  # Only unchanged facts remain; nothing re-embedded
+
+
+@pytest.mark.asyncio
+async def test_context_injects_recalled_memory_instead_of_memory_file(tmp_path: Path) -> None:
+    builder = ContextBuilder(tmp_path, semantic_memory=_semantic(tmp_path))
+
+    recalled = await builder.recall_memory("what city do I live in, Lisbon?")
+    system = builder.build_messages(history=[], current_message="q", recalled=recalled)[0]["content"]
+    assert "## Relevant Memory" in system and "Lisbon" in system
+    assert "# Long-term Memory" not in system and "tomatoes" not in system
+
+    plain = ContextBuilder(tmp_path)
+    assert await plain.recall_memory("anything") is None
+    assert "tomatoes" in plain.build_messages(history=[], current_message="q")[0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_missing_vector_file_rebuilds_index(tmp_path: Path) -> None:
+    semantic = _semantic(tmp_path)
+    await semantic.sync()
+    (tmp_path / "memory" / ".vectors" / "vectors.f32").unlink()
+
+    restarted = SemanticMemory(MemoryStore(tmp_path), HashingEmbedder(dim=256), min_score=0.1)
+    assert restarted.index.count == 0
+    hits = await restarted.recall("which city, Lisbon?")
+    assert restarted.index.live == 3 and "Lisbon" in hits[0].text
@@ -0,0 +1,83 @@
+"""Tests for the web_fetch/web_search response cache."""
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from nanobot.agent.tools.web import WebCache, WebFetchTool, WebSearchTool
+from nanobot.utils.http import HttpClientPool
+
+
+def _pool(handler) -> HttpClientPool:
+    pool = HttpClientPool(http2=False)
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return pool
+
+
+def test_fetch_key_normalizes_url() -> None:
+    a = WebCache.fetch_key("HTTPS://Example.com:443/a?b=2&a=1#frag", "markdown", 100)
+    b = WebCache.fetch_key("https://example.com/a?a=1&b=2", "markdown", 100)
+    assert a == b
+    assert a != WebCache.fetch_key("https://example.com/a?a=1&b=2", "text", 100)
+
+
+@pytest.mark.asyncio
+async def test_fetch_hits_cache_then_revalidates_with_etag(tmp_path: Path) -> None:
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"v": 1}, headers={"ETag": '"v1"'})
+
+    cache = WebCache(ttl=60, disk_dir=tmp_path / "cache")
+    tool = WebFetchTool(http=_pool(_handler), cache=cache)
+
+    first = await tool.execute(url="https://api.example.com/x")
+    assert await tool.execute(url="https://api.example.com/x") == first
+    assert len(requests) == 1
+
+    cache.ttl = 0
+    assert await tool.execute(url="https://api.example.com/x") == first
+    assert len(requests) == 2
+    assert cache.stats()["revalidations"] == 1
+    assert cache.stats()["hits"] == 1
+
+    # A fresh cache over the same directory serves from the disk tier.
+    restarted = WebCache(ttl=60, disk_dir=tmp_path / "cache")
+    entry, fresh = await restarted.lookup(WebCache.fetch_key("https://api.example.com/x", "markdown", 50000))
+    assert fresh and entry.value == first
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached_by_normalized_query() -> None:
+    calls = 0
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json={"web": {"results": [{"title": "T", "url": "https://t"}]}})
+
+    cache = WebCache()
+    tool = WebSearchTool(api_key="k", http=_pool(_handler), cache=cache)
+    first = await tool.execute(query="nanobot  Agent")
+    assert await tool.execute(query="NANOBOT agent") == first
+    assert calls == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_lru_is_bounded_by_bytes() -> None:
+    cache = WebCache(max_bytes=10)
+    await cache.put("a", "12345")
+    await cache.put("b", "12345")
+    await cache.lookup("a")  # a becomes most recently used
+    await cache.put("c", "12345")
+
+    assert (await cache.lookup("b"))[0] is None
+    assert (await cache.lookup("a"))[1] and (await cache.lookup("c"))[1]
+    assert cache.stats()["evictions"] == 1
+    assert json.dumps(cache.stats())
@@ -0,0 +1,134 @@
+"""Tests for web_fetch download and HTML extraction."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from nanobot.agent.tools import web
+from nanobot.agent.tools.web import WebFetchTool
+from nanobot.utils.http import HttpClientPool
+
+PAGE = (
+    "<html><head><title>Cats</title></head><body><article>"
+    + "<p>Cats are small carnivorous mammals that people keep as pets.</p>" * 20
+    + "</article></body></html>"
+)
+
+
+def _tool(handler, **kwargs) -> WebFetchTool:
+    pool = HttpClientPool(http2=False)
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return WebFetchTool(http=pool, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_html_is_extracted_in_worker_pool_with_telemetry() -> None:
+    tool = _tool(lambda request: httpx.Response(200, text=PAGE, headers={"content-type": "text/html"}))
+
+    result = json.loads(await tool.execute(url="https://example.com/cats"))
+
+    assert result["extractor"] == "readability"
+    assert result["text"].startswith("# Cats")
+    assert "carnivorous mammals" in result["text"]
+    assert tool.extract_stats["documents"] == 1
+    assert tool.extract_stats["bytes"] == len(PAGE)
+
+
+def _hang_on_slow(document: str, mode: str) -> tuple[str, float]:
+    if "slow" in document:
+        time.sleep(60)
+    return document.upper(), 0.0
+
+
+@pytest.mark.asyncio
+async def test_extraction_timeout_returns_error(monkeypatch) -> None:
+    monkeypatch.setattr(web, "_extract_pool", web._ExtractPool(1, fn=_hang_on_slow, start_method="fork"))
+    tool = _tool(lambda request: httpx.Response(200, text="<p>slow</p>", headers={"content-type": "text/html"}),
+                 extract_timeout=0.2)
+
+    result = json.loads(await tool.execute(url="https://example.com/slow"))
+
+    assert "timed out" in result["error"]
+    assert tool.extract_stats["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_only_the_stuck_worker() -> None:
+    pool = web._ExtractPool(2, fn=_hang_on_slow, start_method="fork")
+    finished: list[str] = []
+
+    async def _run(document: str, delay: float, timeout: float) -> tuple[str, float]:
+        await asyncio.sleep(delay)
+        try:
+            return await asyncio.to_thread(pool.run, document, "text", timeout)
+        finally:
+            finished.append(document)
+
+    slow, fast = await asyncio.gather(_run("slow", 0, 1.0), _run("fast", 0.2, 5.0), return_exceptions=True)
+
+    assert isinstance(slow, TimeoutError)
+    assert fast == ("FAST", 0.0) and finished == ["fast", "slow"]
+    (survivor,) = pool._idle  # The stuck worker is gone; the one that ran "fast" is kept
+    assert survivor.proc.is_alive()
+    assert await asyncio.to_thread(pool.run, "again", "text", 5.0) == ("AGAIN", 0.0)
+    survivor.kill()
+
+
+@pytest.mark.asyncio
+async def test_download_is_capped() -> None:
+    tool = _tool(lambda request: httpx.Response(200, text="x" * 10_000, headers={"content-type": "text/plain"}),
+                 max_bytes=1000)
+
+    result = json.loads(await tool.execute(url="https://example.com/big.txt", maxChars=5000))
+
+    assert result["length"] == 1000
+    assert result["truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_exact_budget_is_not_reported_as_truncated() -> None:
+    body = "é" * 500  # 1000 bytes of UTF-8
+    tool = _tool(lambda request: httpx.Response(200, content=body.encode(), headers={"content-type": "text/plain"}),
+                 max_bytes=1000)
+
+    result = json.loads(await tool.execute(url="https://example.com/exact.txt", maxChars=5000))
+
+    assert result["text"] == body
+    assert result["truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_binary_payload_is_rejected_after_first_chunk() -> None:
+    chunks_read = 0
+
+    async def _stream():
+        nonlocal chunks_read
+        for _ in range(100):
+            chunks_read += 1
+            yield b"\x89PNG\r\n\x1a\n" + b"\x00" * 1024
+
+    class _Body(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            async for chunk in _stream():
+                yield chunk
+
+    tool = _tool(lambda request: httpx.Response(200, stream=_Body()))
+
+    result = json.loads(await tool.execute(url="https://example.com/file"))
+
+    assert "Unsupported content type" in result["error"]
+    assert chunks_read == 1
+
+
+@pytest.mark.asyncio
+async def test_charset_is_taken_from_meta_tag() -> None:
+    page = '<html><head><meta charset="windows-1251"><title>Т</title></head><body><p>Привет</p></body></html>'
+    tool = _tool(lambda request: httpx.Response(200, content=page.encode("cp1251"),
+                                                headers={"content-type": "text/html"}))
+
+    result = json.loads(await tool.execute(url="https://example.com/ru", extractMode="text"))
+
+    assert "Привет" in result["text"]